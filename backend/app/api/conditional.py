@@ -0,0 +1,39 @@
+import hashlib
+from typing import Mapping
+
+from fastapi import Response
+
+
+# Content only changes on deploy; revalidate every few minutes
+CONTENT_CACHE_CONTROL = "public, max-age=300"
+# Content served under a per-session URL (the scenario bundle)
+BUNDLE_CACHE_CONTROL = "private, max-age=300"
+# Per-user state that changes on every decision: always revalidate
+SESSION_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: object) -> str:
+    """Strong ETag derived from the given parts (e.g. a content hash, an id and a version)."""
+    key = "\x1f".join(str(part) for part in parts)
+    return '"' + hashlib.blake2b(key.encode(), digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header matches `etag` (weak comparison, as RFC 9110 requires)."""
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in tags
+
+
+def not_modified(headers: Mapping[str, str], etag: str, cache_control: str) -> Response | None:
+    """A 304 response if the request's If-None-Match matches `etag`, otherwise None."""
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is None or not etag_matches(if_none_match, etag):
+        return None
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+def set_cache_headers(response: Response, etag: str, cache_control: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
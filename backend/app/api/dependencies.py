@@ -0,0 +1,62 @@
+from functools import lru_cache
+from typing import Callable, Generator
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.database import SessionLocal
+from app.repositories import InMemorySessionRepository, SessionRepository, SqlAlchemySessionRepository
+from app.repositories.write_behind import DecisionWriter, WriteBehindSessionRepository
+
+
+@lru_cache(maxsize=1)
+def get_memory_repository() -> InMemorySessionRepository:
+    """Process-wide in-memory session store (created on first use)."""
+    return InMemorySessionRepository(
+        capacity=settings.MEMORY_SESSION_CAPACITY,
+        ttl_seconds=settings.MEMORY_SESSION_TTL_SECONDS,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_decision_writer() -> DecisionWriter:
+    """Process-wide write-behind queue for decisions (started by the app lifespan)."""
+    return DecisionWriter(
+        session_factory=SessionLocal,
+        batch_size=settings.WRITE_BEHIND_BATCH_SIZE,
+        flush_interval=settings.WRITE_BEHIND_FLUSH_INTERVAL_MS / 1000,
+        max_pending=settings.WRITE_BEHIND_MAX_PENDING,
+    )
+
+
+def get_session_factory() -> Callable[[], Session]:
+    """Session factory for work that outlives a request (e.g. background jobs)."""
+    return SessionLocal
+
+
+def write_behind_enabled() -> bool:
+    return settings.WRITE_BEHIND_ENABLED and settings.SESSION_BACKEND == "sqlalchemy"
+
+
+def get_session_repository() -> Generator[SessionRepository, None, None]:
+    """
+    Dependency injection for the configured session repository.
+    Use with FastAPI's Depends().
+
+    Example:
+        @router.post("/sessions/create")
+        def create_session(repo: SessionRepository = Depends(get_session_repository)):
+            ...
+    """
+    if settings.SESSION_BACKEND == "memory":
+        yield get_memory_repository()
+        return
+
+    db = SessionLocal()
+    try:
+        if write_behind_enabled():
+            yield WriteBehindSessionRepository(db, get_decision_writer())
+        else:
+            yield SqlAlchemySessionRepository(db)
+    finally:
+        db.close()
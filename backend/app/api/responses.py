@@ -0,0 +1,79 @@
+"""
+Session responses assembled from prerendered JSON fragments.
+
+Scenarios and roles are immutable after startup, so their JSON is rendered
+once (see ScenarioIndex.json_by_id and RolesRegistry.json_by_id) and spliced
+into the few per-request scalars here. The output is byte-identical to
+FastAPI's own serialization of the response models (compact Pydantic JSON,
+fields in declaration order); routes return these responses directly, which
+skips response-model validation and dumping.
+"""
+import json
+from uuid import UUID
+
+from starlette.responses import Response
+
+from app.models.enum import Role
+from app.models.schemas import CreateSessionResponse, DecideResponse, SessionResponse
+from app.models.session import Scenario
+from app.services.roles import get_role_by_id, get_role_json
+from app.services.scenario_engine import get_scenario_json, get_scenarios_json, get_total_scenarios
+
+
+class PrerenderedJSONResponse(Response):
+    """A JSON response whose body is already encoded bytes."""
+    media_type = "application/json"
+
+
+def _bool(value: bool) -> bytes:
+    return b"true" if value else b"false"
+
+
+def _scenario(scenario: Scenario | None) -> bytes:
+    return get_scenario_json(scenario) if scenario is not None else b"null"
+
+
+def create_session_response(payload: CreateSessionResponse) -> PrerenderedJSONResponse:
+    body = b'{"sessionId":"%s","role":%s,"first_scenario":%s,"total_scenarios":%d}' % (
+        str(payload.sessionId).encode(),
+        json.dumps(payload.role.value).encode(),
+        _scenario(payload.first_scenario),
+        payload.total_scenarios,
+    )
+    return PrerenderedJSONResponse(body)
+
+
+def session_response(payload: SessionResponse) -> PrerenderedJSONResponse:
+    body = (
+        b'{"sessionId":"%s","role":%s,"current_scenario":%s,'
+        b'"scenarios_completed":%d,"total_scenarios":%d,"is_completed":%s}'
+    ) % (
+        str(payload.sessionId).encode(),
+        get_role_json(payload.role),
+        _scenario(payload.current_scenario),
+        payload.scenarios_completed,
+        payload.total_scenarios,
+        _bool(payload.is_completed),
+    )
+    return PrerenderedJSONResponse(body)
+
+
+def decide_response(payload: DecideResponse) -> PrerenderedJSONResponse:
+    body = b'{"next_scenario":%s,"scenarios_completed":%d,"total_scenarios":%d,"is_completed":%s}' % (
+        _scenario(payload.next_scenario),
+        payload.scenarios_completed,
+        payload.total_scenarios,
+        _bool(payload.is_completed),
+    )
+    return PrerenderedJSONResponse(body)
+
+
+def bundle_response(session_id: UUID, role: Role) -> PrerenderedJSONResponse:
+    """SessionBundleResponse for a session: its role and every scenario, prerendered per role."""
+    body = b'{"sessionId":"%s","role":%s,"total_scenarios":%d,"scenarios":%s}' % (
+        str(session_id).encode(),
+        get_role_json(get_role_by_id(role)),
+        get_total_scenarios(role),
+        get_scenarios_json(role),
+    )
+    return PrerenderedJSONResponse(body)
@@ -1,9 +1,11 @@
 from fastapi import APIRouter
 
-from app.api.routes import sessions, roles, health
+from app.api.routes import sessions, roles, health, admin, stats
 
 
 api_router = APIRouter()
 api_router.include_router(router=sessions.router)
 api_router.include_router(router=roles.router)
-api_router.include_router(router=health.router)
\ No newline at end of file
+api_router.include_router(router=health.router)
+api_router.include_router(router=stats.router)
+api_router.include_router(router=admin.router)
\ No newline at end of file
@@ -0,0 +1,74 @@
+import secrets
+from datetime import datetime
+from typing import Any, Callable, Dict
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+
+from app.api.dependencies import get_session_factory
+from app.config import settings
+from app.models.enum import Role
+from app.services.export import MEDIA_TYPES, ExportFilters, ExportFormat, export_sessions
+from app.services.rescoring import rescore_job
+
+
+def require_admin_token(x_admin_token: str | None = Header(default=None)) -> None:
+    """Reject the request unless it carries the configured ADMIN_TOKEN."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(tags=["Admin"], prefix="/admin", dependencies=[Depends(require_admin_token)])
+
+
+class RescoreRequest(BaseModel):
+    chunk_size: int = Field(settings.RESCORE_CHUNK_SIZE, gt=0)
+    workers: int = Field(settings.RESCORE_WORKERS, ge=0)
+    resume: bool = True
+
+
+@router.post("/rescore", status_code=202, summary="Start re-scoring stored role profiles")
+def start_rescore_endpoint(
+    body: RescoreRequest,
+    session_factory: Callable[[], Session] = Depends(get_session_factory)
+)-> Dict[str, Any]:
+    if settings.SESSION_BACKEND != "sqlalchemy":
+        raise HTTPException(status_code=400, detail="Re-scoring requires the sqlalchemy session backend")
+    started = rescore_job.start(
+        session_factory,
+        chunk_size=body.chunk_size,
+        workers=body.workers,
+        resume=body.resume,
+    )
+    if not started:
+        raise HTTPException(status_code=409, detail="A re-scoring run is already in progress")
+    return rescore_job.status()
+
+
+@router.get("/rescore", summary="Progress of the current or last re-scoring run")
+def rescore_status_endpoint() -> Dict[str, Any]:
+    return rescore_job.status()
+
+
+@router.get("/export", summary="Stream sessions with their ordered decisions as NDJSON or CSV")
+def export_sessions_endpoint(
+    format: ExportFormat = "ndjson",
+    role: Role | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    gzip: bool = False,
+    session_factory: Callable[[], Session] = Depends(get_session_factory)
+)-> StreamingResponse:
+    if settings.SESSION_BACKEND != "sqlalchemy":
+        raise HTTPException(status_code=400, detail="Export requires the sqlalchemy session backend")
+    filters = ExportFilters(role=role, created_from=created_from, created_to=created_to)
+    filename = f"sessions.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        export_sessions(session_factory, format, filters, compress=gzip),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
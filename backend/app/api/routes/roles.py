@@ -1,7 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
 from typing import List
 
+from app.api.conditional import CONTENT_CACHE_CONTROL, make_etag, not_modified, set_cache_headers
 from app.models.schemas import RoleResponse
+from app.services.content_loader import content_fingerprint
 from app.services.roles import fetch_roles
 
 
@@ -9,8 +11,14 @@ router = APIRouter(tags=["Roles"], prefix="/roles")
 
 @router.get("", summary="Roles Root Endpoint", response_model_exclude_none=True)
 def get_roles(
+    request: Request,
+    response: Response,
     include_details: bool = True
 )-> List[RoleResponse]:
+    etag = make_etag("roles", content_fingerprint(), include_details)
+    cached = not_modified(request.headers, etag, CONTENT_CACHE_CONTROL)
+    if cached is not None:
+        return cached
+    set_cache_headers(response, etag, CONTENT_CACHE_CONTROL)
     roles = fetch_roles(include_details=include_details)
     return roles
-
@@ -1,88 +1,152 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from uuid import UUID
 
-from app.db.database import get_db
+from app.api import responses
+from app.api.conditional import (
+    BUNDLE_CACHE_CONTROL,
+    SESSION_CACHE_CONTROL,
+    make_etag,
+    not_modified,
+    set_cache_headers,
+)
+from app.api.dependencies import get_session_repository
 from app.models.enum import Role
-from app.models.schemas import CreateSessionResponse, DecideRequest, DecideResponse, SessionResponse
-from app.services import session_manager, scenario_engine, archetype_engine
+from app.models.schemas import (
+    CreateSessionResponse,
+    DecideRequest,
+    DecideResponse,
+    DecisionsRequest,
+    DecisionsResponse,
+    SessionBundleResponse,
+    SessionResponse,
+)
+from app.services import session_manager
 from app.models.session import ArchetypeMatch
+from app.repositories import ConcurrentUpdateError, SessionRepository
+from app.services.content_loader import content_fingerprint
 
 router = APIRouter(tags=["Sessions"], prefix="/sessions")
 
+
+def _session_etag(kind: str, session_id: UUID | str, version: int) -> str:
+    # Session views embed scenario content, so the content hash is part of the tag
+    return make_etag(kind, str(session_id), version, content_fingerprint())
+
+
+def _not_modified(request: Request, repo: SessionRepository, session_id: UUID, kind: str) -> Response | None:
+    """
+    Answer a conditional GET from the session's version alone.
+
+    Only probed when the client sent If-None-Match, so unconditional reads
+    cost no extra query.
+    """
+    if "if-none-match" not in request.headers:
+        return None
+    version = session_manager.get_session_version(repo, session_id)
+    if version is None:
+        return None
+    return not_modified(request.headers, _session_etag(kind, session_id, version), SESSION_CACHE_CONTROL)
+
+
 @router.get("/", summary="Sessions Root Endpoint")
 async def read_root():
     return {"message": "Welcome to the Sessions Endpoint!"}
 
 
-@router.post("/create", summary="Initialize a new simulation session")
+@router.post("/create", summary="Initialize a new simulation session", response_model=CreateSessionResponse)
 def create_session_endpoint(
     role: Role,
-    db: Session = Depends(get_db) 
-) -> CreateSessionResponse:
+    repo: SessionRepository = Depends(get_session_repository) 
+) -> Response:
 
     if role not in Role:
         raise HTTPException(status_code=400, detail="Invalid role specified")
-    return session_manager.create_session(db, role)
+    return responses.create_session_response(session_manager.create_session(repo, role))
 
 
-@router.get("/{session_id}", summary="Retrieve session details by ID")
+@router.get("/{session_id}", summary="Retrieve session details by ID", response_model=SessionResponse)
 def get_session_endpoint(
     session_id: UUID,
-    db: Session = Depends(get_db)
-)-> SessionResponse:
-    session = session_manager.fetch_session(db, session_id)
+    request: Request,
+    repo: SessionRepository = Depends(get_session_repository)
+)-> Response:
+    cached = _not_modified(request, repo, session_id, "session")
+    if cached is not None:
+        return cached
+    session = session_manager.get_session(repo, session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    response = responses.session_response(session_manager.session_response(session))
+    set_cache_headers(response, _session_etag("session", session.id, session.version), SESSION_CACHE_CONTROL)
+    return response
+
+
+@router.get(
+    "/{session_id}/bundle",
+    summary="Download every scenario of the session's role in one payload",
+    response_model=SessionBundleResponse,
+)
+def get_session_bundle_endpoint(
+    session_id: UUID,
+    request: Request,
+    repo: SessionRepository = Depends(get_session_repository)
+)-> Response:
+    session = session_manager.get_session(repo, session_id)
     if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
-    return session
+    # A session's role never changes, so the bundle only changes with the content
+    etag = make_etag("bundle", session.id, content_fingerprint())
+    cached = not_modified(request.headers, etag, BUNDLE_CACHE_CONTROL)
+    if cached is not None:
+        return cached
+    response = responses.bundle_response(UUID(session.id), Role(session.role))
+    set_cache_headers(response, etag, BUNDLE_CACHE_CONTROL)
+    return response
 
 
-@router.post("/{session_id}/decide", summary="Submit a choice for the current scenario")
+@router.post("/{session_id}/decide", summary="Submit a choice for the current scenario", response_model=DecideResponse)
 def submit_choice_endpoint(
     session_id: UUID,
     body: DecideRequest,
-    db: Session = Depends(get_db)
-)-> DecideResponse:
+    repo: SessionRepository = Depends(get_session_repository)
+)-> Response:
     try:
-        # Sumit the choice using the session manager
-        session_manager.submit_choice(db, session_id, body.scenario_id, body.choice_id)
-
-        # Get next scenario
-        session = session_manager.get_session_or_raise(db, session_id)
-        role = Role(session.role)
-        next_scenario = scenario_engine.get_next_scenario(role, body.scenario_id)
-        scenarios_completed = session_manager.get_scenarios_completed(db, session_id)
-
-        if next_scenario is None:
-            try:
-                # Generate and store role profile
-                role_profile = session_manager.generate_role_profile(db, session_id)
-                session_manager.store_role_profile(db, session_id, role_profile)
-            except ValueError:
-                pass  # Profile generation failure should not block scenario progression
-
-        return DecideResponse(
-            next_scenario=next_scenario,
-            scenarios_completed=scenarios_completed,
-            total_scenarios=scenario_engine.get_total_scenarios(role),
-            is_completed=next_scenario is None
-        )
-
+        return responses.decide_response(session_manager.decide(repo, session_id, body.scenario_id, body.choice_id))
+    except ConcurrentUpdateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 
+@router.post("/{session_id}/decisions", summary="Submit consecutive choices in one request")
+def submit_choices_endpoint(
+    session_id: UUID,
+    body: DecisionsRequest,
+    repo: SessionRepository = Depends(get_session_repository)
+)-> DecisionsResponse:
+    try:
+        return session_manager.decide_many(
+            repo, session_id, [(decision.scenario_id, decision.choice_id) for decision in body.decisions]
+        )
+    except ConcurrentUpdateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.post("/{session_id}/profile", summary="Generate user profile based on decisions")
 def generate_profile_endpoint(
     session_id: UUID,
-    db: Session = Depends(get_db)
+    repo: SessionRepository = Depends(get_session_repository)
 )-> str:
     try:
-        role_profile = session_manager.generate_role_profile(db, session_id)
-        session_manager.store_role_profile(db, session_id, role_profile)
+        role_profile = session_manager.generate_role_profile(repo, session_id)
+        session_manager.store_role_profile(repo, session_id, role_profile)
         return "OK"
     
+    except ConcurrentUpdateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -91,10 +155,18 @@ def generate_profile_endpoint(
 @router.get("/{session_id}/profile", summary="Retrieve the generated role profile for the session")
 def get_role_profile_endpoint(
     session_id: UUID,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    repo: SessionRepository = Depends(get_session_repository)
 )-> ArchetypeMatch:
+    cached = _not_modified(request, repo, session_id, "profile")
+    if cached is not None:
+        return cached
     try:
-        return session_manager.get_role_profile(db, session_id)
+        session = session_manager.get_session_or_raise(repo, session_id)
+        role_profile = session_manager.stored_role_profile(session)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    set_cache_headers(response, _session_etag("profile", session.id, session.version), SESSION_CACHE_CONTROL)
+    return role_profile
 
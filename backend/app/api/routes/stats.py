@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends
+
+from app.api.dependencies import get_session_repository
+from app.models.enum import Role
+from app.models.schemas import RoleStatsResponse
+from app.repositories import SessionRepository
+from app.services import analytics
+
+
+router = APIRouter(tags=["Stats"], prefix="/stats")
+
+@router.get("/{role}", summary="Choice and archetype counts for a role")
+def get_role_stats_endpoint(
+    role: Role,
+    repo: SessionRepository = Depends(get_session_repository)
+)-> RoleStatsResponse:
+    return analytics.get_role_stats(repo, role)
@@ -0,0 +1,207 @@
+"""
+Operational commands for the Startup Simulator backend.
+
+Usage:
+    python -m app.cli <command> [options]
+"""
+import argparse
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+from app.config import settings
+from app.db.database import SessionLocal, engine
+from app.db.stats import rebuild_stats
+from app.models.enum import Role
+from app.services import maintenance, rescoring
+from app.services.content_loader import ContentValidationError, content_fingerprint, write_content_snapshot
+from app.services.export import ExportFilters, export_sessions
+
+
+def _prepare_database() -> None:
+    # Imported here: loading the FastAPI app is only needed by commands that touch the database
+    from app.main import prepare_database
+
+    prepare_database()
+
+
+def _backfill_counters(args: argparse.Namespace) -> int:
+    _prepare_database()
+    with SessionLocal() as db:
+        updated = maintenance.backfill_session_counters(db, batch_size=args.batch_size)
+    print(f"Backfilled counters on {updated} sessions")
+    return 0
+
+
+def _check_counters(args: argparse.Namespace) -> int:
+    _prepare_database()
+    with SessionLocal() as db:
+        mismatches = maintenance.check_session_counters(db, batch_size=args.batch_size)
+    for mismatch in mismatches:
+        print(f"{mismatch.session_id} {mismatch.field}: expected {mismatch.expected!r}, found {mismatch.actual!r}")
+    print(f"{len(mismatches)} counter mismatches")
+    return 1 if mismatches else 0
+
+
+def _expire_sessions(args: argparse.Namespace) -> int:
+    _prepare_database()
+    report = maintenance.expire_idle_sessions(
+        SessionLocal,
+        ttl=timedelta(hours=args.ttl_hours),
+        batch_size=args.batch_size,
+        archive_dir=args.archive_dir,
+        include_completed=args.include_completed,
+    )
+    if report.sessions_removed and not args.no_vacuum:
+        report.bytes_reclaimed = maintenance.incremental_vacuum(engine, pages_per_step=args.vacuum_pages)
+    print(
+        f"Removed {report.sessions_removed} sessions, {report.responses_removed} responses, "
+        f"{report.messages_removed} messages in {report.batches} batches; "
+        f"reclaimed {report.bytes_reclaimed} bytes"
+    )
+    if report.archive_path is not None:
+        print(f"Archived to {report.archive_path}")
+    return 0
+
+
+def _vacuum(args: argparse.Namespace) -> int:
+    _prepare_database()
+    if args.full:
+        reclaimed = maintenance.full_vacuum(engine)
+    else:
+        reclaimed = maintenance.incremental_vacuum(engine, pages_per_step=args.vacuum_pages)
+    print(f"Reclaimed {reclaimed} bytes")
+    return 0
+
+
+def _rescore(args: argparse.Namespace) -> int:
+    _prepare_database()
+    lock_file = rescoring.try_lock(rescoring.RESCORE_LOCK_PATH)
+    if lock_file is None:
+        print("A re-scoring run is already in progress", file=sys.stderr)
+        return 1
+    with lock_file:
+        progress = rescoring.rescore_profiles(
+            SessionLocal,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            checkpoint_path=args.checkpoint,
+            resume=not args.restart,
+        )
+    print(
+        f"Re-scored {progress.processed} sessions, updated {progress.updated} profiles "
+        f"in {progress.elapsed_seconds:.1f}s ({progress.sessions_per_second:.0f} sessions/s)"
+    )
+    return 0
+
+
+def _rebuild_stats(args: argparse.Namespace) -> int:
+    _prepare_database()
+    with SessionLocal() as db:
+        choice_rows, archetype_rows = rebuild_stats(db)
+    print(f"Rebuilt stats: {choice_rows} choice rows, {archetype_rows} archetype rows")
+    return 0
+
+
+def _export(args: argparse.Namespace) -> int:
+    _prepare_database()
+    filters = ExportFilters(
+        role=Role(args.role) if args.role else None,
+        created_from=args.created_from,
+        created_to=args.created_to,
+    )
+    chunks = export_sessions(SessionLocal, args.format, filters, compress=args.gzip, page_size=args.page_size)
+    output = open(args.output, "wb") if args.output is not None else sys.stdout.buffer
+    try:
+        for chunk in chunks:
+            output.write(chunk)
+    finally:
+        if args.output is not None:
+            output.close()
+        else:
+            output.flush()
+    return 0
+
+
+def _build_content_snapshot(args: argparse.Namespace) -> int:
+    try:
+        size = write_content_snapshot(args.output)
+    except ContentValidationError as exc:
+        for error in exc.errors:
+            print(error, file=sys.stderr)
+        return 1
+    print(f"Wrote {size} byte content snapshot ({content_fingerprint()}) to {args.output}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill = commands.add_parser("backfill-counters", help="Recompute session trait counters from responses")
+    backfill.add_argument("--batch-size", type=int, default=500)
+    backfill.set_defaults(handler=_backfill_counters)
+
+    check = commands.add_parser("check-counters", help="Report sessions whose counters disagree with responses")
+    check.add_argument("--batch-size", type=int, default=500)
+    check.set_defaults(handler=_check_counters)
+
+    expire = commands.add_parser("expire-sessions", help="Delete (optionally archive) idle sessions and compact")
+    expire.add_argument("--ttl-hours", type=float, default=settings.SESSION_IDLE_TTL_HOURS)
+    expire.add_argument("--batch-size", type=int, default=settings.MAINTENANCE_BATCH_SIZE)
+    expire.add_argument("--archive-dir", type=Path, default=settings.MAINTENANCE_ARCHIVE_DIR)
+    expire.add_argument("--vacuum-pages", type=int, default=settings.MAINTENANCE_VACUUM_PAGES)
+    expire.add_argument("--no-vacuum", action="store_true", help="Skip the incremental vacuum step")
+    expire.add_argument(
+        "--include-completed", action="store_true", help="Also delete idle sessions that have a role profile"
+    )
+    expire.set_defaults(handler=_expire_sessions)
+
+    vacuum = commands.add_parser("vacuum", help="Return free pages to the filesystem")
+    vacuum.add_argument("--vacuum-pages", type=int, default=settings.MAINTENANCE_VACUUM_PAGES)
+    vacuum.add_argument(
+        "--full",
+        action="store_true",
+        help="Rebuild the whole file (exclusive lock); needed once to switch an existing database to INCREMENTAL",
+    )
+    vacuum.set_defaults(handler=_vacuum)
+
+    rescore = commands.add_parser("rescore", help="Recompute stored role profiles against current archetype data")
+    rescore.add_argument("--chunk-size", type=int, default=settings.RESCORE_CHUNK_SIZE)
+    rescore.add_argument("--workers", type=int, default=settings.RESCORE_WORKERS, help="Scoring processes (0 = inline)")
+    rescore.add_argument("--checkpoint", type=Path, default=settings.RESCORE_CHECKPOINT_PATH)
+    rescore.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint and start over")
+    rescore.set_defaults(handler=_rescore)
+
+    stats = commands.add_parser("rebuild-stats", help="Recompute choice/archetype stats from raw responses and profiles")
+    stats.set_defaults(handler=_rebuild_stats)
+
+    export = commands.add_parser("export", help="Stream sessions and their decisions as NDJSON or CSV")
+    export.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    export.add_argument("--role", choices=[role.value for role in Role])
+    export.add_argument("--created-from", type=datetime.fromisoformat, help="ISO date/time, inclusive")
+    export.add_argument("--created-to", type=datetime.fromisoformat, help="ISO date/time, exclusive")
+    export.add_argument("--gzip", action="store_true")
+    export.add_argument("--page-size", type=int, default=500)
+    export.add_argument("--output", type=Path, help="Write to a file instead of stdout")
+    export.set_defaults(handler=_export)
+
+    snapshot = commands.add_parser(
+        "build-content-snapshot", help="Validate data/ and compile it into a snapshot loaded at startup"
+    )
+    snapshot.add_argument(
+        "--output", type=Path, default=settings.CONTENT_SNAPSHOT_PATH or Path("data/content.snapshot")
+    )
+    snapshot.set_defaults(handler=_build_content_snapshot)
+
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -31,7 +31,10 @@ class Settings(BaseSettings):
   API_V1_STR: str = "/api/v1"
   DOCS_URL: str = "/docs"
   OPENAPI_URL: str = "/openapi.json"
+  SERVER_HOST: str = "127.0.0.1"
   SERVER_PORT: int = 8000
+  # Pre-forked workers for `python -m app.server` (0 = one per available core)
+  WORKERS: int = 0
   ENABLE_DOCS: bool = True
   ENABLE_OPENAPI: bool = True
   ENABLE_CORS: bool = True
@@ -39,6 +42,60 @@ class Settings(BaseSettings):
   FRONTEND_HOST: str = "http://localhost:5173"
   ENVIRONMENT: Literal["local", "staging", "production"] = "local"
 
+  # database section (SQLite pragmas are applied to every new connection)
+  # SQLite file; defaults to backend/data/simulator.db
+  DATABASE_PATH: Path | None = None
+  SQLITE_JOURNAL_MODE: Literal["WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY"] = "WAL"
+  SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+  SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+  SQLITE_CACHE_SIZE: int = -64 * 1024  # negative values are KiB, positive are pages
+  SQLITE_BUSY_TIMEOUT_MS: int = 5000
+  SQLITE_TEMP_STORE: Literal["DEFAULT", "FILE", "MEMORY"] = "MEMORY"
+  # Only takes effect for new databases or after a full VACUUM
+  SQLITE_AUTO_VACUUM: Literal["NONE", "FULL", "INCREMENTAL"] = "INCREMENTAL"
+  DB_POOL_SIZE: int = 5
+  DB_MAX_OVERFLOW: int = 10
+  DB_POOL_TIMEOUT: float = 30.0
+
+  # observability section
+  # Request/DB metrics on /metrics plus a Server-Timing header
+  METRICS_ENABLED: bool = True
+
+  # session storage section
+  SESSION_BACKEND: Literal["sqlalchemy", "memory"] = "sqlalchemy"
+  MEMORY_SESSION_CAPACITY: int = 10_000
+  MEMORY_SESSION_TTL_SECONDS: int = 3600
+
+  # startup section
+  # Content compiled by `python -m app.cli build-content-snapshot`; data/ is parsed when unset or stale
+  CONTENT_SNAPSHOT_PATH: Path | None = None
+  # Import + lifespan startup budget enforced by perf/startup.py and its test
+  STARTUP_BUDGET_MS: float = 2500
+
+  # scoring section
+  # Roles with more complete choice paths than this are scored live
+  OUTCOME_TABLE_MAX_PATHS: int = 100_000
+
+  # write-behind section (sqlalchemy backend only)
+  WRITE_BEHIND_ENABLED: bool = False
+  WRITE_BEHIND_BATCH_SIZE: int = 100
+  WRITE_BEHIND_FLUSH_INTERVAL_MS: int = 50
+  WRITE_BEHIND_MAX_PENDING: int = 10_000
+
+  # maintenance section (idle-session expiry and compaction)
+  MAINTENANCE_ENABLED: bool = False
+  MAINTENANCE_INTERVAL_SECONDS: int = 3600
+  SESSION_IDLE_TTL_HOURS: float = 72
+  MAINTENANCE_BATCH_SIZE: int = 500
+  MAINTENANCE_ARCHIVE_DIR: Path | None = None
+  MAINTENANCE_VACUUM_PAGES: int = 1000
+
+  # admin section (admin endpoints are disabled while ADMIN_TOKEN is unset)
+  ADMIN_TOKEN: str | None = None
+  RESCORE_CHUNK_SIZE: int = 1000
+  RESCORE_WORKERS: int = 0
+  RESCORE_CHECKPOINT_PATH: Path | None = None
+
   @property
   def all_cors_origins(self) -> list[str]:
     """Get all allowed CORS origins."""
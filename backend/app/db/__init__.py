@@ -1,5 +1,12 @@
 from app.db.database import get_db, engine, SessionLocal
-from app.db.models import Base, SessionModel, ScenarioResponseModel, ConversationMessageModel
+from app.db.models import (
+    Base,
+    SessionModel,
+    ScenarioResponseModel,
+    ConversationMessageModel,
+    ChoiceStatModel,
+    ArchetypeStatModel,
+)
 
 __all__ = [
     "get_db",
@@ -9,4 +16,6 @@ __all__ = [
     "SessionModel",
     "ScenarioResponseModel",
     "ConversationMessageModel",
+    "ChoiceStatModel",
+    "ArchetypeStatModel",
 ]
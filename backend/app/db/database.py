@@ -1,22 +1,81 @@
+import logging
 from pathlib import Path
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import Any, Dict, Generator
 
 from app.config import settings
+from app.observability.db import TimedQueuePool, instrument_engine
 
 
+logger = logging.getLogger(__name__)
+
 DATABASE_DIR = Path(__file__).resolve().parents[2] / "data"
-DATABASE_DIR.mkdir(exist_ok=True)
-DATABASE_URL = f"sqlite:///{DATABASE_DIR}/simulator.db"
+DATABASE_PATH = settings.DATABASE_PATH or DATABASE_DIR / "simulator.db"
+DATABASE_PATH.parent.mkdir(parents=True, exist_ok=True)
+DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
+
+SQLITE_PRAGMAS = ("journal_mode", "synchronous", "mmap_size", "cache_size", "busy_timeout", "temp_store", "auto_vacuum")
 
 
 engine = create_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False},
     echo=settings.LOG_LEVEL == "debug",
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    # Same pool as the default, plus checkout wait timing
+    poolclass=TimedQueuePool if settings.METRICS_ENABLED else None,
 )
 
+
+def apply_sqlite_pragmas(dbapi_connection: Any, connection_record: Any = None) -> None:
+    """Apply the configured SQLite performance profile to a new DBAPI connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        # busy_timeout first so the journal_mode switch itself waits on a locked file
+        cursor.execute(f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA auto_vacuum = {settings.SQLITE_AUTO_VACUUM}")
+        cursor.execute(f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA cache_size = {int(settings.SQLITE_CACHE_SIZE)}")
+        cursor.execute(f"PRAGMA temp_store = {settings.SQLITE_TEMP_STORE}")
+    finally:
+        cursor.close()
+
+
+event.listen(engine, "connect", apply_sqlite_pragmas)
+if settings.METRICS_ENABLED:
+    instrument_engine(engine)
+
+
+def get_sqlite_profile(bind: Engine = engine) -> Dict[str, Any]:
+    """Read back the effective SQLite pragma values from a pooled connection."""
+    with bind.connect() as conn:
+        return {
+            pragma: conn.exec_driver_sql(f"PRAGMA {pragma}").scalar()
+            for pragma in SQLITE_PRAGMAS
+        }
+
+
+def log_database_profile(bind: Engine = engine) -> None:
+    """Log the effective SQLite pragmas and pool sizing."""
+    profile = get_sqlite_profile(bind)
+    logger.info(
+        "SQLite profile: %s",
+        ", ".join(f"{pragma}={value}" for pragma, value in profile.items()),
+    )
+    logger.info(
+        "Connection pool: size=%s, max_overflow=%s, timeout=%ss",
+        settings.DB_POOL_SIZE,
+        settings.DB_MAX_OVERFLOW,
+        settings.DB_POOL_TIMEOUT,
+    )
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
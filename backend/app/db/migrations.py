@@ -0,0 +1,138 @@
+import logging
+from typing import List
+
+from sqlalchemy import Connection, Engine, inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateColumn
+
+from app.db.models import Base
+
+
+logger = logging.getLogger(__name__)
+
+# Reported by upgrade_schema when legacy duplicate answers were removed; session
+# counters and stats derived from those rows need to be recomputed
+DUPLICATE_RESPONSES_REMOVED = "scenario_responses.duplicates_removed"
+# Reported when answers were renumbered; the path codes follow their order
+RESPONSES_RESEQUENCED = "scenario_responses.resequenced"
+UNIQUE_RESPONSE_INDEX = "uq_scenario_responses_session_scenario"
+UNIQUE_SEQUENCE_INDEX = "ix_scenario_responses_session_sequence"
+
+
+def remove_duplicate_responses(conn: Connection) -> int:
+    """
+    Delete all but the earliest answer to each scenario of a session.
+
+    Earliest is by timestamp, then sequence, then insertion order. Returns
+    the number of rows removed.
+    """
+    result = conn.execute(text(
+        "DELETE FROM scenario_responses WHERE rowid IN ("
+        "  SELECT rowid FROM ("
+        "    SELECT rowid, ROW_NUMBER() OVER ("
+        "      PARTITION BY session_id, scenario_id"
+        "      ORDER BY timestamp IS NULL, timestamp, sequence, rowid"
+        "    ) AS position FROM scenario_responses"
+        "  ) WHERE position > 1"
+        ")"
+    ))
+    return result.rowcount
+
+
+def resequence_responses(conn: Connection) -> int:
+    """
+    Number each session's answers 1..n, keeping their current order.
+
+    Unsequenced legacy answers (sequence 0) come first, in timestamp order,
+    since they predate every sequenced one. Returns the number of rows renumbered.
+    """
+    result = conn.execute(text(
+        "UPDATE scenario_responses SET sequence = numbered.position FROM ("
+        "  SELECT rowid AS row_id, ROW_NUMBER() OVER ("
+        "    PARTITION BY session_id"
+        "    ORDER BY sequence, timestamp IS NULL, timestamp, rowid"
+        "  ) AS position FROM scenario_responses"
+        ") AS numbered "
+        "WHERE scenario_responses.rowid = numbered.row_id AND scenario_responses.sequence != numbered.position"
+    ))
+    return result.rowcount
+
+
+def upgrade_schema(engine: Engine) -> List[str]:
+    """
+    Add columns and indexes declared on the ORM models but missing from existing tables.
+
+    `create_all` only creates missing tables, so databases created by an older
+    release would otherwise lack newly added columns. New columns must be
+    nullable or carry a server default (SQLite ALTER TABLE restriction).
+
+    Legacy duplicate answers are removed and the remaining answers numbered
+    1..n per session before the unique answer and sequence indexes are
+    created, so the database rejects duplicates from then on. An index that
+    exists but was created without its declared uniqueness is rebuilt.
+
+    Returns the added columns as "table.column", plus
+    DUPLICATE_RESPONSES_REMOVED when duplicates were deleted and
+    RESPONSES_RESEQUENCED when answers were renumbered.
+
+    Raises:
+        RuntimeError: If a unique index still cannot be created over existing rows
+    """
+    inspector = inspect(engine)
+    added: List[str] = []
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+                added.append(f"{table.name}.{column.name}")
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {index["name"]: index for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.unique and index.name in existing and not existing[index.name]["unique"]:
+                    conn.execute(text(f"DROP INDEX {index.name}"))
+
+    missing_indexes = set()
+    if inspector.has_table("scenario_responses"):
+        # Fresh inspector: the cached one still lists the dropped indexes
+        existing = {index["name"] for index in inspect(engine).get_indexes("scenario_responses")}
+        missing_indexes = {UNIQUE_RESPONSE_INDEX, UNIQUE_SEQUENCE_INDEX} - existing
+
+    if UNIQUE_RESPONSE_INDEX in missing_indexes:
+        with engine.begin() as conn:
+            removed = remove_duplicate_responses(conn)
+        if removed:
+            logger.warning("Schema upgrade: removed %d duplicate scenario answers (kept the earliest)", removed)
+            added.append(DUPLICATE_RESPONSES_REMOVED)
+    if UNIQUE_SEQUENCE_INDEX in missing_indexes:
+        with engine.begin() as conn:
+            resequenced = resequence_responses(conn)
+        if resequenced:
+            logger.warning("Schema upgrade: renumbered %d scenario answers", resequenced)
+            added.append(RESPONSES_RESEQUENCED)
+
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=engine, checkfirst=True)
+            except IntegrityError as exc:
+                raise RuntimeError(
+                    f"Schema upgrade: cannot create unique index {index.name} on {table.name}, "
+                    "existing rows conflict; remove the duplicates and restart"
+                ) from exc
+
+    for column in added:
+        if column in (DUPLICATE_RESPONSES_REMOVED, RESPONSES_RESEQUENCED):
+            continue
+        logger.info("Schema upgrade: added column %s", column)
+    return added
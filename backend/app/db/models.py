@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime, UTC
 from typing import List
 
-from sqlalchemy import String, Text, DateTime, ForeignKey, JSON, Enum as SQLEnum
+from sqlalchemy import String, Text, DateTime, ForeignKey, Index, JSON, Enum as SQLEnum, text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 from app.models.enum import WorkflowState
@@ -19,6 +19,10 @@ class SessionModel(Base):
     Maps to the Session Pydantic model in app/models/session.py
     """
     __tablename__ = "sessions"
+    __table_args__ = (
+        # Drives the idle-session expiry scan
+        Index("ix_sessions_updated_at", "updated_at"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     role: Mapped[str] = mapped_column(String(20), nullable=False)
@@ -29,11 +33,26 @@ class SessionModel(Base):
     # Role profile (stored as JSON once generated)
     role_profile: Mapped[dict | None] = mapped_column(JSON, nullable=True)
 
+    # Running aggregates kept in step with scenario_responses by session_manager
+    trait_counts: Mapped[dict] = mapped_column(JSON, default=dict, server_default=text("'{}'"), nullable=False)
+    scenarios_completed: Mapped[int] = mapped_column(default=0, server_default=text("0"), nullable=False)
+    last_scenario_id: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    # Encoded choice path for outcome table lookups (NULL when it cannot be tracked)
+    path_code: Mapped[int | None] = mapped_column(default=0, nullable=True)
+    # Outcome table layout path_code is encoded under, set by the first answer
+    path_layout: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    # Bumped on every change a client can observe; drives the session ETags
+    version: Mapped[int] = mapped_column(default=0, server_default=text("0"), nullable=False)
+    # Optimistic concurrency: a flush only updates the row while version still has
+    # the value it was loaded with (the application increments it itself)
+    __mapper_args__ = {"version_id_col": version, "version_id_generator": False}
+
     # Relationships
     scenario_responses: Mapped[List["ScenarioResponseModel"]] = relationship(
         "ScenarioResponseModel", 
         back_populates="session",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        order_by="ScenarioResponseModel.sequence",
     )
     conversation_messages: Mapped[List["ConversationMessageModel"]] = relationship(
         "ConversationMessageModel",
@@ -48,13 +67,22 @@ class ScenarioResponseModel(Base):
     Maps to ScenarioResponse in MVP design doc section 2.4
     """
     __tablename__ = "scenario_responses"
+    __table_args__ = (
+        # Leading session_id column also serves plain per-session lookups; two
+        # answers can never take the same position in a session
+        Index("ix_scenario_responses_session_sequence", "session_id", "sequence", unique=True),
+        # A scenario can only be answered once per session
+        Index("uq_scenario_responses_session_scenario", "session_id", "scenario_id", unique=True),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     session_id: Mapped[str] = mapped_column(String(36), ForeignKey("sessions.id"), nullable=False)
     scenario_id: Mapped[str] = mapped_column(String(50), nullable=False)
     choice_id: Mapped[str] = mapped_column(String(50), nullable=False)
     traits: Mapped[list] = mapped_column(JSON, default=list)
-    timestamp: Mapped[datetime] = mapped_column(DateTime, default=datetime.now(UTC))
+    # 1-based position of this answer within its session
+    sequence: Mapped[int] = mapped_column(default=0, server_default=text("0"), nullable=False)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(UTC))
 
     # Relationship
     session: Mapped["SessionModel"] = relationship("SessionModel", back_populates="scenario_responses")
@@ -76,3 +104,28 @@ class ConversationMessageModel(Base):
 
     # Relationship
     session: Mapped["SessionModel"] = relationship("SessionModel", back_populates="conversation_messages")
+
+
+class ChoiceStatModel(Base):
+    """
+    How often each choice has been picked, per role and scenario.
+    Maintained incrementally alongside scenario_responses.
+    """
+    __tablename__ = "choice_stats"
+
+    role: Mapped[str] = mapped_column(String(20), primary_key=True)
+    scenario_id: Mapped[str] = mapped_column(String(50), primary_key=True)
+    choice_id: Mapped[str] = mapped_column(String(50), primary_key=True)
+    count: Mapped[int] = mapped_column(default=0, server_default=text("0"), nullable=False)
+
+
+class ArchetypeStatModel(Base):
+    """
+    How many stored role profiles resolve to each archetype, per role.
+    Maintained incrementally alongside sessions.role_profile.
+    """
+    __tablename__ = "archetype_stats"
+
+    role: Mapped[str] = mapped_column(String(20), primary_key=True)
+    archetype_id: Mapped[str] = mapped_column(String(50), primary_key=True)
+    count: Mapped[int] = mapped_column(default=0, server_default=text("0"), nullable=False)
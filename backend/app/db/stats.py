@@ -0,0 +1,153 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.db.models import ArchetypeStatModel, ChoiceStatModel, ScenarioResponseModel, SessionModel
+
+
+def profile_archetype_id(role_profile: Dict[str, Any] | None) -> str | None:
+    """Archetype id of a stored role profile, or None if there is none."""
+    if not role_profile:
+        return None
+    archetype = role_profile.get("archetype") or {}
+    return archetype.get("id")
+
+
+@dataclass
+class StatDeltas:
+    """Pending increments to the choice/archetype aggregate tables."""
+    choices: Counter = field(default_factory=Counter)
+    archetypes: Counter = field(default_factory=Counter)
+
+    def __bool__(self) -> bool:
+        return any(self.choices.values()) or any(self.archetypes.values())
+
+    def add_choice(self, role: str, scenario_id: str, choice_id: str, delta: int = 1) -> None:
+        self.choices[(role, scenario_id, choice_id)] += delta
+
+    def change_archetype(self, role: str, previous_id: str | None, new_id: str | None) -> None:
+        """Move one count from the previous final archetype (if any) to the new one."""
+        if previous_id == new_id:
+            return
+        if previous_id is not None:
+            self.archetypes[(role, previous_id)] -= 1
+        if new_id is not None:
+            self.archetypes[(role, new_id)] += 1
+
+    def merge(self, other: "StatDeltas") -> None:
+        self.choices.update(other.choices)
+        self.archetypes.update(other.archetypes)
+
+    def apply(self, db: Session) -> None:
+        """Upsert the deltas inside the caller's transaction (does not commit)."""
+        choices = [
+            {"role": role, "scenario_id": scenario_id, "choice_id": choice_id, "count": delta}
+            for (role, scenario_id, choice_id), delta in self.choices.items()
+            if delta
+        ]
+        archetypes = [
+            {"role": role, "archetype_id": archetype_id, "count": delta}
+            for (role, archetype_id), delta in self.archetypes.items()
+            if delta
+        ]
+        for model, rows, keys in (
+            (ChoiceStatModel, choices, ["role", "scenario_id", "choice_id"]),
+            (ArchetypeStatModel, archetypes, ["role", "archetype_id"]),
+        ):
+            if rows:
+                statement = sqlite_insert(model)
+                db.execute(
+                    statement.on_conflict_do_update(
+                        index_elements=keys,
+                        set_={"count": model.count + statement.excluded.count},
+                    ),
+                    rows,
+                )
+
+
+def choice_counts(db: Session, role: str) -> List[Tuple[str, str, int]]:
+    """(scenario_id, choice_id, count) rows for a role, read from the aggregate table."""
+    rows = db.execute(
+        select(ChoiceStatModel.scenario_id, ChoiceStatModel.choice_id, ChoiceStatModel.count)
+        .where(ChoiceStatModel.role == role, ChoiceStatModel.count > 0)
+        .order_by(ChoiceStatModel.scenario_id, ChoiceStatModel.choice_id)
+    )
+    return [tuple(row) for row in rows]
+
+
+def archetype_counts(db: Session, role: str) -> List[Tuple[str, int]]:
+    """(archetype_id, count) rows for a role, read from the aggregate table."""
+    rows = db.execute(
+        select(ArchetypeStatModel.archetype_id, ArchetypeStatModel.count)
+        .where(ArchetypeStatModel.role == role, ArchetypeStatModel.count > 0)
+        .order_by(ArchetypeStatModel.archetype_id)
+    )
+    return [tuple(row) for row in rows]
+
+
+def stat_deltas_for_sessions(db: Session, session_ids: List[str], sign: int = 1) -> StatDeltas:
+    """Aggregate the stats contributed by the given sessions (sign=-1 to remove them)."""
+    deltas = StatDeltas()
+    choice_rows = db.execute(
+        select(SessionModel.role, ScenarioResponseModel.scenario_id, ScenarioResponseModel.choice_id, func.count())
+        .join(SessionModel, SessionModel.id == ScenarioResponseModel.session_id)
+        .where(ScenarioResponseModel.session_id.in_(session_ids))
+        .group_by(SessionModel.role, ScenarioResponseModel.scenario_id, ScenarioResponseModel.choice_id)
+    )
+    for role, scenario_id, choice_id, count in choice_rows:
+        deltas.add_choice(role, scenario_id, choice_id, sign * count)
+    for role, role_profile in db.execute(
+        select(SessionModel.role, SessionModel.role_profile)
+        .where(SessionModel.id.in_(session_ids), SessionModel.role_profile.is_not(None))
+    ):
+        archetype_id = profile_archetype_id(role_profile)
+        if archetype_id is not None:
+            deltas.archetypes[(role, archetype_id)] += sign
+    return deltas
+
+
+def stats_need_rebuild(db: Session) -> bool:
+    """Whether responses exist that the aggregate tables have never counted (e.g. they predate them)."""
+    return (
+        db.scalar(select(ChoiceStatModel.role).limit(1)) is None
+        and db.scalar(select(ScenarioResponseModel.id).limit(1)) is not None
+    )
+
+
+def rebuild_stats(db: Session) -> Tuple[int, int]:
+    """
+    Recompute both aggregate tables from scenario_responses and stored profiles.
+
+    Choice counts are aggregated in SQL; profiles are read as (role, JSON)
+    rows. Commits, and returns the number of (choice rows, archetype rows).
+    """
+    db.execute(delete(ChoiceStatModel))
+    db.execute(delete(ArchetypeStatModel))
+    db.execute(
+        insert(ChoiceStatModel).from_select(
+            ["role", "scenario_id", "choice_id", "count"],
+            select(SessionModel.role, ScenarioResponseModel.scenario_id, ScenarioResponseModel.choice_id, func.count())
+            .join(SessionModel, SessionModel.id == ScenarioResponseModel.session_id)
+            .group_by(SessionModel.role, ScenarioResponseModel.scenario_id, ScenarioResponseModel.choice_id),
+        )
+    )
+
+    deltas = StatDeltas()
+    for role, role_profile in db.execute(
+        select(SessionModel.role, SessionModel.role_profile)
+        .where(SessionModel.role_profile.is_not(None))
+        .execution_options(yield_per=1000)
+    ):
+        archetype_id = profile_archetype_id(role_profile)
+        if archetype_id is not None:
+            deltas.archetypes[(role, archetype_id)] += 1
+    deltas.apply(db)
+    db.commit()
+
+    choice_rows = db.scalar(select(func.count()).select_from(ChoiceStatModel))
+    archetype_rows = db.scalar(select(func.count()).select_from(ArchetypeStatModel))
+    return choice_rows, archetype_rows
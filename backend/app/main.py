@@ -1,22 +1,113 @@
-from contextlib import asynccontextmanager
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager, contextmanager, suppress
 from pathlib import Path
+from typing import Dict, Iterator
 
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import PlainTextResponse
 from starlette.middleware.cors import CORSMiddleware
 
 from app.config import settings
 from app.api.router import api_router
-from app.db.database import engine
+from app.api.dependencies import get_decision_writer, write_behind_enabled
+from app.db.database import engine, SessionLocal, log_database_profile
+from app.db.migrations import DUPLICATE_RESPONSES_REMOVED, RESPONSES_RESEQUENCED, upgrade_schema
+from app.db.stats import rebuild_stats, stats_need_rebuild
+from app.observability import MetricsMiddleware, render_metrics
 from app.db.models import Base
+from app.services.maintenance import backfill_session_counters, counters_need_backfill, maintenance_loop
+from app.services.content_loader import preload_content
+from app.spa import SpaFiles
+
+
+def configure_logging() -> None:
+    """Route app.* loggers to stderr at the configured level, alongside uvicorn's."""
+    app_logger = logging.getLogger("app")
+    level = "DEBUG" if settings.LOG_LEVEL == "trace" else settings.LOG_LEVEL.upper()
+    app_logger.setLevel(level)
+    if not app_logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(levelname)s:     %(name)s - %(message)s"))
+        app_logger.addHandler(handler)
+        app_logger.propagate = False
+
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
+# Lifespan startup steps of this process (ms), reported by perf/startup.py
+startup_timings: Dict[str, float] = {}
+# Set once prepare_database() has run in this process (or the parent it was forked from)
+_database_prepared = False
+
+
+@contextmanager
+def _startup_step(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_timings[name] = (time.perf_counter() - start) * 1000
+
+
+def prepare_database() -> None:
+    """
+    Create tables, apply schema upgrades and backfill data that predates them.
+
+    The one upgrade path for the app, the multi-worker server and the CLI.
+    Backfills are decided from the data, so they still run when another
+    process applied the schema upgrade.
+    """
+    global _database_prepared
+    with _startup_step("schema"):
+        Base.metadata.create_all(bind=engine)
+        log_database_profile()
+        added_columns = upgrade_schema(engine)
+    duplicates_removed = DUPLICATE_RESPONSES_REMOVED in added_columns
+    with SessionLocal() as db:
+        # Renumbered answers can change the order the path codes follow
+        backfill = duplicates_removed or RESPONSES_RESEQUENCED in added_columns or counters_need_backfill(db)
+        # Seed the analytics aggregates from sessions recorded before they existed,
+        # or recount them without the removed duplicate answers
+        rebuild = duplicates_removed or stats_need_rebuild(db)
+    if backfill:
+        # Existing sessions predate the running counters and response ordering
+        with _startup_step("backfill"), SessionLocal() as db:
+            backfill_session_counters(db)
+    if rebuild:
+        with _startup_step("stats"), SessionLocal() as db:
+            rebuild_stats(db)
+    _database_prepared = True
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Create database tables on startup."""
-    Base.metadata.create_all(bind=engine)
-    yield
+    """Create database tables, preload/validate content and run background writers."""
+    startup_timings.clear()
+    if not _database_prepared:
+        # Forked server workers skip this: the parent prepared the database once for all of them
+        prepare_database()
+    with _startup_step("content"):
+        preload_content()
+
+    if write_behind_enabled():
+        get_decision_writer().start()
+    maintenance_task = None
+    if settings.MAINTENANCE_ENABLED and settings.SESSION_BACKEND == "sqlalchemy":
+        maintenance_task = asyncio.create_task(maintenance_loop(SessionLocal, engine))
+    logger.info("Startup completed in %.2f ms", sum(startup_timings.values()))
+    try:
+        yield
+    finally:
+        if maintenance_task is not None:
+            maintenance_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await maintenance_task
+        if write_behind_enabled():
+            # Drain queued decisions before the process exits
+            get_decision_writer().close()
 
 
 docs_enabled = settings.ENABLE_DOCS and settings.ENVIRONMENT != "production"
@@ -39,18 +130,23 @@ if settings.all_cors_origins:
     allow_headers=["*"],
   )
 
+if settings.METRICS_ENABLED:
+  app.add_middleware(MetricsMiddleware)
+
+  @app.get("/metrics", include_in_schema=False)
+  def metrics() -> PlainTextResponse:
+    """Prometheus text exposition of request and database metrics (of every worker under app.server)."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 app.include_router(router=api_router, prefix=settings.API_V1_STR)
 
-# Serve built frontend (Vite dist) as static files from the "static" directory
-# Only mount if the static directory exists (i.e., in production/Docker)
+# Serve built frontend (Vite dist) from the "static" directory, indexed in memory at startup
+# Only served if the static directory exists (i.e., in production/Docker)
 STATIC_DIR = Path(__file__).parent.parent / "static"
 if STATIC_DIR.exists():
-    app.mount("/assets", StaticFiles(directory=STATIC_DIR / "assets"), name="assets")
-    
-    @app.get("/{full_path:path}")
-    async def serve_spa(full_path: str):
-        """Serve index.html for any non-API route (SPA fallback)."""
-        file_path = STATIC_DIR / full_path
-        if file_path.exists() and file_path.is_file():
-            return FileResponse(file_path)
-        return FileResponse(STATIC_DIR / "index.html")
\ No newline at end of file
+    spa_files = SpaFiles(STATIC_DIR)
+
+    @app.api_route("/{full_path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+    async def serve_spa(full_path: str, request: Request) -> Response:
+        """Serve built files, falling back to index.html for client-side routes."""
+        return spa_files.response(full_path, request.headers)
@@ -1,10 +1,10 @@
 
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 from uuid import UUID
 
 from app.models.enum import Role
-from app.models.session import Scenario, RoleResponse
+from app.models.session import ArchetypeMatch, Scenario, RoleResponse
 
 
 class CreateSessionResponse(BaseModel):
@@ -34,3 +34,40 @@ class DecideResponse(BaseModel):
     is_completed: bool = False
 
 
+class DecisionsRequest(BaseModel):
+    # Consecutive answers starting at the session's current scenario
+    decisions: List[DecideRequest]
+
+
+class DecisionsResponse(BaseModel):
+    next_scenario: Scenario | None
+    scenarios_completed: int
+    total_scenarios: int
+    is_completed: bool = False
+    role_profile: ArchetypeMatch | None = None
+
+
+class SessionBundleResponse(BaseModel):
+    sessionId: UUID
+    role: RoleResponse
+    total_scenarios: int
+    scenarios: List[Scenario]
+
+
+
+
+class ChoiceStat(BaseModel):
+    scenario_id: str
+    choice_id: str
+    count: int
+
+
+class ArchetypeStat(BaseModel):
+    archetype_id: str
+    count: int
+
+
+class RoleStatsResponse(BaseModel):
+    role: Role
+    choices: List[ChoiceStat]
+    archetypes: List[ArchetypeStat]
@@ -1,7 +1,7 @@
 from uuid import UUID
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import datetime
 
 from app.models.enum import Role, WorkflowState
@@ -15,6 +15,8 @@ class Choice(BaseModel):
     traits: List[str]
 
 class RoleResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     id: Role
     name: Optional[str] = None
     description: Optional[str] = None
@@ -0,0 +1,21 @@
+from app.observability.db import QueryLog, TimedQueuePool, assert_max_queries, count_queries, instrument_engine
+from app.observability.metrics import REGISTRY, MetricsRegistry
+from app.observability.middleware import MetricsMiddleware
+from app.observability.shared import SharedMetrics, enable_shared_metrics, render_metrics
+from app.observability.timing import RequestTimings, request_timings
+
+__all__ = [
+    "QueryLog",
+    "TimedQueuePool",
+    "assert_max_queries",
+    "count_queries",
+    "instrument_engine",
+    "REGISTRY",
+    "MetricsRegistry",
+    "MetricsMiddleware",
+    "SharedMetrics",
+    "enable_shared_metrics",
+    "render_metrics",
+    "RequestTimings",
+    "request_timings",
+]
@@ -0,0 +1,87 @@
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterator, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from app.observability.metrics import DB_POOL_WAIT, DB_QUERY_LATENCY
+from app.observability.timing import request_timings
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - start
+            DB_POOL_WAIT.observe(elapsed)
+            timings = request_timings.get()
+            if timings is not None:
+                timings.pool_wait_seconds += elapsed
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    DB_QUERY_LATENCY.observe(elapsed)
+    timings = request_timings.get()
+    if timings is not None:
+        timings.db_queries += 1
+        timings.db_seconds += elapsed
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Record statement count and execution time for `engine` (idempotent)."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@dataclass
+class QueryLog:
+    """Statements executed on an engine while a count_queries() block was active."""
+    statements: List[str] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries(engine: Engine) -> Iterator[QueryLog]:
+    """
+    Record every statement executed on `engine` inside the block, from any thread.
+
+    Meant for tests and ad-hoc profiling, where requests are served one at a
+    time (e.g. by TestClient in its own thread).
+    """
+    log = QueryLog()
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        log.statements.append(statement)
+
+    event.listen(engine, "after_cursor_execute", record)
+    try:
+        yield log
+    finally:
+        event.remove(engine, "after_cursor_execute", record)
+
+
+@contextmanager
+def assert_max_queries(engine: Engine, limit: int) -> Iterator[QueryLog]:
+    """Fail with the executed statements if the block runs more than `limit` of them."""
+    with count_queries(engine) as log:
+        yield log
+    if log.count > limit:
+        statements = "\n".join(f"  {i}. {statement}" for i, statement in enumerate(log.statements, 1))
+        raise AssertionError(f"Expected at most {limit} queries, got {log.count}:\n{statements}")
@@ -0,0 +1,233 @@
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+
+LabelValues = Tuple[str, ...]
+# Metric name -> label values -> value; a picklable copy of a registry's state
+Snapshot = Dict[str, Dict[LabelValues, Any]]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    """Base for a labelled metric family; children are keyed by label values."""
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self, values: Dict[LabelValues, Any] | None = None) -> List[str]:
+        """Exposition lines for `values` (default: this metric's own)."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples(self.snapshot() if values is None else values))
+        return lines
+
+    @abstractmethod
+    def snapshot(self) -> Dict[LabelValues, Any]:
+        """A copy of the current values, keyed by label values."""
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Drop every recorded value."""
+
+    def merge(self, values: Dict[LabelValues, Any], other: Dict[LabelValues, Any]) -> Dict[LabelValues, Any]:
+        """Sum two snapshots of this metric (e.g. from different processes)."""
+        merged = dict(values)
+        for key, value in other.items():
+            merged[key] = self._add(merged[key], value) if key in merged else value
+        return merged
+
+    def _add(self, a: Any, b: Any) -> Any:
+        return a + b
+
+    @abstractmethod
+    def _samples(self, values: Dict[LabelValues, Any]) -> List[str]:
+        """Exposition sample lines for a snapshot of this metric."""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def snapshot(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def _samples(self, values: Dict[LabelValues, float]) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value -= amount
+
+    def value(self) -> float:
+        return self._value
+
+    def snapshot(self) -> Dict[LabelValues, float]:
+        return {(): self._value}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._value = 0.0
+
+    def _samples(self, values: Dict[LabelValues, float]) -> List[str]:
+        return [f"{self.name} {_format_value(values.get((), 0.0))}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [non-cumulative bucket counts..., +Inf count], sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry is not None else 0
+
+    def snapshot(self) -> Dict[LabelValues, Tuple[List[int], float]]:
+        with self._lock:
+            return {key: (list(counts), total[0]) for key, (counts, total) in self._values.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def _add(self, a: Tuple[List[int], float], b: Tuple[List[int], float]) -> Tuple[List[int], float]:
+        return [x + y for x, y in zip(a[0], b[0])], a[1] + b[1]
+
+    def _samples(self, values: Dict[LabelValues, Tuple[List[int], float]]) -> List[str]:
+        lines = []
+        names = self.labelnames + ("le",)
+        for key, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(names, key + (_format_value(bound),))} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """A set of metric families rendered together in Prometheus text format (0.0.4)."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def snapshot(self) -> Snapshot:
+        return {metric.name: metric.snapshot() for metric in self._metrics}
+
+    def reset(self) -> None:
+        for metric in self._metrics:
+            metric.reset()
+
+    def render(self, others: Iterable[Snapshot] = ()) -> str:
+        """Render every metric, summed with the snapshots of other processes' registries."""
+        others = list(others)
+        lines: List[str] = []
+        for metric in self._metrics:
+            values = metric.snapshot()
+            for other in others:
+                values = metric.merge(values, other.get(metric.name, {}))
+            lines.extend(metric.render(values))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests by method, route template and status.", ("method", "route", "status")
+))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served."
+))
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "http_request_duration_seconds",
+    "Time until the response headers were sent, by method, route template and status.",
+    ("method", "route", "status"),
+))
+DB_QUERY_LATENCY = REGISTRY.register(Histogram(
+    "db_query_duration_seconds", "SQL statement execution time.", buckets=DB_BUCKETS
+))
+DB_POOL_WAIT = REGISTRY.register(Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled database connection.", buckets=DB_BUCKETS
+))
@@ -0,0 +1,94 @@
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.observability.metrics import HTTP_IN_FLIGHT, HTTP_LATENCY, HTTP_REQUESTS
+from app.observability.timing import RequestTimings, request_timings
+
+
+logger = logging.getLogger(__name__)
+
+
+def route_template(scope: Scope) -> str:
+    """The matched route's path template (e.g. /api/v1/sessions/{session_id}), or "unmatched"."""
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    path_regex = getattr(route, "path_regex", None)
+    if template is None or path_regex is None:
+        return "unmatched"
+    path = scope["path"]
+    if path_regex.match(path):
+        return template
+    # Routes of included routers may carry their router-local path; recover the prefix
+    for index in range(1, len(path)):
+        if path[index] == "/" and path_regex.match(path[index:]):
+            return path[:index] + template
+    return template
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request count, in-flight requests and
+    latency by route template and status, and adding a Server-Timing header
+    that splits the time to first byte into app and database time. Outside
+    production it also reports each request's SQL statement count in an
+    X-DB-Query-Count header and a log line.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = True, query_report: bool | None = None):
+        self.app = app
+        self.server_timing = server_timing
+        # Per-request query count header and log line, off in production by default
+        self.query_report = settings.ENVIRONMENT != "production" if query_report is None else query_report
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = request_timings.set(timings)
+        start = time.perf_counter()
+        status = 500
+        elapsed = None
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status, elapsed
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed = time.perf_counter() - start
+                headers = MutableHeaders(scope=message)
+                if self.query_report:
+                    headers.append("X-DB-Query-Count", str(timings.db_queries))
+                if self.server_timing:
+                    db_ms = timings.db_seconds * 1000
+                    total_ms = elapsed * 1000
+                    headers.append(
+                        "Server-Timing",
+                        f"app;dur={total_ms - db_ms:.2f}, db;dur={db_ms:.2f}, "
+                        f"pool;dur={timings.pool_wait_seconds * 1000:.2f}, total;dur={total_ms:.2f}",
+                    )
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            request_timings.reset(token)
+            # Template, not the raw path, to keep label cardinality bounded
+            labels = {"method": scope["method"], "route": route_template(scope), "status": str(status)}
+            HTTP_REQUESTS.inc(**labels)
+            if self.query_report:
+                logger.info(
+                    "%s %s %s: %d queries, %.2f ms in database",
+                    labels["method"],
+                    labels["route"],
+                    labels["status"],
+                    timings.db_queries,
+                    timings.db_seconds * 1000,
+                )
+            HTTP_LATENCY.observe(elapsed if elapsed is not None else time.perf_counter() - start, **labels)
@@ -0,0 +1,89 @@
+"""
+Metrics summed across pre-forked worker processes.
+
+Every worker has its own registry, and a scrape of /metrics reaches
+whichever worker accepts the connection. With shared metrics enabled, each
+worker writes a snapshot of its registry to a directory shared by all
+workers (every SNAPSHOT_INTERVAL_SECONDS), and /metrics renders its own live
+values plus the latest snapshot of every other worker.
+"""
+import logging
+import os
+import pickle
+import threading
+from pathlib import Path
+from typing import List
+
+from app.observability.metrics import REGISTRY, MetricsRegistry, Snapshot
+
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_INTERVAL_SECONDS = 1.0
+
+
+class SharedMetrics:
+    """One worker's view of the metrics directory shared by all workers."""
+
+    def __init__(
+        self,
+        directory: Path,
+        slot: int,
+        registry: MetricsRegistry = REGISTRY,
+        interval: float = SNAPSHOT_INTERVAL_SECONDS,
+    ):
+        self.directory = directory
+        # Keyed by slot, so a restarted worker replaces its predecessor's snapshot
+        self.path = directory / f"worker-{slot}.pickle"
+        self.registry = registry
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def write(self) -> None:
+        """Publish this worker's current values."""
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_bytes(pickle.dumps(self.registry.snapshot()))
+        os.replace(tmp_path, self.path)
+
+    def start(self) -> None:
+        threading.Thread(target=self._run, name="shared-metrics", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.write()
+            except OSError:
+                logger.warning("Could not write metrics snapshot to %s", self.path, exc_info=True)
+
+    def _others(self) -> List[Snapshot]:
+        snapshots = []
+        for path in sorted(self.directory.glob("worker-*.pickle")):
+            if path == self.path:
+                continue
+            try:
+                snapshots.append(pickle.loads(path.read_bytes()))
+            except (OSError, EOFError, pickle.UnpicklingError):
+                logger.warning("Skipping unreadable metrics snapshot %s", path, exc_info=True)
+        return snapshots
+
+    def render(self) -> str:
+        return self.registry.render(self._others())
+
+
+_shared: SharedMetrics | None = None
+
+
+def enable_shared_metrics(directory: Path, slot: int) -> SharedMetrics:
+    """Share this process's metrics through `directory` and render all workers' on /metrics."""
+    global _shared
+    _shared = SharedMetrics(directory, slot)
+    _shared.start()
+    return _shared
+
+
+def render_metrics() -> str:
+    """Prometheus text for /metrics: this process only, or every worker when shared."""
+    return _shared.render() if _shared is not None else REGISTRY.render()
@@ -0,0 +1,15 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+
+@dataclass
+class RequestTimings:
+    """Database work accumulated while serving one request (times in seconds)."""
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+
+
+# Set by MetricsMiddleware; the object is shared with the threadpool workers
+# that run sync endpoints (they see a copy of the context, not of the object)
+request_timings: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
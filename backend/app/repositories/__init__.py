@@ -0,0 +1,11 @@
+from app.repositories.base import SessionRepository, ConcurrentUpdateError, DuplicateResponseError
+from app.repositories.memory import InMemorySessionRepository
+from app.repositories.sql import SqlAlchemySessionRepository
+
+__all__ = [
+    "SessionRepository",
+    "ConcurrentUpdateError",
+    "DuplicateResponseError",
+    "InMemorySessionRepository",
+    "SqlAlchemySessionRepository",
+]
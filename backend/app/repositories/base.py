@@ -0,0 +1,111 @@
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from typing import ContextManager, List, Tuple
+from uuid import UUID
+
+from app.db.models import SessionModel, ScenarioResponseModel
+from app.models.enum import Role
+
+
+class DuplicateResponseError(ValueError):
+    """Raised when a session answers the same scenario twice."""
+
+    def __init__(self, session_id: str, scenario_id: str):
+        self.session_id = session_id
+        self.scenario_id = scenario_id
+        super().__init__(f"Scenario {scenario_id} already answered in session {session_id}")
+
+
+class ConcurrentUpdateError(ValueError):
+    """Raised on commit when another unit of work changed the session since it was loaded."""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        super().__init__(f"Session {session_id} was changed by a concurrent request")
+
+
+class SessionRepository(ABC):
+    """
+    Storage boundary for sessions and their scenario responses.
+
+    Records are the ORM classes from app/db/models.py; backends that do not
+    use a database hold them as plain (transient) objects. Callers mutate the
+    returned records and call commit() once per unit of work.
+    """
+
+    @abstractmethod
+    def create_session(self, role: Role) -> SessionModel:
+        """Stage a new, empty session for the given role."""
+
+    @abstractmethod
+    def get_session(self, session_id: UUID) -> SessionModel | None:
+        """Retrieve a session by ID, or None if it does not exist."""
+
+    @abstractmethod
+    def session_version(self, session_id: UUID) -> int | None:
+        """The session's version counter without loading the session, or None if it does not exist."""
+
+    @abstractmethod
+    def add_response(self, session: SessionModel, response: ScenarioResponseModel) -> None:
+        """
+        Stage a scenario response for the session.
+
+        Raises:
+            DuplicateResponseError: If the scenario was already answered
+                (may be raised here or from commit())
+        """
+
+    def add_responses(self, session: SessionModel, responses: List[ScenarioResponseModel]) -> None:
+        """
+        Stage several scenario responses for the session, in order.
+
+        Backends that can write a batch in one statement override this.
+
+        Raises:
+            DuplicateResponseError: If any scenario was already answered
+        """
+        for response in responses:
+            self.add_response(session, response)
+
+    def session_update(self, session: SessionModel) -> ContextManager[object]:
+        """
+        Guard a read-modify-write of the session's running counters.
+
+        Backends that share records between concurrent requests serialize
+        updates here. The default is a no-op for database backends, which
+        give each unit of work its own copy of the row and check its version
+        on commit instead: a unit of work that loaded the session before
+        another one committed fails with ConcurrentUpdateError and changes
+        nothing.
+        """
+        return nullcontext()
+
+    @abstractmethod
+    def commit(self) -> None:
+        """
+        Persist all staged changes as one unit of work.
+
+        Raises:
+            DuplicateResponseError: If a staged response conflicts with a stored one
+            ConcurrentUpdateError: If the session changed since it was loaded
+        """
+
+    @abstractmethod
+    def rollback(self) -> None:
+        """Discard staged changes."""
+
+    @abstractmethod
+    def record_choice(self, role: str, scenario_id: str, choice_id: str) -> None:
+        """Count a picked choice in the analytics aggregates, as part of this unit of work."""
+
+    @abstractmethod
+    def record_profile_change(self, role: str, previous_archetype_id: str | None, archetype_id: str | None) -> None:
+        """Move a session's final-archetype count from its previous profile (if any) to the new one."""
+
+    @abstractmethod
+    def choice_counts(self, role: Role) -> List[Tuple[str, str, int]]:
+        """(scenario_id, choice_id, count) for every choice picked at least once in the role."""
+
+    @abstractmethod
+    def archetype_counts(self, role: Role) -> List[Tuple[str, int]]:
+        """(archetype_id, count) for every archetype that is some stored profile's result."""
@@ -0,0 +1,160 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, UTC
+from typing import Callable, ContextManager, List, Tuple
+from uuid import UUID, uuid4
+
+from app.db.models import SessionModel, ScenarioResponseModel
+from app.models.enum import Role, WorkflowState
+from app.repositories.base import DuplicateResponseError, SessionRepository
+
+
+class InMemorySessionRepository(SessionRepository):
+    """
+    Process-local session repository with LRU capacity and idle TTL eviction.
+
+    Intended for load-test and kiosk deployments that never need durable
+    history. A single instance is shared by all requests; changes apply in
+    place, so commit() and rollback() are no-ops.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 10_000,
+        ttl_seconds: float = 3600,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._sessions: "OrderedDict[str, Tuple[SessionModel, float]]" = OrderedDict()
+        # Reentrant: session_update() holds it across add_response() and record_choice()
+        self._lock = threading.RLock()
+        # Analytics aggregates; unlike sessions these are never evicted
+        self._choice_counts: Counter = Counter()
+        self._archetype_counts: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired sessions from the LRU end, then trim to capacity."""
+        while self._sessions:
+            _, (_, last_access) = next(iter(self._sessions.items()))
+            if now - last_access < self.ttl_seconds:
+                break
+            self._sessions.popitem(last=False)
+        while len(self._sessions) > self.capacity:
+            self._sessions.popitem(last=False)
+
+    def create_session(self, role: Role) -> SessionModel:
+        now = datetime.now(UTC)
+        session = SessionModel(
+            id=str(uuid4()),
+            role=role.value,
+            created_at=now,
+            updated_at=now,
+            current_phase=WorkflowState.SCENARIOS.value,
+            role_profile=None,
+            trait_counts={},
+            scenarios_completed=0,
+            last_scenario_id=None,
+            path_code=0,
+            path_layout=None,
+            version=0,
+        )
+        with self._lock:
+            self._sessions[session.id] = (session, self._clock())
+            self._evict(self._clock())
+        return session
+
+    def get_session(self, session_id: UUID) -> SessionModel | None:
+        key = str(session_id)
+        now = self._clock()
+        with self._lock:
+            entry = self._sessions.get(key)
+            if entry is None:
+                return None
+            session, last_access = entry
+            if now - last_access >= self.ttl_seconds:
+                del self._sessions[key]
+                return None
+            self._sessions[key] = (session, now)
+            self._sessions.move_to_end(key)
+        return session
+
+    def session_version(self, session_id: UUID) -> int | None:
+        session = self.get_session(session_id)
+        return session.version if session is not None else None
+
+    def add_response(self, session: SessionModel, response: ScenarioResponseModel) -> None:
+        with self._lock:
+            if any(r.scenario_id == response.scenario_id for r in session.scenario_responses):
+                raise DuplicateResponseError(session.id, response.scenario_id)
+            if response.id is None:
+                response.id = str(uuid4())
+            if response.timestamp is None:
+                response.timestamp = datetime.now(UTC)
+            response.session_id = session.id
+            session.scenario_responses.append(response)
+        session.updated_at = datetime.now(UTC)
+
+    def add_responses(self, session: SessionModel, responses: List[ScenarioResponseModel]) -> None:
+        # All or nothing: changes here apply in place, so check every scenario before appending any
+        with self._lock:
+            answered = {r.scenario_id for r in session.scenario_responses}
+            for response in responses:
+                if response.scenario_id in answered:
+                    raise DuplicateResponseError(session.id, response.scenario_id)
+                answered.add(response.scenario_id)
+            now = datetime.now(UTC)
+            for response in responses:
+                if response.id is None:
+                    response.id = str(uuid4())
+                if response.timestamp is None:
+                    response.timestamp = now
+                response.session_id = session.id
+                session.scenario_responses.append(response)
+        session.updated_at = datetime.now(UTC)
+
+    def session_update(self, session: SessionModel) -> ContextManager[object]:
+        # Records are shared by all requests: concurrent decides must not lose counter updates
+        return self._lock
+
+    def record_choice(self, role: str, scenario_id: str, choice_id: str) -> None:
+        with self._lock:
+            self._choice_counts[(role, scenario_id, choice_id)] += 1
+
+    def record_profile_change(self, role: str, previous_archetype_id: str | None, archetype_id: str | None) -> None:
+        if previous_archetype_id == archetype_id:
+            return
+        with self._lock:
+            if previous_archetype_id is not None:
+                self._archetype_counts[(role, previous_archetype_id)] -= 1
+            if archetype_id is not None:
+                self._archetype_counts[(role, archetype_id)] += 1
+
+    def choice_counts(self, role: Role) -> List[Tuple[str, str, int]]:
+        with self._lock:
+            return sorted(
+                (scenario_id, choice_id, count)
+                for (stat_role, scenario_id, choice_id), count in self._choice_counts.items()
+                if stat_role == role.value and count > 0
+            )
+
+    def archetype_counts(self, role: Role) -> List[Tuple[str, int]]:
+        with self._lock:
+            return sorted(
+                (archetype_id, count)
+                for (stat_role, archetype_id), count in self._archetype_counts.items()
+                if stat_role == role.value and count > 0
+            )
+
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
@@ -0,0 +1,98 @@
+from datetime import datetime, UTC
+from typing import List, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.db import stats
+from app.db.models import SessionModel, ScenarioResponseModel
+from app.models.enum import Role
+from app.repositories.base import ConcurrentUpdateError, DuplicateResponseError, SessionRepository
+
+
+class SqlAlchemySessionRepository(SessionRepository):
+    """Session repository backed by a SQLAlchemy ORM session (one per request)."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._staged_responses: List[Tuple[str, str]] = []
+        self._stats = stats.StatDeltas()
+
+    def create_session(self, role: Role) -> SessionModel:
+        session = SessionModel(id=str(uuid4()), role=role.value)
+        self.db.add(session)
+        return session
+
+    def get_session(self, session_id: UUID) -> SessionModel | None:
+        return self.db.get(SessionModel, str(session_id))
+
+    def session_version(self, session_id: UUID) -> int | None:
+        return self.db.scalar(select(SessionModel.version).where(SessionModel.id == str(session_id)))
+
+    def add_response(self, session: SessionModel, response: ScenarioResponseModel) -> None:
+        # Added directly rather than via the relationship to avoid lazy-loading it
+        response.session_id = session.id
+        self.db.add(response)
+        self._staged_responses.append((session.id, response.scenario_id))
+
+    def add_responses(self, session: SessionModel, responses: List[ScenarioResponseModel]) -> None:
+        # One executemany INSERT instead of a unit-of-work flush per object
+        now = datetime.now(UTC)
+        rows = [
+            {
+                "id": response.id or str(uuid4()),
+                "session_id": session.id,
+                "scenario_id": response.scenario_id,
+                "choice_id": response.choice_id,
+                "traits": list(response.traits),
+                "sequence": response.sequence,
+                "timestamp": response.timestamp or now,
+            }
+            for response in responses
+        ]
+        try:
+            self.db.execute(insert(ScenarioResponseModel), rows)
+        except IntegrityError:
+            self.rollback()
+            raise DuplicateResponseError(session.id, ",".join(response.scenario_id for response in responses))
+        self._staged_responses.extend((session.id, response.scenario_id) for response in responses)
+
+    def record_choice(self, role: str, scenario_id: str, choice_id: str) -> None:
+        self._stats.add_choice(role, scenario_id, choice_id)
+
+    def record_profile_change(self, role: str, previous_archetype_id: str | None, archetype_id: str | None) -> None:
+        self._stats.change_archetype(role, previous_archetype_id, archetype_id)
+
+    def choice_counts(self, role: Role) -> List[Tuple[str, str, int]]:
+        return stats.choice_counts(self.db, role.value)
+
+    def archetype_counts(self, role: Role) -> List[Tuple[str, int]]:
+        return stats.archetype_counts(self.db, role.value)
+
+    def commit(self) -> None:
+        pending_stats, self._stats = self._stats, stats.StatDeltas()
+        changed_sessions = [record.id for record in self.db.dirty if isinstance(record, SessionModel)]
+        try:
+            # Upserted in the same transaction as the responses they count
+            if pending_stats:
+                pending_stats.apply(self.db)
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            staged, self._staged_responses = self._staged_responses, []
+            session_id, scenario_id = staged[-1] if staged else ("?", "?")
+            raise DuplicateResponseError(session_id, scenario_id)
+        except StaleDataError:
+            # The version check on the sessions UPDATE matched no row
+            self.db.rollback()
+            self._staged_responses = []
+            raise ConcurrentUpdateError(changed_sessions[0] if changed_sessions else "?")
+        self._staged_responses = []
+
+    def rollback(self) -> None:
+        self.db.rollback()
+        self._staged_responses = []
+        self._stats = stats.StatDeltas()
@@ -0,0 +1,427 @@
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, UTC
+from typing import Any, Callable, Deque, Dict, List, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import bindparam, func, insert, inspect, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.db.stats import StatDeltas
+
+from app.db.models import SessionModel, ScenarioResponseModel
+from app.repositories.base import ConcurrentUpdateError, DuplicateResponseError
+from app.repositories.sql import SqlAlchemySessionRepository
+
+
+logger = logging.getLogger(__name__)
+
+# Flush attempts close() makes for a queue the database keeps rejecting
+CLOSE_RETRIES = 5
+
+
+@dataclass(frozen=True)
+class PendingWrite:
+    """One committed unit of work waiting to be flushed: new responses plus the session state after them."""
+    session_id: str
+    responses: Tuple[Dict[str, Any], ...]
+    state: Dict[str, Any]
+    stats: StatDeltas
+    # The session version the unit of work started from
+    base_version: int
+
+    @property
+    def version(self) -> int:
+        return self.state["version"]
+
+
+class DecisionWriter:
+    """
+    Background group-commit writer for scenario responses.
+
+    Request threads submit PendingWrites; a single writer thread drains them
+    in batches of up to `batch_size`, or every `flush_interval` seconds, and
+    writes each batch in one transaction. Until a write is flushed it stays
+    visible through pending_for() so reads can overlay it. A session's
+    writes are accepted in version order only, so of two updates started
+    from the same version the second is rejected instead of overwriting the
+    first. A batch that fails for a transient reason (e.g. "database is
+    locked") goes back to the front of the queue and is retried with
+    exponential backoff, from `retry_backoff` up to `max_retry_backoff`
+    seconds; writes that fail for any other reason are dropped.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        batch_size: int = 100,
+        flush_interval: float = 0.05,
+        max_pending: int = 10_000,
+        retry_backoff: float = 0.1,
+        max_retry_backoff: float = 5.0,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+
+        self._queue: Deque[PendingWrite] = deque()
+        self._pending: Dict[str, List[PendingWrite]] = {}
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._closing = False
+
+        self.flushed_writes = 0
+        self.flushed_batches = 0
+        self.dropped_writes = 0
+        self.failed_flushes = 0
+
+    def start(self) -> None:
+        """Start the background writer thread."""
+        if self._thread is not None:
+            return
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name="decision-writer", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float | None = None) -> None:
+        """Stop accepting writes and drain everything still queued."""
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        # Drain whatever the thread did not get to (or everything, if never started)
+        failures = 0
+        while True:
+            try:
+                if not self.flush():
+                    return
+                failures = 0
+            except Exception:
+                failures += 1
+                if failures > CLOSE_RETRIES:
+                    logger.error("Decision writer closed with %d writes unflushed", self.pending_count())
+                    return
+                time.sleep(self._backoff(failures))
+
+    def submit(self, write: PendingWrite) -> None:
+        """
+        Queue a write, blocking while the queue is at capacity.
+
+        Raises:
+            ConcurrentUpdateError: If another write for the session was accepted
+                since the version this one started from
+        """
+        with self._condition:
+            if self._closing:
+                raise RuntimeError("Decision writer is shut down")
+            while len(self._queue) >= self.max_pending and self._thread is not None:
+                self._condition.wait()
+            # Writes leave _pending only once stored, so without any the database is current
+            pending = self._pending.get(write.session_id)
+            current = pending[-1].version if pending else self._stored_version(write.session_id)
+            if current != write.base_version:
+                raise ConcurrentUpdateError(write.session_id)
+            self._queue.append(write)
+            self._pending.setdefault(write.session_id, []).append(write)
+            if len(self._queue) >= self.batch_size:
+                self._condition.notify_all()
+
+    def pending_for(self, session_id: str) -> List[PendingWrite]:
+        """Snapshot of a session's writes that are not yet durable, oldest first."""
+        with self._condition:
+            return list(self._pending.get(session_id, ()))
+
+    def pending_count(self) -> int:
+        with self._condition:
+            return len(self._queue)
+
+    def _stored_version(self, session_id: str) -> int:
+        with self.session_factory() as db:
+            return db.scalar(select(SessionModel.version).where(SessionModel.id == session_id)) or 0
+
+    def _backoff(self, failures: int) -> float:
+        return min(self.retry_backoff * 2 ** (failures - 1), self.max_retry_backoff)
+
+    def _run(self) -> None:
+        failures = 0
+        while True:
+            with self._condition:
+                deadline = time.monotonic() + (self._backoff(failures) if failures else self.flush_interval)
+                # While backing off, a full batch does not cut the wait short
+                while not self._closing and (failures or len(self._queue) < self.batch_size):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if self._closing:
+                    # close() drains the rest, with its own bounded retries
+                    return
+            try:
+                self.flush()
+                failures = 0
+            except Exception:
+                # flush() put the batch back; back off before the next attempt
+                failures += 1
+
+    def flush(self) -> int:
+        """
+        Write up to one batch synchronously. Returns the number of writes taken off the queue.
+
+        Raises:
+            SQLAlchemyError: If the batch could not be written for a reason other
+                than conflicting rows; its unwritten writes are back at the front
+                of the queue and still visible through pending_for()
+        """
+        with self._flush_lock:
+            with self._condition:
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            if not batch:
+                return 0
+
+            # Writes whose outcome is final (stored or dropped), in batch order
+            settled: List[PendingWrite] = []
+            try:
+                try:
+                    self._write(batch)
+                    settled = batch
+                except IntegrityError:
+                    # Something in the batch conflicts (e.g. a racing duplicate); isolate it
+                    self._write_each(batch, settled)
+                except SQLAlchemyError:
+                    raise
+                except Exception:
+                    # Not the database being unavailable, so retrying the batch will not help
+                    logger.exception("Decision writer batch failed, writing it one write at a time")
+                    self._write_each(batch, settled)
+            except Exception:
+                retry = batch[len(settled):]
+                self.failed_flushes += 1
+                logger.warning(
+                    "Decision writer flush failed, retrying %d writes", len(retry), exc_info=True
+                )
+                with self._condition:
+                    self._queue.extendleft(reversed(retry))
+                raise
+            finally:
+                with self._condition:
+                    for write in settled:
+                        writes = self._pending.get(write.session_id)
+                        if writes is not None:
+                            writes.remove(write)
+                            if not writes:
+                                del self._pending[write.session_id]
+                    self._condition.notify_all()
+
+            self.flushed_writes += len(batch)
+            self.flushed_batches += 1
+            return len(batch)
+
+    def _write_each(self, batch: List[PendingWrite], settled: List[PendingWrite]) -> None:
+        """Write a failed batch one write at a time, dropping the writes that fail on their own."""
+        for write in batch:
+            try:
+                self._write([write])
+            except IntegrityError:
+                self.dropped_writes += 1
+                logger.error(
+                    "Dropped pending decision for session %s: conflicts with stored responses",
+                    write.session_id,
+                )
+            except SQLAlchemyError:
+                raise
+            except Exception:
+                self.dropped_writes += 1
+                logger.exception("Dropped pending decision for session %s: write failed", write.session_id)
+            settled.append(write)
+
+    def _write(self, batch: List[PendingWrite]) -> None:
+        """Insert all responses, apply each session's latest state and the summed stats in one transaction."""
+        rows = [row for write in batch for row in write.responses]
+        stats = StatDeltas()
+        for write in batch:
+            stats.merge(write.stats)
+        latest: Dict[str, Dict[str, Any]] = {}
+        for write in batch:
+            state = dict(write.state, id=write.session_id)
+            if state.get("role_profile") is None:
+                state.pop("role_profile", None)
+                # Keep a profile set by an earlier write in this batch
+                previous = latest.get(write.session_id)
+                if previous is not None and "role_profile" in previous:
+                    state["role_profile"] = previous["role_profile"]
+            latest[write.session_id] = state
+
+        # Versions only move forward, even past a direct update such as a re-scoring run
+        versions = [
+            {"b_id": session_id, "b_version": state.pop("version")}
+            for session_id, state in latest.items()
+            if "version" in state
+        ]
+
+        with self.session_factory() as db:
+            if rows:
+                db.execute(insert(ScenarioResponseModel), rows)
+            sessions = SessionModel.__table__
+            with_profile = [state for state in latest.values() if "role_profile" in state]
+            without_profile = [state for state in latest.values() if "role_profile" not in state]
+            for states in (with_profile, without_profile):
+                if states:
+                    # Core executemany: the ORM's bulk UPDATE would demand the version it checks
+                    columns = [key for key in states[0] if key != "id"]
+                    db.execute(
+                        update(sessions)
+                        .where(sessions.c.id == bindparam("b_id"))
+                        .values({key: bindparam(f"b_{key}") for key in columns}),
+                        [{f"b_{key}": value for key, value in state.items()} for state in states],
+                    )
+            if versions:
+                db.execute(
+                    update(sessions)
+                    .where(sessions.c.id == bindparam("b_id"))
+                    .values(version=func.max(sessions.c.version, bindparam("b_version"))),
+                    versions,
+                )
+            if stats:
+                stats.apply(db)
+            db.commit()
+
+
+class WriteBehindSessionRepository(SqlAlchemySessionRepository):
+    """
+    SQLAlchemy repository that hands committed session changes to a DecisionWriter.
+
+    Session creation is still committed inline; units of work that add
+    responses or change an existing session are validated synchronously,
+    queued, and made durable by the writer, which accepts each session's
+    changes in version order (a stale unit of work fails with
+    ConcurrentUpdateError). Reads overlay the session's pending state
+    (counters, last scenario, profile) as if it were stored, so a client
+    always sees its own decisions; the scenario_responses relationship
+    reflects flushed rows only.
+    """
+
+    def __init__(self, db: Session, writer: DecisionWriter):
+        super().__init__(db)
+        self.writer = writer
+        self._staged: List[ScenarioResponseModel] = []
+        self._staged_session: SessionModel | None = None
+
+    def get_session(self, session_id: UUID) -> SessionModel | None:
+        # Snapshot before loading so a write flushed in between is either
+        # in the loaded row or still in the snapshot, never in neither
+        pending = self.writer.pending_for(str(session_id))
+        session = super().get_session(session_id)
+        if session is None or not pending:
+            return session
+
+        latest = pending[-1]
+        if latest.version > (session.version or 0):
+            for field, value in latest.state.items():
+                if field == "role_profile" and value is None:
+                    continue
+                # As the loaded value, not a change: an inline commit must not write it
+                set_committed_value(session, field, value)
+        return session
+
+    def session_version(self, session_id: UUID) -> int | None:
+        pending = self.writer.pending_for(str(session_id))
+        version = super().session_version(session_id)
+        if version is None or not pending:
+            return version
+        return max(version, pending[-1].state["version"])
+
+    def add_response(self, session: SessionModel, response: ScenarioResponseModel) -> None:
+        pending_ids = {
+            row["scenario_id"]
+            for write in self.writer.pending_for(session.id)
+            for row in write.responses
+        }
+        pending_ids.update(r.scenario_id for r in self._staged)
+        if response.scenario_id in pending_ids or self._is_stored(session.id, response.scenario_id):
+            raise DuplicateResponseError(session.id, response.scenario_id)
+
+        response.session_id = session.id
+        if response.id is None:
+            response.id = str(uuid4())
+        if response.timestamp is None:
+            response.timestamp = datetime.now(UTC)
+        self._staged.append(response)
+        self._staged_session = session
+
+    def add_responses(self, session: SessionModel, responses: List[ScenarioResponseModel]) -> None:
+        # Staged one by one; the writer inserts the whole unit of work with one executemany
+        for response in responses:
+            self.add_response(session, response)
+
+    def _is_stored(self, session_id: str, scenario_id: str) -> bool:
+        return self.db.scalar(
+            select(ScenarioResponseModel.id)
+            .where(
+                ScenarioResponseModel.session_id == session_id,
+                ScenarioResponseModel.scenario_id == scenario_id,
+            )
+            .limit(1)
+        ) is not None
+
+    def _changed_session(self) -> SessionModel | None:
+        changed = [record for record in self.db.dirty if isinstance(record, SessionModel)]
+        return changed[0] if changed else None
+
+    def commit(self) -> None:
+        session = self._staged_session or self._changed_session()
+        if session is None:
+            super().commit()
+            return
+
+        write = PendingWrite(
+            session_id=session.id,
+            responses=tuple(
+                {
+                    "id": r.id,
+                    "session_id": r.session_id,
+                    "scenario_id": r.scenario_id,
+                    "choice_id": r.choice_id,
+                    "traits": list(r.traits),
+                    "sequence": r.sequence,
+                    "timestamp": r.timestamp,
+                }
+                for r in self._staged
+            ),
+            state={
+                "trait_counts": dict(session.trait_counts or {}),
+                "scenarios_completed": session.scenarios_completed,
+                "last_scenario_id": session.last_scenario_id,
+                "path_code": session.path_code,
+                "path_layout": session.path_layout,
+                "role_profile": session.role_profile,
+                "version": session.version,
+                "updated_at": datetime.now(UTC),
+            },
+            stats=self._stats,
+            # Version as loaded (or overlaid), before this unit of work bumped it
+            base_version=inspect(session).committed_state.get("version", session.version) or 0,
+        )
+        self._stats = StatDeltas()
+        self._staged = []
+        self._staged_session = None
+        try:
+            self.writer.submit(write)
+        finally:
+            # The writer owns persistence now (or rejected the write); drop the in-session changes
+            self.db.rollback()
+
+    def rollback(self) -> None:
+        self._staged = []
+        self._staged_session = None
+        super().rollback()
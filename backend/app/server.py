@@ -0,0 +1,216 @@
+"""
+Multi-worker server: pre-forked uvicorn workers sharing preloaded content.
+
+The parent prepares the database, loads every role's content (registry,
+scenario indexes, archetypes, scoring matrices, outcome tables) and binds
+the listening socket, then forks WORKERS processes that accept from it;
+the workers' app startup skips both steps.
+Content is parsed once and shared copy-on-write: the collector is kept off
+the preloaded objects (gc.disable/gc.freeze) so workers do not dirty their
+pages. The parent closes its database connections before forking, so every
+worker opens its own SQLite connections. Workers that exit are restarted;
+SIGTERM/SIGINT on the parent shuts them down gracefully.
+
+State that lives in one process is shared or avoided: workers publish their
+metrics to a shared directory so /metrics reports all of them, admin
+re-scoring runs are serialized with a lock file, and backends that keep
+sessions or queued decisions in process memory run a single worker.
+
+Usage (from backend/):
+    python -m app.server                          # one worker per available core
+    WORKERS=4 SERVER_HOST=0.0.0.0 python -m app.server
+"""
+import gc
+import logging
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+
+import uvicorn
+
+from app.config import settings
+
+
+# Named explicitly: under `python -m app.server` __name__ is "__main__", outside the app.* loggers
+logger = logging.getLogger("app.server")
+
+# Exit status of a worker whose app failed to start (uvicorn's own STARTUP_FAILURE)
+STARTUP_FAILURE = 3
+# A worker that dies sooner than this after being forked is restarted after a delay
+MIN_WORKER_UPTIME_SECONDS = 1.0
+RESTART_DELAY_SECONDS = 1.0
+# Extra time over UVICORN_TIMEOUT_GRACEFUL_SHUTDOWN before workers are killed
+SHUTDOWN_GRACE_SECONDS = 5
+
+
+def worker_count() -> int:
+    """Configured WORKERS, or the number of cores this process may run on."""
+    if settings.WORKERS > 0:
+        return settings.WORKERS
+    return os.process_cpu_count() or 1
+
+
+def single_worker_reason() -> str | None:
+    """Why the configured backends cannot be shared by several workers, if they cannot."""
+    if settings.SESSION_BACKEND == "memory":
+        return "SESSION_BACKEND=memory keeps sessions in one process"
+    if settings.WRITE_BEHIND_ENABLED:
+        # Queued decisions are only visible to the process that accepted them
+        return "WRITE_BEHIND_ENABLED keeps unflushed decisions in one process"
+    return None
+
+
+def preload() -> uvicorn.Config:
+    """Import the app, prepare the database and load all content in the parent process."""
+    from app.db.database import engine
+    from app.main import app, prepare_database
+    from app.services.content_loader import preload_content
+
+    prepare_database()
+    preload_content()
+    # Forked workers must not inherit pooled connections
+    engine.dispose()
+    return uvicorn.Config(
+        app,
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        timeout_keep_alive=settings.UVICORN_TIMEOUT_KEEP_ALIVE,
+        timeout_graceful_shutdown=settings.UVICORN_TIMEOUT_GRACEFUL_SHUTDOWN,
+        log_level=settings.LOG_LEVEL,
+    )
+
+
+def run_worker(config: uvicorn.Config, sock: socket.socket, slot: int, metrics_dir: Path | None = None) -> int:
+    """Serve `sock` in a freshly forked worker; returns the process exit status."""
+    from app.db.database import engine
+    from app.observability import REGISTRY, enable_shared_metrics
+
+    # Own process group: terminal signals reach only the parent, which forwards one SIGTERM
+    os.setpgid(0, 0)
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGALRM):
+        signal.signal(signum, signal.SIG_DFL)
+    gc.enable()
+    # Drop any inherited pool state without closing connections the parent owns
+    engine.dispose(close=False)
+    if slot != 0:
+        # One idle-session sweeper is enough for the shared database file
+        settings.MAINTENANCE_ENABLED = False
+    if metrics_dir is not None:
+        # Values recorded by the parent while preloading would be counted once per worker
+        REGISTRY.reset()
+        enable_shared_metrics(metrics_dir, slot)
+
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+    return 0 if server.started else STARTUP_FAILURE
+
+
+class Supervisor:
+    """Forks workers on a shared listening socket and restarts any that exit."""
+
+    def __init__(self, config: uvicorn.Config, sock: socket.socket, workers: int, metrics_dir: Path | None = None):
+        self.config = config
+        self.sock = sock
+        self.workers = workers
+        self.metrics_dir = metrics_dir
+        # pid -> (worker slot, monotonic start time)
+        self.children: Dict[int, Tuple[int, float]] = {}
+        self.stopping = False
+        self.exit_code = 0
+
+    def spawn(self, slot: int) -> int:
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                status = run_worker(self.config, self.sock, slot, self.metrics_dir)
+            except BaseException:
+                logger.exception("Worker %d crashed", slot)
+            finally:
+                # Never return into the parent's code (or run its atexit handlers) from a worker
+                os._exit(status)
+        self.children[pid] = (slot, time.monotonic())
+        logger.info("Started worker %d (pid %d)", slot, pid)
+        return pid
+
+    def signal_children(self, signum: int) -> None:
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def stop(self, signum: int = signal.SIGTERM, frame: object = None) -> None:
+        """Ask every worker to finish in-flight requests and exit; kill stragglers after the grace period."""
+        if self.stopping:
+            return
+        self.stopping = True
+        logger.info("Received %s, stopping %d workers", signal.Signals(signum).name, len(self.children))
+        self.signal_children(signal.SIGTERM)
+        signal.signal(signal.SIGALRM, lambda *_: self.signal_children(signal.SIGKILL))
+        signal.alarm(settings.UVICORN_TIMEOUT_GRACEFUL_SHUTDOWN + SHUTDOWN_GRACE_SECONDS)
+
+    def run(self) -> int:
+        """Start the workers and supervise them until stopped; returns the exit status."""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        # Move everything allocated so far out of the collector's reach before sharing it
+        gc.freeze()
+        for slot in range(self.workers):
+            self.spawn(slot)
+
+        while self.children:
+            pid, status = os.waitpid(-1, 0)
+            if pid not in self.children:
+                continue
+            slot, started = self.children.pop(pid)
+            code = os.waitstatus_to_exitcode(status)
+            if self.stopping:
+                continue
+            if code == STARTUP_FAILURE:
+                logger.error("Worker %d (pid %d) failed to start the app, shutting down", slot, pid)
+                self.exit_code = STARTUP_FAILURE
+                self.stop()
+                continue
+            logger.warning("Worker %d (pid %d) exited with status %d, restarting", slot, pid, code)
+            if time.monotonic() - started < MIN_WORKER_UPTIME_SECONDS:
+                time.sleep(RESTART_DELAY_SECONDS)
+            if not self.stopping:
+                self.spawn(slot)
+
+        signal.alarm(0)
+        logger.info("All workers stopped")
+        return self.exit_code
+
+
+def serve() -> int:
+    """Preload, bind and run the configured number of supervised workers."""
+    # Collections in the parent would leave freed holes across the pages workers share
+    gc.disable()
+    config = preload()
+    workers = worker_count()
+    reason = single_worker_reason()
+    if workers > 1 and reason is not None:
+        logger.warning("%s, running 1 worker instead of %d", reason, workers)
+        workers = 1
+    metrics_dir = None
+    if workers > 1 and settings.METRICS_ENABLED:
+        metrics_dir = Path(tempfile.mkdtemp(prefix="startup-simulator-metrics-"))
+    sock = config.bind_socket()
+    logger.info("Serving with %d workers", workers)
+    try:
+        return Supervisor(config, sock, workers, metrics_dir).run()
+    finally:
+        sock.close()
+        if metrics_dir is not None:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(serve())
@@ -0,0 +1,23 @@
+from app.models.enum import Role
+from app.models.schemas import ArchetypeStat, ChoiceStat, RoleStatsResponse
+from app.repositories import SessionRepository
+
+
+def get_role_stats(repo: SessionRepository, role: Role) -> RoleStatsResponse:
+    """
+    Choice pick counts and final-archetype counts for a role.
+
+    Read from the incrementally maintained aggregates, so the cost depends on
+    the size of the role's content, not on the number of sessions.
+    """
+    return RoleStatsResponse(
+        role=role,
+        choices=[
+            ChoiceStat(scenario_id=scenario_id, choice_id=choice_id, count=count)
+            for scenario_id, choice_id, count in repo.choice_counts(role)
+        ],
+        archetypes=[
+            ArchetypeStat(archetype_id=archetype_id, count=count)
+            for archetype_id, count in repo.archetype_counts(role)
+        ],
+    )
@@ -1,6 +1,10 @@
+import heapq
 import json
+import threading
+from array import array
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
 
 from app.models.enum import Role
 from app.models.session import Archetype, ArchetypeMatch
@@ -11,6 +15,94 @@ from app.services.roles import get_role_by_id
 ARCHETYPES_DIR = Path(__file__).resolve().parents[2] / "data" / "archetypes"
 
 _archetypes_cache: Dict[Role, List[Archetype]] = {}
+# Single-flight guard so concurrent first requests parse each file only once
+_archetypes_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ArchetypeMatrix:
+    """
+    Precomputed archetype x trait incidence matrix for one role.
+
+    Trait ids are interned to column numbers; each column lists the archetype
+    rows that score that trait (once per occurrence in key_traits). Scoring a
+    trait vector is a sparse matrix-vector product over its non-zero traits,
+    followed by a top-k selection in report order.
+    """
+    archetypes: Tuple[Archetype, ...]
+    trait_ids: Mapping[str, int]
+    columns: Tuple[array, ...]
+    row_sizes: array
+    name_rank: array
+
+    @classmethod
+    def build(cls, archetypes: Sequence[Archetype]) -> "ArchetypeMatrix":
+        trait_ids: Dict[str, int] = {}
+        columns: List[array] = []
+        for row, archetype in enumerate(archetypes):
+            for trait in archetype.key_traits:
+                if trait not in trait_ids:
+                    trait_ids[trait] = len(columns)
+                    columns.append(array("l"))
+                columns[trait_ids[trait]].append(row)
+
+        name_rank = array("l", [0] * len(archetypes))
+        by_name = sorted(range(len(archetypes)), key=lambda i: archetypes[i].name)
+        for rank, row in enumerate(by_name):
+            name_rank[row] = rank
+
+        return cls(
+            archetypes=tuple(archetypes),
+            trait_ids=trait_ids,
+            columns=tuple(columns),
+            row_sizes=array("l", [len(a.key_traits) for a in archetypes]),
+            name_rank=name_rank,
+        )
+
+    def multiply(self, trait_scores: Mapping[str, int]) -> Tuple[List[int], List[int]]:
+        """Per-archetype (score, matched trait count) for one trait vector."""
+        n = len(self.archetypes)
+        scores = [0] * n
+        matched = [0] * n
+        for trait, count in trait_scores.items():
+            if count <= 0:
+                continue
+            column = self.trait_ids.get(trait)
+            if column is None:
+                continue
+            for row in self.columns[column]:
+                scores[row] += count
+                matched[row] += 1
+        return scores, matched
+
+    def rank(self, trait_scores: Mapping[str, int], top_k: int | None = None) -> List[Tuple[int, int, float]]:
+        """(row, score, coverage) ordered by score desc, coverage desc, name asc."""
+        scores, matched = self.multiply(trait_scores)
+        coverage = [
+            (matched[row] / size) if size else 0.0
+            for row, size in enumerate(self.row_sizes)
+        ]
+        key = lambda row: (-scores[row], -coverage[row], self.name_rank[row])
+        rows = range(len(self.archetypes))
+        if top_k is not None and top_k < len(rows):
+            ordered = heapq.nsmallest(top_k, rows, key=key)
+        else:
+            ordered = sorted(rows, key=key)
+        return [(row, scores[row], coverage[row]) for row in ordered]
+
+    def match(self, row: int, score: int, coverage: float, trait_scores: Mapping[str, int]) -> ArchetypeMatch:
+        archetype = self.archetypes[row]
+        matched = [t for t in archetype.key_traits if trait_scores.get(t, 0) > 0]
+        return ArchetypeMatch(
+            archetype=archetype,
+            score=score,
+            matched_traits=matched,
+            missing_traits=[t for t in archetype.key_traits if t not in matched],
+            coverage=coverage,
+        )
+
+
+_matrix_cache: Dict[Role, ArchetypeMatrix] = {}
 
 
 
@@ -46,9 +138,27 @@ def _load_archetypes_for_role(role: Role) -> List[Archetype]:
 
 def get_archetypes_for_role(role: Role) -> List[Archetype]:
     """Get all archetypes for a role (cached)."""
-    if role not in _archetypes_cache:
-        _archetypes_cache[role] = _load_archetypes_for_role(role)
-    return _archetypes_cache[role]
+    archetypes = _archetypes_cache.get(role)
+    if archetypes is None:
+        with _archetypes_lock:
+            archetypes = _archetypes_cache.get(role)
+            if archetypes is None:
+                archetypes = _load_archetypes_for_role(role)
+                _archetypes_cache[role] = archetypes
+    return archetypes
+
+
+def get_archetype_matrix(role: Role) -> ArchetypeMatrix:
+    """Get the compiled scoring matrix for a role (cached)."""
+    matrix = _matrix_cache.get(role)
+    if matrix is None:
+        archetypes = get_archetypes_for_role(role)
+        with _archetypes_lock:
+            matrix = _matrix_cache.get(role)
+            if matrix is None:
+                matrix = ArchetypeMatrix.build(archetypes)
+                _matrix_cache[role] = matrix
+    return matrix
 
 
 def get_archetype_by_id(role: Role, archetype_id: str) -> Archetype | None:
@@ -69,6 +179,30 @@ def get_archetype_by_name(role: Role, name: str) -> Archetype | None:
 
 
 
+def score_batch(
+    role: Role,
+    trait_matrix: Sequence[Mapping[str, int]],
+    top_k: int | None = None,
+) -> List[List[ArchetypeMatch]]:
+    """Rank archetypes for many trait vectors at once.
+
+    Each row of trait_matrix maps trait id -> count. Every result list is
+    ordered by (score desc, coverage desc, name asc) and truncated to top_k
+    when given; an empty trait vector yields an empty list.
+    """
+    matrix = get_archetype_matrix(role)
+    reports: List[List[ArchetypeMatch]] = []
+    for trait_scores in trait_matrix:
+        if not trait_scores:
+            reports.append([])
+            continue
+        reports.append([
+            matrix.match(row, score, coverage, trait_scores)
+            for row, score, coverage in matrix.rank(trait_scores, top_k)
+        ])
+    return reports
+
+
 def generate_archetype_report(role: Role, trait_scores: Dict[str, int]) -> List[ArchetypeMatch]:
     """Rank archetypes for a role by how well trait_scores align.
 
@@ -76,33 +210,10 @@ def generate_archetype_report(role: Role, trait_scores: Dict[str, int]) -> List[
     - coverage: proportion of key_traits that appear (non-zero) in trait_scores
     Returns detailed matches sorted by (score desc, coverage desc, name asc).
     """
-    archetypes = get_archetypes_for_role(role)
-
-    if not trait_scores:
-        return []
-
-    matches: List[ArchetypeMatch] = []
-    for archetype in archetypes:
-        matched = [t for t in archetype.key_traits if trait_scores.get(t, 0) > 0]
-        missing = [t for t in archetype.key_traits if t not in matched]
-        score = sum(trait_scores.get(t, 0) for t in matched)
-        coverage = (len(matched) / len(archetype.key_traits)) if archetype.key_traits else 0.0
-
-        matches.append(
-            ArchetypeMatch(
-                archetype=archetype,
-                score=score,
-                matched_traits=matched,
-                missing_traits=missing,
-                coverage=coverage,
-            )
-        )
-
-    matches.sort(key=lambda m: (-m.score, -m.coverage, m.archetype.name))
-    return matches
+    return score_batch(role, [trait_scores])[0]
 
 
 def get_top_archetype(role: Role, trait_scores: Dict[str, int]) -> Optional[ArchetypeMatch]:
     """Convenience: return the best matching archetype or None when no scores."""
-    report = generate_archetype_report(role, trait_scores)
-    return report[0] if report else None
\ No newline at end of file
+    report = score_batch(role, [trait_scores], top_k=1)[0]
+    return report[0] if report else None
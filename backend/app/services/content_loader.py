@@ -0,0 +1,351 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pydantic
+
+from app.config import settings
+from app.models.enum import Role
+from app.services import archetype_engine, outcome_table, roles, scenario_engine
+from app.services.roles import ROLES_FILE, fetch_roles, get_roles_registry
+
+
+logger = logging.getLogger(__name__)
+
+
+class ContentValidationError(ValueError):
+    """Raised when the bundled roles/scenarios/archetypes data is inconsistent."""
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__("Invalid content: " + "; ".join(errors))
+
+
+@dataclass
+class ContentReport:
+    """Outcome of a content preload: per-step timings (ms) and non-fatal warnings."""
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+    warnings: List[str] = field(default_factory=list)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(self.timings_ms.values())
+
+
+_fingerprint: str | None = None
+
+
+def content_fingerprint() -> str:
+    """
+    Hash of the roles, scenarios and archetypes files the process serves.
+
+    Computed once; content is only read at startup, so it cannot change
+    without a restart. Used to derive ETags for content-backed responses.
+    """
+    global _fingerprint
+    if _fingerprint is None:
+        digest = hashlib.sha256()
+        paths = [ROLES_FILE]
+        for role in Role:
+            paths.append(scenario_engine.SCENARIOS_DIR / f"{role.value}.json")
+            paths.append(archetype_engine.ARCHETYPES_DIR / f"{role.value}.json")
+        for path in paths:
+            digest.update(path.name.encode())
+            digest.update(path.read_bytes())
+        _fingerprint = digest.hexdigest()[:16]
+    return _fingerprint
+
+
+def _read_json(path: Path) -> List[Dict[str, Any]]:
+    if not path.exists():
+        return []
+    content = path.read_text()
+    return json.loads(content) if content.strip() else []
+
+
+def check_references() -> None:
+    """
+    Check the references in the raw data files, before any model is built from them.
+
+    The models cannot express these mistakes: a choice's scenario is implied
+    by where it is nested, a scenario's successor by its `order`, and the
+    loaders trust each item's `role`.
+
+    Raises:
+        ContentValidationError: On a choice, scenario order or role that points at the wrong place
+    """
+    errors: List[str] = []
+    for role in Role:
+        scenarios = _read_json(scenario_engine.SCENARIOS_DIR / f"{role.value}.json")
+        scenario_ids = {scenario.get("id") for scenario in scenarios}
+        orders: Dict[Any, str] = {}
+        for scenario in scenarios:
+            scenario_id = scenario.get("id")
+            if scenario.get("role") != role.value:
+                errors.append(f"{role.value}: scenario '{scenario_id}' belongs to role '{scenario.get('role')}'")
+            order = scenario.get("order", 0)
+            if order in orders:
+                errors.append(
+                    f"{role.value}: scenarios '{orders[order]}' and '{scenario_id}' share order {order}, "
+                    "so the next scenario is ambiguous"
+                )
+            orders.setdefault(order, scenario_id)
+            for choice in scenario.get("choices", []):
+                referenced = choice.get("scenario_id", scenario_id)
+                if referenced != scenario_id:
+                    where = "an unknown scenario" if referenced not in scenario_ids else f"scenario '{referenced}'"
+                    errors.append(
+                        f"{role.value}: choice '{choice.get('id')}' references {where} ('{referenced}') "
+                        f"but is defined in '{scenario_id}'"
+                    )
+
+        for archetype in _read_json(archetype_engine.ARCHETYPES_DIR / f"{role.value}.json"):
+            if archetype.get("role") != role.value:
+                errors.append(f"{role.value}: archetype '{archetype.get('id')}' belongs to role '{archetype.get('role')}'")
+
+    if errors:
+        raise ContentValidationError(errors)
+
+
+def validate_content() -> List[str]:
+    """
+    Check the loaded roles, scenarios and archetypes for consistency.
+
+    Returns a list of warnings (traits that no archetype scores).
+
+    Raises:
+        ContentValidationError: On duplicate ids, untracked traits or missing content
+    """
+    errors: List[str] = []
+    warnings: List[str] = []
+
+    role_ids = Counter(role.id for role in fetch_roles())
+    for role_id, count in role_ids.items():
+        if count > 1:
+            errors.append(f"duplicate role id '{role_id.value}' in roles.json")
+    for role in Role:
+        if role not in role_ids:
+            errors.append(f"role '{role.value}' missing from roles.json")
+
+    for role in Role:
+        scenarios = scenario_engine.get_scenario_index(role).scenarios
+        archetypes = archetype_engine.get_archetypes_for_role(role)
+
+        if not scenarios:
+            errors.append(f"{role.value}: no scenarios defined")
+        if not archetypes:
+            errors.append(f"{role.value}: no archetypes defined")
+
+        for scenario_id, count in Counter(s.id for s in scenarios).items():
+            if count > 1:
+                errors.append(f"{role.value}: duplicate scenario id '{scenario_id}'")
+        for archetype_id, count in Counter(a.id for a in archetypes).items():
+            if count > 1:
+                errors.append(f"{role.value}: duplicate archetype id '{archetype_id}'")
+
+        choice_traits = set()
+        for scenario in scenarios:
+            if scenario.role != role:
+                errors.append(f"{role.value}: scenario '{scenario.id}' belongs to role '{scenario.role.value}'")
+            if not scenario.choices:
+                errors.append(f"{role.value}: scenario '{scenario.id}' has no choices")
+            for choice_id, count in Counter(c.id for c in scenario.choices).items():
+                if count > 1:
+                    errors.append(f"{role.value}: duplicate choice id '{choice_id}' in scenario '{scenario.id}'")
+            for choice in scenario.choices:
+                if not choice.traits:
+                    errors.append(f"{role.value}: choice '{choice.id}' has no traits")
+                choice_traits.update(choice.traits)
+
+        archetype_traits = set()
+        for archetype in archetypes:
+            if archetype.role is None or archetype.role.id != role:
+                errors.append(f"{role.value}: archetype '{archetype.id}' has a mismatched role")
+            archetype_traits.update(archetype.key_traits)
+            for trait in archetype.key_traits:
+                if trait not in choice_traits:
+                    errors.append(f"{role.value}: archetype '{archetype.id}' references trait '{trait}' no choice awards")
+
+        for trait in sorted(choice_traits - archetype_traits):
+            warnings.append(f"{role.value}: trait '{trait}' is not used by any archetype")
+
+    if errors:
+        raise ContentValidationError(errors)
+    return warnings
+
+
+def _parse_content() -> ContentReport:
+    """Load every role from data/, validate it and build the outcome tables."""
+    report = ContentReport()
+
+    # Before building models, which would silently absorb a bad reference
+    start = time.perf_counter()
+    check_references()
+    report.timings_ms["references"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    get_roles_registry()
+    report.timings_ms["roles"] = (time.perf_counter() - start) * 1000
+
+    for role in Role:
+        start = time.perf_counter()
+        scenario_engine.get_scenario_index(role)
+        report.timings_ms[f"scenarios.{role.value}"] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        archetype_engine.get_archetypes_for_role(role)
+        archetype_engine.get_archetype_matrix(role)
+        report.timings_ms[f"archetypes.{role.value}"] = (time.perf_counter() - start) * 1000
+
+    # Outcome tables score every path, so they need validated content first
+    start = time.perf_counter()
+    report.warnings = validate_content()
+    report.timings_ms["validation"] = (time.perf_counter() - start) * 1000
+
+    for role in Role:
+        start = time.perf_counter()
+        outcome_table.get_outcome_table(role)
+        report.timings_ms[f"outcomes.{role.value}"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    content_fingerprint()
+    report.timings_ms["fingerprint"] = (time.perf_counter() - start) * 1000
+    return report
+
+
+# Bump whenever the layout of the snapshot or of any cached class changes
+SNAPSHOT_FORMAT = 2
+
+
+def _content_loaded() -> bool:
+    return bool(
+        roles._registry is not None
+        or scenario_engine._index_cache
+        or archetype_engine._archetypes_cache
+        or archetype_engine._matrix_cache
+        or outcome_table._table_cache
+    )
+
+
+def build_content_snapshot() -> Dict[str, Any]:
+    """
+    Parse and validate data/ and collect every compiled cache into one object.
+
+    Raises:
+        ContentValidationError: If the content is inconsistent
+    """
+    report = _parse_content()
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "pydantic": pydantic.VERSION,
+        "fingerprint": content_fingerprint(),
+        "outcome_table_max_paths": settings.OUTCOME_TABLE_MAX_PATHS,
+        "warnings": report.warnings,
+        "roles": get_roles_registry(),
+        "scenarios": {role: scenario_engine.get_scenario_index(role) for role in Role},
+        "archetypes": {role: archetype_engine.get_archetypes_for_role(role) for role in Role},
+        "matrices": {role: archetype_engine.get_archetype_matrix(role) for role in Role},
+        "outcome_tables": {role: outcome_table.get_outcome_table(role) for role in Role},
+    }
+
+
+def write_content_snapshot(path: Path) -> int:
+    """
+    Compile data/ into a snapshot file at `path`; returns its size in bytes.
+
+    The file is a pickle of the same objects the services cache, so loading
+    it skips JSON parsing, model validation, index building and outcome
+    table enumeration. Only load snapshots this function wrote.
+    """
+    payload = pickle.dumps(build_content_snapshot(), protocol=pickle.HIGHEST_PROTOCOL)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + ".tmp")
+    temporary.write_bytes(payload)
+    os.replace(temporary, path)
+    return len(payload)
+
+
+def _snapshot_mismatch(snapshot: Any) -> str | None:
+    """Why a loaded snapshot cannot be used, or None if it matches this process."""
+    if not isinstance(snapshot, dict) or snapshot.get("format") != SNAPSHOT_FORMAT:
+        return "unsupported snapshot format"
+    if snapshot["pydantic"] != pydantic.VERSION:
+        return f"built with pydantic {snapshot['pydantic']}, running {pydantic.VERSION}"
+    if snapshot["outcome_table_max_paths"] != settings.OUTCOME_TABLE_MAX_PATHS:
+        return "built with a different OUTCOME_TABLE_MAX_PATHS"
+    if snapshot["fingerprint"] != content_fingerprint():
+        return "data files changed since the snapshot was built"
+    return None
+
+
+def load_content_snapshot(path: Path) -> ContentReport | None:
+    """
+    Install all content from a snapshot written by write_content_snapshot, in one read.
+
+    Returns None, leaving the caches untouched, when content is already
+    loaded or the snapshot is missing, unreadable or stale (built from other
+    data files, settings or library versions); callers then parse data/.
+    """
+    if _content_loaded():
+        return None
+
+    report = ContentReport()
+    start = time.perf_counter()
+    try:
+        snapshot = pickle.loads(path.read_bytes())
+    except FileNotFoundError:
+        logger.warning("Content snapshot %s not found, parsing data files", path)
+        return None
+    except Exception as exc:
+        logger.warning("Ignoring unreadable content snapshot %s (%s), parsing data files", path, exc)
+        return None
+    report.timings_ms["snapshot.read"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    problem = _snapshot_mismatch(snapshot)
+    report.timings_ms["snapshot.check"] = (time.perf_counter() - start) * 1000
+    if problem is not None:
+        logger.warning("Ignoring content snapshot %s: %s", path, problem)
+        return None
+
+    roles._registry = snapshot["roles"]
+    scenario_engine._index_cache.update(snapshot["scenarios"])
+    archetype_engine._archetypes_cache.update(snapshot["archetypes"])
+    archetype_engine._matrix_cache.update(snapshot["matrices"])
+    outcome_table._table_cache.update(snapshot["outcome_tables"])
+    report.warnings = list(snapshot["warnings"])
+    return report
+
+
+def preload_content() -> ContentReport:
+    """
+    Eagerly load and validate all content so no request pays the parse cost.
+
+    Uses the snapshot at CONTENT_SNAPSHOT_PATH when it is current, otherwise
+    parses data/. Returns an empty report at once when content is already
+    loaded, e.g. in a server worker forked after the parent preloaded it.
+    """
+    if _content_loaded():
+        logger.info("Content already loaded")
+        return ContentReport()
+
+    report = None
+    if settings.CONTENT_SNAPSHOT_PATH is not None:
+        report = load_content_snapshot(settings.CONTENT_SNAPSHOT_PATH)
+    if report is None:
+        report = _parse_content()
+
+    for step, elapsed in report.timings_ms.items():
+        logger.info("Content load %s took %.2f ms", step, elapsed)
+    for warning in report.warnings:
+        logger.warning("Content warning: %s", warning)
+    logger.info("Content preloaded in %.2f ms", report.total_ms)
+
+    return report
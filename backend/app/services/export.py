@@ -0,0 +1,173 @@
+import csv
+import io
+import json
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, UTC
+from typing import Any, Callable, Dict, Iterator, List, Literal
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+
+from app.db.models import SessionModel
+from app.models.enum import Role
+
+
+ExportFormat = Literal["ndjson", "csv"]
+
+CSV_COLUMNS = [
+    "session_id",
+    "role",
+    "created_at",
+    "updated_at",
+    "role_profile",
+    "sequence",
+    "scenario_id",
+    "choice_id",
+    "traits",
+    "timestamp",
+]
+
+MEDIA_TYPES: Dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+@dataclass(frozen=True)
+class ExportFilters:
+    """Optional filters on sessions.role and a [created_from, created_to) range."""
+    role: Role | None = None
+    created_from: datetime | None = None
+    created_to: datetime | None = None
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # Stored datetimes are naive UTC in SQLite
+    return value.astimezone(UTC).replace(tzinfo=None) if value.tzinfo is not None else value
+
+
+def _isoformat(value: datetime | None) -> str | None:
+    return value.isoformat() if value is not None else None
+
+
+def session_record(session: SessionModel) -> Dict[str, Any]:
+    """A session, its stored profile and its ordered responses as a JSON-ready dict."""
+    return {
+        "id": session.id,
+        "role": session.role,
+        "created_at": _isoformat(session.created_at),
+        "updated_at": _isoformat(session.updated_at),
+        "role_profile": session.role_profile,
+        "responses": [
+            {
+                "sequence": response.sequence,
+                "scenario_id": response.scenario_id,
+                "choice_id": response.choice_id,
+                "traits": response.traits,
+                "timestamp": _isoformat(response.timestamp),
+            }
+            for response in session.scenario_responses
+        ],
+    }
+
+
+def iter_session_pages(
+    session_factory: Callable[[], Session],
+    filters: ExportFilters = ExportFilters(),
+    page_size: int = 500,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield pages of session records in primary-key order.
+
+    Each page is read in its own short transaction (keyset pagination on
+    sessions.id, responses via one selectin query), so memory is bounded by
+    `page_size` and no read snapshot is held while the caller writes out.
+    """
+    last_id = ""
+    while True:
+        statement = (
+            select(SessionModel)
+            .where(SessionModel.id > last_id)
+            .options(selectinload(SessionModel.scenario_responses))
+            .order_by(SessionModel.id)
+            .limit(page_size)
+        )
+        if filters.role is not None:
+            statement = statement.where(SessionModel.role == filters.role.value)
+        if filters.created_from is not None:
+            statement = statement.where(SessionModel.created_at >= _naive_utc(filters.created_from))
+        if filters.created_to is not None:
+            statement = statement.where(SessionModel.created_at < _naive_utc(filters.created_to))
+
+        with session_factory() as db:
+            page = [session_record(session) for session in db.scalars(statement)]
+        if not page:
+            return
+        yield page
+        if len(page) < page_size:
+            return
+        last_id = page[-1]["id"]
+
+
+def _ndjson_lines(records: List[Dict[str, Any]]) -> str:
+    return "".join(json.dumps(record, default=str) + "\n" for record in records)
+
+
+def _csv_rows(records: List[Dict[str, Any]], header: bool) -> str:
+    """One row per response; sessions without responses get a single row with empty response columns."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(CSV_COLUMNS)
+    for record in records:
+        session_columns = [
+            record["id"],
+            record["role"],
+            record["created_at"],
+            record["updated_at"],
+            json.dumps(record["role_profile"]) if record["role_profile"] is not None else "",
+        ]
+        if not record["responses"]:
+            writer.writerow(session_columns + [""] * 5)
+        for response in record["responses"]:
+            writer.writerow(
+                session_columns
+                + [
+                    response["sequence"],
+                    response["scenario_id"],
+                    response["choice_id"],
+                    ";".join(response["traits"]),
+                    response["timestamp"],
+                ]
+            )
+    return buffer.getvalue()
+
+
+def export_sessions(
+    session_factory: Callable[[], Session],
+    fmt: ExportFormat = "ndjson",
+    filters: ExportFilters = ExportFilters(),
+    compress: bool = False,
+    page_size: int = 500,
+) -> Iterator[bytes]:
+    """
+    Stream sessions as NDJSON (one session per line, responses nested) or
+    CSV (one row per response), optionally gzip-compressed, one page at a time.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    header = fmt == "csv"
+    for page in iter_session_pages(session_factory, filters, page_size):
+        text = _ndjson_lines(page) if fmt == "ndjson" else _csv_rows(page, header)
+        header = False
+        chunk = text.encode("utf-8")
+        if compressor is not None:
+            chunk = compressor.compress(chunk)
+        if chunk:
+            yield chunk
+    if header:
+        # Empty CSV export still gets its header
+        chunk = _csv_rows([], header=True).encode("utf-8")
+        yield compressor.compress(chunk) if compressor is not None else chunk
+    if compressor is not None:
+        yield compressor.flush()
@@ -0,0 +1,309 @@
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+from typing import Any, Callable, Iterator, List
+
+from sqlalchemy import Engine, and_, delete, exists, or_, select
+from sqlalchemy.orm import Session, selectinload
+
+from app.config import settings
+from app.db.models import ConversationMessageModel, ScenarioResponseModel, SessionModel
+from app.db.stats import stat_deltas_for_sessions
+from app.models.enum import Role
+from app.services import outcome_table
+from app.services.export import session_record
+from app.services.session_manager import count_traits
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CounterMismatch:
+    """A session whose running counters disagree with its raw responses."""
+    session_id: str
+    field: str
+    expected: Any
+    actual: Any
+
+
+def _iter_session_batches(db: Session, batch_size: int) -> Iterator[List[SessionModel]]:
+    """Yield sessions (with responses eagerly loaded) in primary-key keyset batches."""
+    last_id = ""
+    while True:
+        batch = db.scalars(
+            select(SessionModel)
+            .where(SessionModel.id > last_id)
+            .order_by(SessionModel.id)
+            .limit(batch_size)
+            .options(selectinload(SessionModel.scenario_responses))
+        ).all()
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1].id
+
+
+def _expected_counters(session: SessionModel) -> dict:
+    responses = session.scenario_responses
+    return {
+        "trait_counts": count_traits(responses),
+        "scenarios_completed": len(responses),
+        "last_scenario_id": responses[-1].scenario_id if responses else None,
+        **_expected_path(session),
+    }
+
+
+def _expected_path(session: SessionModel) -> dict:
+    """path_code and path_layout encoded under the current outcome table."""
+    table = outcome_table.get_outcome_table(Role(session.role))
+    if table is None:
+        return {"path_code": None, "path_layout": None}
+    responses = session.scenario_responses
+    return {
+        "path_code": table.encode((r.scenario_id, r.choice_id) for r in responses),
+        "path_layout": table.layout if responses else None,
+    }
+
+
+def counters_need_backfill(db: Session) -> bool:
+    """
+    Whether any session's running counters do not reflect its responses yet.
+
+    True for data written before the counters, response sequence numbers or
+    path layouts existed, whichever process upgraded the schema.
+    """
+    responses = select(ScenarioResponseModel.id).where(ScenarioResponseModel.session_id == SessionModel.id)
+    return db.scalar(
+        select(SessionModel.id)
+        .where(or_(
+            and_(SessionModel.scenarios_completed == 0, exists(responses)),
+            exists(responses.where(ScenarioResponseModel.sequence == 0)),
+            and_(
+                SessionModel.scenarios_completed > 0,
+                SessionModel.path_code.is_not(None),
+                SessionModel.path_layout.is_(None),
+            ),
+        ))
+        .limit(1)
+    ) is not None
+
+
+def backfill_session_counters(db: Session, batch_size: int = 500) -> int:
+    """
+    Recompute the running counters and response sequence numbers on every
+    session from its raw responses.
+
+    Commits once per batch so the writer lock is never held for long.
+    Returns the number of sessions whose counters changed.
+    """
+    updated = 0
+    for batch in _iter_session_batches(db, batch_size):
+        for session in batch:
+            changed = False
+            for sequence, response in enumerate(session.scenario_responses, start=1):
+                if response.sequence != sequence:
+                    response.sequence = sequence
+                    changed = True
+            for field, expected in _expected_counters(session).items():
+                if getattr(session, field) != expected:
+                    setattr(session, field, expected)
+                    changed = True
+            updated += changed
+        db.commit()
+
+    logger.info("Backfilled counters on %d sessions", updated)
+    return updated
+
+
+def check_session_counters(db: Session, batch_size: int = 500) -> List[CounterMismatch]:
+    """Compare every session's running counters against its raw responses."""
+    mismatches: List[CounterMismatch] = []
+    for batch in _iter_session_batches(db, batch_size):
+        for session in batch:
+            sequences = [response.sequence for response in session.scenario_responses]
+            expected_sequences = list(range(1, len(sequences) + 1))
+            if sequences != expected_sequences:
+                mismatches.append(CounterMismatch(session.id, "sequence", expected_sequences, sequences))
+            for field, expected in _expected_counters(session).items():
+                actual = getattr(session, field)
+                if actual != expected:
+                    mismatches.append(CounterMismatch(session.id, field, expected, actual))
+    return mismatches
+
+
+@dataclass
+class ExpiryReport:
+    """Outcome of an idle-session expiry run."""
+    sessions_removed: int = 0
+    responses_removed: int = 0
+    messages_removed: int = 0
+    batches: int = 0
+    bytes_reclaimed: int = 0
+    archive_path: Path | None = None
+
+
+def _archive_sessions(db: Session, session_ids: List[str], archive_file) -> None:
+    """Append the sessions and their ordered responses to an NDJSON archive."""
+    sessions = db.scalars(
+        select(SessionModel)
+        .where(SessionModel.id.in_(session_ids))
+        .options(selectinload(SessionModel.scenario_responses))
+    ).all()
+    for session in sessions:
+        archive_file.write(json.dumps(session_record(session), default=str) + "\n")
+
+
+def expire_idle_sessions(
+    session_factory: Callable[[], Session],
+    ttl: timedelta,
+    batch_size: int = 500,
+    archive_dir: Path | None = None,
+    now: datetime | None = None,
+    pause: float = 0.01,
+    include_completed: bool = False,
+) -> ExpiryReport:
+    """
+    Delete sessions idle for longer than `ttl`, with their responses and messages.
+
+    Only abandoned sessions (no role profile yet) are deleted unless
+    `include_completed` is set; completed ones are results, not clutter.
+    Works in batches of `batch_size`, each in its own short transaction, and
+    pauses between batches so request writers are not starved of the lock.
+    When `archive_dir` is set, each deleted session is first appended to an
+    NDJSON archive file there.
+    """
+    cutoff = (now or datetime.now(UTC)) - ttl
+    # Stored datetimes are naive UTC in SQLite
+    cutoff = cutoff.replace(tzinfo=None)
+    report = ExpiryReport()
+    expired = SessionModel.updated_at < cutoff
+    if not include_completed:
+        expired = and_(expired, SessionModel.role_profile.is_(None))
+
+    archive_file = None
+    if archive_dir is not None:
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        report.archive_path = archive_dir / f"sessions-{datetime.now(UTC):%Y%m%dT%H%M%S}.ndjson"
+        archive_file = open(report.archive_path, "a")
+
+    try:
+        while True:
+            with session_factory() as db:
+                session_ids = db.scalars(
+                    select(SessionModel.id)
+                    .where(expired)
+                    .order_by(SessionModel.updated_at)
+                    .limit(batch_size)
+                ).all()
+                if not session_ids:
+                    break
+
+                if archive_file is not None:
+                    _archive_sessions(db, session_ids, archive_file)
+                    archive_file.flush()
+
+                # Keep the analytics aggregates equal to what a rebuild would produce
+                stat_deltas_for_sessions(db, session_ids, sign=-1).apply(db)
+                report.messages_removed += db.execute(
+                    delete(ConversationMessageModel).where(ConversationMessageModel.session_id.in_(session_ids))
+                ).rowcount
+                report.responses_removed += db.execute(
+                    delete(ScenarioResponseModel).where(ScenarioResponseModel.session_id.in_(session_ids))
+                ).rowcount
+                report.sessions_removed += db.execute(
+                    delete(SessionModel).where(SessionModel.id.in_(session_ids))
+                ).rowcount
+                db.commit()
+
+            report.batches += 1
+            if len(session_ids) < batch_size:
+                break
+            time.sleep(pause)
+    finally:
+        if archive_file is not None:
+            archive_file.close()
+
+    logger.info(
+        "Expired %d idle sessions (%d responses, %d messages) in %d batches",
+        report.sessions_removed,
+        report.responses_removed,
+        report.messages_removed,
+        report.batches,
+    )
+    return report
+
+
+def incremental_vacuum(engine: Engine, pages_per_step: int = 1000, max_steps: int | None = None) -> int:
+    """
+    Return free pages to the filesystem in small steps.
+
+    Requires auto_vacuum=INCREMENTAL (set for new databases by
+    SQLITE_AUTO_VACUUM, or after a one-off full VACUUM). Each step is its own
+    short write, so the lock is released between steps.
+
+    Returns the number of bytes reclaimed.
+    """
+    with engine.connect() as conn:
+        mode = conn.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+        page_size = conn.exec_driver_sql("PRAGMA page_size").scalar()
+        free_before = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+        if mode != 2:
+            logger.info("Skipping incremental vacuum: auto_vacuum is not INCREMENTAL (%d free pages)", free_before)
+            return 0
+
+        steps = 0
+        free_pages = free_before
+        while free_pages and (max_steps is None or steps < max_steps):
+            conn.exec_driver_sql(f"PRAGMA incremental_vacuum({int(pages_per_step)})")
+            conn.commit()
+            steps += 1
+            free_pages = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+
+    reclaimed = (free_before - free_pages) * page_size
+    logger.info("Incremental vacuum reclaimed %d bytes in %d steps", reclaimed, steps)
+    return reclaimed
+
+
+def full_vacuum(engine: Engine) -> int:
+    """
+    Rebuild the database file, applying the configured auto_vacuum mode.
+
+    Holds an exclusive lock for the whole rebuild; run it off-peak. Returns the
+    change in file size in bytes.
+    """
+    with engine.connect() as conn:
+        page_size = conn.exec_driver_sql("PRAGMA page_size").scalar()
+        pages_before = conn.exec_driver_sql("PRAGMA page_count").scalar()
+        conn.exec_driver_sql(f"PRAGMA auto_vacuum = {settings.SQLITE_AUTO_VACUUM}")
+        conn.commit()
+        conn.exec_driver_sql("VACUUM")
+        pages_after = conn.exec_driver_sql("PRAGMA page_count").scalar()
+    return (pages_before - pages_after) * page_size
+
+
+def run_maintenance(session_factory: Callable[[], Session], engine: Engine) -> ExpiryReport:
+    """One maintenance pass with the configured TTL, batch size and archive directory."""
+    report = expire_idle_sessions(
+        session_factory,
+        ttl=timedelta(hours=settings.SESSION_IDLE_TTL_HOURS),
+        batch_size=settings.MAINTENANCE_BATCH_SIZE,
+        archive_dir=settings.MAINTENANCE_ARCHIVE_DIR,
+    )
+    if report.sessions_removed:
+        report.bytes_reclaimed = incremental_vacuum(engine, pages_per_step=settings.MAINTENANCE_VACUUM_PAGES)
+    return report
+
+
+async def maintenance_loop(session_factory: Callable[[], Session], engine: Engine) -> None:
+    """Run maintenance every MAINTENANCE_INTERVAL_SECONDS until cancelled."""
+    while True:
+        try:
+            await asyncio.to_thread(run_maintenance, session_factory, engine)
+        except Exception:
+            logger.exception("Maintenance pass failed")
+        await asyncio.sleep(settings.MAINTENANCE_INTERVAL_SECONDS)
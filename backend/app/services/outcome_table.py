@@ -0,0 +1,166 @@
+import hashlib
+import itertools
+import logging
+import threading
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+from app.config import settings
+from app.models.enum import Role
+from app.models.session import ArchetypeMatch
+from app.services import archetype_engine, scenario_engine
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OutcomeTable:
+    """
+    Top archetype for every complete choice path of a role.
+
+    Scenarios are linear with a fixed set of choices, so a complete path is
+    one choice per scenario. Paths are encoded as mixed-radix integers (one
+    digit per scenario position, base = that scenario's choice count) and
+    map to an index into a de-duplicated list of outcomes.
+
+    `layout` identifies the encoding (scenario order and choices per
+    scenario): a path code is only meaningful to a table with the layout it
+    was encoded under.
+    """
+    layout: str
+    weights: Dict[Tuple[str, str], int]
+    outcomes: Tuple[ArchetypeMatch | None, ...]
+    table: array
+
+    @property
+    def size(self) -> int:
+        return len(self.table)
+
+    def path_contribution(self, scenario_id: str, choice_id: str) -> int | None:
+        """The amount a choice adds to the encoded path, or None if unknown."""
+        return self.weights.get((scenario_id, choice_id))
+
+    def encode(self, choices: Iterable[Tuple[str, str]]) -> int | None:
+        """Encode (scenario_id, choice_id) pairs, or None if any choice is unknown."""
+        code = 0
+        for pair in choices:
+            weight = self.weights.get(pair)
+            if weight is None:
+                return None
+            code += weight
+        return code
+
+    def lookup(self, path_code: int) -> ArchetypeMatch | None:
+        return self.outcomes[self.table[path_code]]
+
+
+def count_paths(role: Role) -> int:
+    """Number of complete choice paths through a role's scenarios."""
+    paths = 1
+    for scenario in scenario_engine.get_scenario_index(role).scenarios:
+        paths *= len(scenario.choices)
+    return paths
+
+
+def build_outcome_table(role: Role, max_paths: int) -> OutcomeTable | None:
+    """
+    Enumerate every complete path for a role and score it once.
+
+    Returns None (callers fall back to live scoring) when the role has no
+    scenarios or more than `max_paths` paths.
+    """
+    scenarios = scenario_engine.get_scenario_index(role).scenarios
+    paths = count_paths(role)
+    if not scenarios or paths > max_paths:
+        return None
+
+    weights: Dict[Tuple[str, str], int] = {}
+    place = 1
+    for scenario in scenarios:
+        for digit, choice in enumerate(scenario.choices):
+            weights[(scenario.id, choice.id)] = digit * place
+        place *= len(scenario.choices)
+    layout = hashlib.sha256(repr(sorted(weights.items())).encode()).hexdigest()[:16]
+
+    outcome_ids: Dict[Tuple, int] = {}
+    outcomes: List[ArchetypeMatch | None] = []
+    by_traits: Dict[Tuple[Tuple[str, int], ...], int] = {}
+    table = array("I", [0]) * paths
+
+    for path in itertools.product(*(scenario.choices for scenario in scenarios)):
+        trait_counts: Dict[str, int] = {}
+        code = 0
+        for choice in path:
+            code += weights[(choice.scenario_id, choice.id)]
+            for trait in choice.traits:
+                trait_counts[trait] = trait_counts.get(trait, 0) + 1
+
+        key = tuple(sorted(trait_counts.items()))
+        outcome_id = by_traits.get(key)
+        if outcome_id is None:
+            match = archetype_engine.get_top_archetype(role, trait_counts)
+            identity = (
+                (match.archetype.id, match.score, match.coverage, tuple(match.matched_traits))
+                if match is not None else None
+            )
+            outcome_id = outcome_ids.get(identity)
+            if outcome_id is None:
+                outcome_id = len(outcomes)
+                outcome_ids[identity] = outcome_id
+                outcomes.append(match)
+            by_traits[key] = outcome_id
+        table[code] = outcome_id
+
+    return OutcomeTable(layout=layout, weights=weights, outcomes=tuple(outcomes), table=table)
+
+
+_table_cache: Dict[Role, OutcomeTable | None] = {}
+_table_lock = threading.Lock()
+
+
+def get_outcome_table(role: Role) -> OutcomeTable | None:
+    """Get the outcome table for a role (built once), or None if it is too large."""
+    if role in _table_cache:
+        return _table_cache[role]
+    with _table_lock:
+        if role not in _table_cache:
+            table = build_outcome_table(role, settings.OUTCOME_TABLE_MAX_PATHS)
+            if table is None:
+                logger.info(
+                    "Outcome table disabled for %s: %d paths exceeds limit of %d, using live scoring",
+                    role.value,
+                    count_paths(role),
+                    settings.OUTCOME_TABLE_MAX_PATHS,
+                )
+            _table_cache[role] = table
+    return _table_cache[role]
+
+
+def path_contribution(role: Role, scenario_id: str, choice_id: str) -> int | None:
+    """Amount a choice adds to a session's encoded path, or None without a table."""
+    table = get_outcome_table(role)
+    return table.path_contribution(scenario_id, choice_id) if table is not None else None
+
+
+def lookup_outcome(
+    role: Role, path_code: int | None, path_layout: str | None, scenarios_completed: int
+) -> Tuple[bool, ArchetypeMatch | None]:
+    """
+    Look up the top archetype for a completed path.
+
+    Returns (found, match); found is False when the table cannot answer
+    (no table, incomplete path, unknown code or a code encoded under another
+    layout, e.g. before a content change) and the caller must score live.
+    """
+    table = get_outcome_table(role)
+    if (
+        table is None
+        or path_code is None
+        or path_layout != table.layout
+        or scenarios_completed != scenario_engine.get_total_scenarios(role)
+        or not 0 <= path_code < table.size
+    ):
+        return False, None
+    return True, table.lookup(path_code)
@@ -0,0 +1,292 @@
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Executor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.database import DATABASE_PATH
+from app.db.models import SessionModel
+from app.db.stats import StatDeltas, profile_archetype_id
+from app.models.enum import Role
+from app.services import archetype_engine, outcome_table
+
+
+logger = logging.getLogger(__name__)
+
+# Held for the duration of a run, so runs from other worker processes or the CLI are refused
+RESCORE_LOCK_PATH = DATABASE_PATH.with_name(DATABASE_PATH.name + ".rescore.lock")
+
+# (id, role, trait_counts, path_code, path_layout, scenarios_completed, role_profile)
+SessionRow = Tuple[str, str, Dict[str, int], int | None, str | None, int, Dict[str, Any] | None]
+
+
+@dataclass
+class RescoreProgress:
+    """Running totals for a re-scoring run; also the checkpoint payload."""
+    last_id: str = ""
+    processed: int = 0
+    updated: int = 0
+    chunks: int = 0
+    elapsed_seconds: float = 0.0
+    done: bool = False
+    error: str | None = None
+
+    @property
+    def sessions_per_second(self) -> float:
+        return self.processed / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["sessions_per_second"] = round(self.sessions_per_second, 1)
+        return data
+
+
+def _rescore_rows(rows: Sequence[SessionRow]) -> List[Dict[str, Any]]:
+    """Recompute profiles for a batch of rows; returns update params for the ones that changed."""
+    changes: List[Dict[str, Any]] = []
+    for session_id, role_value, trait_counts, path_code, path_layout, completed, stored in rows:
+        role = Role(role_value)
+        found, match = outcome_table.lookup_outcome(role, path_code, path_layout, completed)
+        if not found:
+            match = archetype_engine.get_top_archetype(role, trait_counts or {})
+        profile = match.model_dump(mode="json") if match is not None else None
+        if profile is not None and profile != stored:
+            changes.append({"id": session_id, "role_profile": profile})
+    return changes
+
+
+def _iter_chunks(db: Session, last_id: str, chunk_size: int) -> Iterator[List[SessionRow]]:
+    """Keyset-paginate sessions that have a stored profile, streaming each chunk with yield_per."""
+    while True:
+        result = db.execute(
+            select(
+                SessionModel.id,
+                SessionModel.role,
+                SessionModel.trait_counts,
+                SessionModel.path_code,
+                SessionModel.path_layout,
+                SessionModel.scenarios_completed,
+                SessionModel.role_profile,
+            )
+            .where(SessionModel.id > last_id, SessionModel.role_profile.is_not(None))
+            .order_by(SessionModel.id)
+            .limit(chunk_size)
+            .execution_options(yield_per=min(chunk_size, 500))
+        )
+        chunk = [tuple(row) for row in result]
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1][0]
+
+
+def load_checkpoint(path: Path) -> RescoreProgress:
+    data = json.loads(path.read_text())
+    return RescoreProgress(
+        last_id=data["last_id"],
+        processed=data["processed"],
+        updated=data["updated"],
+        chunks=data["chunks"],
+        elapsed_seconds=data.get("elapsed_seconds", 0.0),
+        done=data.get("done", False),
+    )
+
+
+def _save_checkpoint(path: Path, progress: RescoreProgress) -> None:
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(progress.to_dict()))
+    os.replace(tmp_path, path)
+
+
+def try_lock(path: Path) -> IO | None:
+    """Take an exclusive lock on `path` without waiting; None if another run holds it."""
+    lock_file = open(path, "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+def rescore_profiles(
+    session_factory: Callable[[], Session],
+    chunk_size: int = 1000,
+    workers: int = 0,
+    checkpoint_path: Path | None = None,
+    resume: bool = True,
+    on_progress: Callable[[RescoreProgress], None] | None = None,
+) -> RescoreProgress:
+    """
+    Recompute every stored role profile against the current archetype data.
+
+    Sessions are read in primary-key keyset chunks, scored (in a process pool
+    of `workers` processes when > 1) and written back with one bulk UPDATE per
+    chunk, together with the matching archetype stats adjustment. After each
+    chunk the position is saved to `checkpoint_path`, so an interrupted run
+    resumes where it stopped; a checkpoint of a finished run starts a new one.
+    """
+    progress = RescoreProgress()
+    if checkpoint_path is not None and resume and checkpoint_path.exists():
+        checkpoint = load_checkpoint(checkpoint_path)
+        if checkpoint.done:
+            logger.info("Previous re-scoring run completed, starting a new one")
+        else:
+            progress = checkpoint
+            logger.info("Resuming re-scoring after session %s (%d processed)", progress.last_id, progress.processed)
+
+    executor: Executor | None = None
+    if workers > 1:
+        # Imported here: multiprocessing is only needed by offline re-scoring runs, not at app startup
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        # Spawned, not forked: the server process has other threads (request handlers,
+        # the decision writer) whose locks a forked child would inherit mid-use
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    start = time.perf_counter() - progress.elapsed_seconds
+    try:
+        with session_factory() as reader, session_factory() as writer:
+            for chunk in _iter_chunks(reader, progress.last_id, chunk_size):
+                if executor is not None:
+                    step = -(-len(chunk) // workers)
+                    parts = [chunk[i:i + step] for i in range(0, len(chunk), step)]
+                    changes = [change for part in executor.map(_rescore_rows, parts) for change in part]
+                else:
+                    changes = _rescore_rows(chunk)
+
+                if changes:
+                    stored = {row[0]: (row[1], row[6]) for row in chunk}
+                    stats = StatDeltas()
+                    for change in changes:
+                        role, previous = stored[change["id"]]
+                        stats.change_archetype(
+                            role, profile_archetype_id(previous), profile_archetype_id(change["role_profile"])
+                        )
+                    sessions = SessionModel.__table__
+                    writer.execute(
+                        update(sessions)
+                        .where(sessions.c.id == bindparam("b_id"))
+                        .values(
+                            role_profile=bindparam("b_role_profile"),
+                            # Invalidate cached session/profile responses (ETags)
+                            version=sessions.c.version + 1,
+                            # Re-scoring must not make sessions look active
+                            updated_at=sessions.c.updated_at,
+                        ),
+                        [{"b_id": change["id"], "b_role_profile": change["role_profile"]} for change in changes],
+                    )
+                    stats.apply(writer)
+                writer.commit()
+                # End the reader's snapshot so writers and WAL checkpoints are not held up
+                reader.rollback()
+
+                progress.last_id = chunk[-1][0]
+                progress.processed += len(chunk)
+                progress.updated += len(changes)
+                progress.chunks += 1
+                progress.elapsed_seconds = time.perf_counter() - start
+                if checkpoint_path is not None:
+                    _save_checkpoint(checkpoint_path, progress)
+                logger.info(
+                    "Re-scored %d sessions (%d updated, %.0f sessions/s)",
+                    progress.processed,
+                    progress.updated,
+                    progress.sessions_per_second,
+                )
+                if on_progress is not None:
+                    on_progress(progress)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    progress.done = True
+    progress.elapsed_seconds = time.perf_counter() - start
+    if checkpoint_path is not None:
+        _save_checkpoint(checkpoint_path, progress)
+    return progress
+
+
+class RescoreJob:
+    """
+    A single background re-scoring run, for the admin endpoint.
+
+    Runs are serialized across processes with a lock on `lock_path`. Another
+    worker's run is only visible here through `checkpoint_path`.
+    """
+
+    def __init__(self, lock_path: Path | None = None, checkpoint_path: Path | None = None):
+        self.lock_path = lock_path
+        self.checkpoint_path = checkpoint_path
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.progress: RescoreProgress | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _locked_elsewhere(self) -> bool:
+        if self.lock_path is None:
+            return False
+        lock_file = try_lock(self.lock_path)
+        if lock_file is None:
+            return True
+        lock_file.close()
+        return False
+
+    def start(self, session_factory: Callable[[], Session], **options: Any) -> bool:
+        """Start a run in a background thread; False if one is already running in any process."""
+        with self._lock:
+            if self.running:
+                return False
+            lock_file = None
+            if self.lock_path is not None:
+                lock_file = try_lock(self.lock_path)
+                if lock_file is None:
+                    return False
+            self.progress = RescoreProgress()
+
+            def run() -> None:
+                try:
+                    self.progress = rescore_profiles(
+                        session_factory, checkpoint_path=self.checkpoint_path, on_progress=self._update, **options
+                    )
+                except Exception as exc:
+                    logger.exception("Re-scoring failed")
+                    self.progress.error = str(exc)
+                finally:
+                    if lock_file is not None:
+                        lock_file.close()
+
+            self._thread = threading.Thread(target=run, name="rescore", daemon=True)
+            self._thread.start()
+            return True
+
+    def _update(self, progress: RescoreProgress) -> None:
+        self.progress = progress
+
+    def status(self) -> Dict[str, Any]:
+        running = self.running or self._locked_elsewhere()
+        progress = self.progress
+        if not self.running and (running or progress is None):
+            # Run in another process: its progress is shared through the checkpoint only
+            if self.checkpoint_path is not None and self.checkpoint_path.exists():
+                progress = load_checkpoint(self.checkpoint_path)
+            elif running:
+                progress = None
+        return {
+            "running": running,
+            "progress": progress.to_dict() if progress is not None else None,
+        }
+
+
+rescore_job = RescoreJob(lock_path=RESCORE_LOCK_PATH, checkpoint_path=settings.RESCORE_CHECKPOINT_PATH)
@@ -1,36 +1,97 @@
-from typing import List
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import List, Mapping, Tuple
 import json
+import threading
 from pathlib import Path
 
 from app.models.enum import Role
 from app.models.schemas import RoleResponse
 
-def fetch_roles(
-    include_details: bool = False
-)-> List[RoleResponse]:
 
-    roles_file = Path(__file__).parent.parent.parent / "data" / "roles" / "roles.json"
-    with open(roles_file, "r") as f:
-        roles_data = json.load(f)
+ROLES_FILE = Path(__file__).parent.parent.parent / "data" / "roles" / "roles.json"
+
+
+@dataclass(frozen=True)
+class RolesRegistry:
+    """Immutable, prebuilt role responses loaded once from roles.json."""
+    with_details: Tuple[RoleResponse, ...]
+    without_details: Tuple[RoleResponse, ...]
+    by_id: Mapping[Role, RoleResponse]
+    # Wire-format JSON of each detailed role, for responses assembled from fragments
+    json_by_id: Mapping[Role, bytes]
 
-    roles = []
-    for role in roles_data:
-        if include_details:
-            roles.append(
-                RoleResponse(
-                    id=role["id"],
-                    name=role["name"],
-                    description=role["description"],
-                )
+    @classmethod
+    def build(cls, roles_data: List[dict]) -> "RolesRegistry":
+        with_details = tuple(
+            RoleResponse(
+                id=role["id"],
+                name=role["name"],
+                description=role["description"],
             )
-        else:
-            roles.append(RoleResponse(id=role["id"])) 
-    return roles
+            for role in roles_data
+        )
+        without_details = tuple(RoleResponse(id=role.id) for role in with_details)
+        by_id = {}
+        for role in with_details:
+            by_id.setdefault(role.id, role)
+        return cls(
+            with_details=with_details,
+            without_details=without_details,
+            by_id=MappingProxyType(by_id),
+            json_by_id=MappingProxyType({role_id: role.model_dump_json().encode() for role_id, role in by_id.items()}),
+        )
+
+    def __reduce__(self):
+        # MappingProxyType cannot be pickled (content snapshots); rebuild the views on load
+        return (
+            RolesRegistry._restore,
+            (self.with_details, self.without_details, dict(self.by_id), dict(self.json_by_id)),
+        )
+
+    @classmethod
+    def _restore(cls, with_details, without_details, by_id, json_by_id) -> "RolesRegistry":
+        return cls(with_details, without_details, MappingProxyType(by_id), MappingProxyType(json_by_id))
+
+
+_registry: RolesRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def _load_roles_registry() -> RolesRegistry:
+    with open(ROLES_FILE, "r") as f:
+        roles_data = json.load(f)
+    return RolesRegistry.build(roles_data)
+
+
+def get_roles_registry() -> RolesRegistry:
+    """Get the roles registry (loaded once, then served from memory)."""
+    global _registry
+    registry = _registry
+    if registry is None:
+        with _registry_lock:
+            registry = _registry
+            if registry is None:
+                registry = _load_roles_registry()
+                _registry = registry
+    return registry
+
+
+def fetch_roles(
+    include_details: bool = False
+)-> List[RoleResponse]:
+    registry = get_roles_registry()
+    roles = registry.with_details if include_details else registry.without_details
+    return list(roles)
     
 
 def get_role_by_id(role_id: str) -> RoleResponse | None:
-    roles = fetch_roles(include_details=True)
-    for role in roles:
-        if role.id == role_id:
-            return role
-    return None
+    return get_roles_registry().by_id.get(role_id)
+
+
+def get_role_json(role: RoleResponse) -> bytes:
+    """Serialized role: the prerendered bytes for registry roles, a fresh dump otherwise."""
+    registry = get_roles_registry()
+    if registry.by_id.get(role.id) is role:
+        return registry.json_by_id[role.id]
+    return role.model_dump_json().encode()
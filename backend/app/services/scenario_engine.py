@@ -1,6 +1,8 @@
 import json
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 from app.models.enum import Role
 from app.models.session import Scenario, Choice
@@ -9,8 +11,63 @@ from app.models.session import Scenario, Choice
 # Path to scenario data files
 SCENARIOS_DIR = Path(__file__).resolve().parents[2] / "data" / "scenarios"
 
-# In-memory cache of loaded scenarios (loaded once at startup)
-_scenarios_cache: Dict[Role, List[Scenario]] = {}
+
+@dataclass(frozen=True)
+class ScenarioIndex:
+    """
+    Compiled, read-only view over a role's ordered scenarios.
+
+    Built once per role so every lookup on the request path is a dict hit
+    instead of a scan over the scenario list.
+    """
+    scenarios: Tuple[Scenario, ...] = ()
+    by_id: Dict[str, Scenario] = field(default_factory=dict)
+    position: Dict[str, int] = field(default_factory=dict)
+    next_by_id: Dict[str, Scenario | None] = field(default_factory=dict)
+    choice_traits: Dict[Tuple[str, str], List[str]] = field(default_factory=dict)
+    # Wire-format JSON of each scenario, rendered once and spliced into responses
+    json_by_id: Dict[str, bytes] = field(default_factory=dict)
+    # Wire-format JSON array of all scenarios in order (the session bundle)
+    scenarios_json: bytes = b"[]"
+    total_scenarios: int = 0
+    total_choices: int = 0
+
+    @classmethod
+    def build(cls, scenarios: List[Scenario]) -> "ScenarioIndex":
+        """Compile an index from scenarios already sorted by their order."""
+        ordered = tuple(scenarios)
+        by_id: Dict[str, Scenario] = {}
+        position: Dict[str, int] = {}
+        next_by_id: Dict[str, Scenario | None] = {}
+        choice_traits: Dict[Tuple[str, str], List[str]] = {}
+
+        for i, scenario in enumerate(ordered):
+            # First occurrence wins, matching the previous linear scan
+            if scenario.id in by_id:
+                continue
+            by_id[scenario.id] = scenario
+            position[scenario.id] = i
+            next_by_id[scenario.id] = ordered[i + 1] if i + 1 < len(ordered) else None
+            for choice in scenario.choices:
+                choice_traits.setdefault((scenario.id, choice.id), choice.traits)
+
+        return cls(
+            scenarios=ordered,
+            by_id=by_id,
+            position=position,
+            next_by_id=next_by_id,
+            choice_traits=choice_traits,
+            json_by_id={scenario_id: scenario.model_dump_json().encode() for scenario_id, scenario in by_id.items()},
+            scenarios_json=b"[" + b",".join(scenario.model_dump_json().encode() for scenario in ordered) + b"]",
+            total_scenarios=len(ordered),
+            total_choices=sum(len(s.choices) for s in ordered),
+        )
+
+
+# In-memory cache of compiled scenario indexes (preloaded at startup)
+_index_cache: Dict[Role, ScenarioIndex] = {}
+# Single-flight guard so concurrent first requests parse each file only once
+_index_lock = threading.Lock()
 
 
 def _load_scenarios_for_role(role: Role) -> List[Scenario]:
@@ -53,49 +110,62 @@ def _load_scenarios_for_role(role: Role) -> List[Scenario]:
     return [scenario for _, scenario in scenarios_with_order]
 
 
+def get_scenario_index(role: Role) -> ScenarioIndex:
+    """Get the compiled scenario index for a role (cached)."""
+    index = _index_cache.get(role)
+    if index is None:
+        with _index_lock:
+            index = _index_cache.get(role)
+            if index is None:
+                index = ScenarioIndex.build(_load_scenarios_for_role(role))
+                _index_cache[role] = index
+    return index
+
+
 def get_scenarios_for_role(role: Role) -> List[Scenario]:
     """Get all scenarios for a role (cached)."""
-    if role not in _scenarios_cache:
-        _scenarios_cache[role] = _load_scenarios_for_role(role)
-    return _scenarios_cache[role]
+    return list(get_scenario_index(role).scenarios)
 
 
 def get_first_scenario(role: Role) -> Scenario | None:
     """Get the first scenario for a role."""
-    scenarios = get_scenarios_for_role(role)
+    scenarios = get_scenario_index(role).scenarios
     return scenarios[0] if scenarios else None
 
 
 def get_total_scenarios(role: Role) -> int:
     """Get total number of scenarios for a role."""
-    return len(get_scenarios_for_role(role))
+    return get_scenario_index(role).total_scenarios
 
 
 def get_scenario_by_id(role: Role, scenario_id: str) -> Scenario | None:
     """Get a specific scenario by ID."""
-    scenarios = get_scenarios_for_role(role)
-    for scenario in scenarios:
-        if scenario.id == scenario_id:
-            return scenario
-    return None
+    return get_scenario_index(role).by_id.get(scenario_id)
+
+
+def get_scenario_position(role: Role, scenario_id: str) -> int | None:
+    """Get the zero-based position of a scenario in the role's sequence."""
+    return get_scenario_index(role).position.get(scenario_id)
 
 
 def get_next_scenario(role: Role, current_scenario_id: str) -> Scenario | None:
     """Get the next scenario after the current one."""
-    scenarios = get_scenarios_for_role(role)
-    for i, scenario in enumerate(scenarios):
-        if scenario.id == current_scenario_id:
-            if i + 1 < len(scenarios):
-                return scenarios[i + 1]
-            return None
-    return None
+    return get_scenario_index(role).next_by_id.get(current_scenario_id)
+
+
+def get_scenario_json(scenario: Scenario) -> bytes:
+    """Serialized scenario: the prerendered bytes for indexed scenarios, a fresh dump otherwise."""
+    index = get_scenario_index(scenario.role)
+    if index.by_id.get(scenario.id) is scenario:
+        return index.json_by_id[scenario.id]
+    return scenario.model_dump_json().encode()
+
+
+def get_scenarios_json(role: Role) -> bytes:
+    """Serialized JSON array of all the role's scenarios, in order."""
+    return get_scenario_index(role).scenarios_json
 
 
 def get_choice_traits(role: Role, scenario_id: str, choice_id: str) -> List[str]:
     """Get traits for a specific choice."""
-    scenario = get_scenario_by_id(role, scenario_id)
-    if scenario:
-        for choice in scenario.choices:
-            if choice.id == choice_id:
-                return choice.traits
-    return []
+    return get_scenario_index(role).choice_traits.get((scenario_id, choice_id), [])
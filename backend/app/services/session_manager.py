@@ -1,52 +1,80 @@
+from functools import wraps
+from typing import Callable, TypeVar
 from uuid import UUID
 
-from sqlalchemy.orm import Session
-
 from app.db import ScenarioResponseModel
+from app.db.stats import profile_archetype_id
 from app.db.models import SessionModel
+from app.repositories import ConcurrentUpdateError, SessionRepository
 from app.models.enum import Role
-from app.models.schemas import CreateSessionResponse, SessionResponse
+from app.models.schemas import CreateSessionResponse, DecideResponse, DecisionsResponse, SessionResponse
 from app.services.scenario_engine import get_first_scenario, get_total_scenarios, get_choice_traits, get_next_scenario
 from app.services.roles import get_role_by_id
 from app.models.session import ArchetypeMatch
-from app.services import archetype_engine
+from app.services import archetype_engine, outcome_table
+
+
+# Attempts at a unit of work that keeps losing the race against other updates of its session
+UPDATE_ATTEMPTS = 3
+
+T = TypeVar("T")
+
 
+def _retry_on_conflict(operation: Callable[..., T]) -> Callable[..., T]:
+    """Re-run a session update from a fresh read when a concurrent request committed first."""
+    @wraps(operation)
+    def wrapper(*args, **kwargs) -> T:
+        for _ in range(UPDATE_ATTEMPTS - 1):
+            try:
+                return operation(*args, **kwargs)
+            except ConcurrentUpdateError:
+                pass
+        return operation(*args, **kwargs)
+    return wrapper
 
-def create_session(db: Session, role: Role) -> CreateSessionResponse:
+
+def create_session(repo: SessionRepository, role: Role) -> CreateSessionResponse:
     """
     Create a new simulation session for the given role.
     
-    - Creates session record in database
+    - Creates session record in the repository
     - Returns first scenario for the selected role
     """
 
-    new_session = SessionModel(role=role.value)
-    db.add(new_session)
-    db.commit()
-    db.refresh(new_session)
-    
+    new_session = repo.create_session(role)
+    session_id = UUID(new_session.id)
+    repo.commit()
 
     first_scenario = get_first_scenario(role)
     total_scenarios = get_total_scenarios(role)
     
     return CreateSessionResponse(
-        sessionId=UUID(new_session.id),
+        sessionId=session_id,
         role=role,
         first_scenario=first_scenario,
         total_scenarios=total_scenarios
     )
 
 
-def get_session(db: Session, session_id: UUID) -> SessionModel | None:
+def get_session(repo: SessionRepository, session_id: UUID) -> SessionModel | None:
     """Retrieve a session by ID."""
-    return db.query(SessionModel).filter(SessionModel.id == str(session_id)).first()
+    return repo.get_session(session_id)
+
+
+def get_session_version(repo: SessionRepository, session_id: UUID) -> int | None:
+    """The session's version counter (None if it does not exist), without loading the session."""
+    return repo.session_version(session_id)
+
 
+def fetch_session(repo: SessionRepository, session_id: UUID) -> SessionResponse | None:
+    return session_response(get_session_or_raise(repo, session_id))
 
-def fetch_session(db: Session, session_id: UUID) -> SessionResponse | None:
-    session = get_session_or_raise(db, session_id)
+
+def session_response(session: SessionModel) -> SessionResponse:
+    """Progress view of a loaded session: its current scenario and completion counts."""
     role = Role(session.role)
-    current_scenario = get_next_scenario(role, session.scenario_responses[-1].scenario_id) if session.scenario_responses else get_first_scenario(role)
-    scenarios_completed = len(session.scenario_responses)
+    current_scenario = get_next_scenario(role, session.last_scenario_id) if session.last_scenario_id else get_first_scenario(role)
+    scenarios_completed = session.scenarios_completed
     total_scenarios = get_total_scenarios(role)
     is_completed = scenarios_completed >= total_scenarios
     return SessionResponse(
@@ -60,22 +88,23 @@ def fetch_session(db: Session, session_id: UUID) -> SessionResponse | None:
 
 
 
-def get_session_or_raise(db: Session, session_id: UUID) -> SessionModel:
+def get_session_or_raise(repo: SessionRepository, session_id: UUID) -> SessionModel:
     """Retrieve a session by ID, raise exception if not found."""
-    session = get_session(db, session_id)
+    session = get_session(repo, session_id)
     if session is None:
         raise ValueError(f"Session {session_id} not found")
     return session
 
 
-def get_scenarios_completed(db: Session, session_id: UUID) -> int:
+def get_scenarios_completed(repo: SessionRepository, session_id: UUID) -> int:
     """Get the number of scenarios completed in the session."""
-    session = get_session_or_raise(db, session_id)
-    return len(session.scenario_responses)
+    session = get_session_or_raise(repo, session_id)
+    return session.scenarios_completed
 
 
 
-def submit_choice(db: Session, session_id: UUID, scenario_id:str, choice_id: str) -> ScenarioResponseModel:
+@_retry_on_conflict
+def submit_choice(repo: SessionRepository, session_id: UUID, scenario_id:str, choice_id: str) -> ScenarioResponseModel:
     """
     Submit a choice for the current scenario in the session.
     
@@ -83,7 +112,7 @@ def submit_choice(db: Session, session_id: UUID, scenario_id:str, choice_id: str
         ValueError: If session not found or invalid choice
     """
     
-    session = get_session_or_raise(db, session_id)
+    session = get_session_or_raise(repo, session_id)
 
     role = Role(session.role)
     traits = get_choice_traits(role, scenario_id, choice_id)
@@ -91,69 +120,245 @@ def submit_choice(db: Session, session_id: UUID, scenario_id:str, choice_id: str
     if not traits:
         raise ValueError(f"Invalid choice {choice_id} for scenario {scenario_id}")
     
-    scenario_choice = ScenarioResponseModel(
-        session_id=str(session_id),
-        scenario_id=scenario_id,
-        choice_id=choice_id,
-        traits=traits
-    )
-    db.add(scenario_choice)
-    db.commit()
-    db.refresh(scenario_choice)
+    scenario_choice = _record_response(repo, session, scenario_id, choice_id, traits)
+    repo.commit()
     return scenario_choice
 
 
-def generate_trait_scores(db: Session, session_id: UUID) -> dict:
+@_retry_on_conflict
+def decide(repo: SessionRepository, session_id: UUID, scenario_id: str, choice_id: str) -> DecideResponse:
     """
-    
+    Record a choice and advance the session in a single transaction.
+
+    - Loads the session once
+    - Inserts the scenario response and computes progress
+    - Generates and stores the role profile after the last scenario
+    - Commits once
+
     Raises:
-        ValueError: If session not found
+        ValueError: If session not found or invalid choice
     """
-    session = get_session_or_raise(db, session_id)
-    
-    # Aggregate traits from all scenario responses
+    session = get_session_or_raise(repo, session_id)
+
+    role = Role(session.role)
+    traits = get_choice_traits(role, scenario_id, choice_id)
+
+    if not traits:
+        raise ValueError(f"Invalid choice {choice_id} for scenario {scenario_id}")
+
+    _record_response(repo, session, scenario_id, choice_id, traits)
+
+    next_scenario = get_next_scenario(role, scenario_id)
+    scenarios_completed = session.scenarios_completed
+
+    if next_scenario is None:
+        # Profile generation failure should not block scenario progression
+        role_profile = _top_archetype(session)
+        if role_profile is not None:
+            _set_role_profile(repo, session, role_profile)
+
+    repo.commit()
+
+    return DecideResponse(
+        next_scenario=next_scenario,
+        scenarios_completed=scenarios_completed,
+        total_scenarios=get_total_scenarios(role),
+        is_completed=next_scenario is None
+    )
+
+
+@_retry_on_conflict
+def decide_many(repo: SessionRepository, session_id: UUID, decisions: list[tuple[str, str]]) -> DecisionsResponse:
+    """
+    Record consecutive choices and advance the session in a single transaction.
+
+    - Validates every (scenario_id, choice_id) pair against the role's
+      scenario order, starting at the session's current scenario, before
+      changing anything
+    - Stages all responses as one batch
+    - Generates and stores the role profile if the last scenario is answered
+    - Commits once
+
+    Raises:
+        ValueError: If session not found, a decision is out of order or a choice is invalid
+    """
+    session = get_session_or_raise(repo, session_id)
+    role = Role(session.role)
+    if not decisions:
+        raise ValueError("No decisions submitted")
+
+    expected = get_next_scenario(role, session.last_scenario_id) if session.last_scenario_id else get_first_scenario(role)
+    validated = []
+    for scenario_id, choice_id in decisions:
+        if expected is None:
+            raise ValueError(f"Decision for {scenario_id} submitted after the last scenario")
+        if scenario_id != expected.id:
+            raise ValueError(f"Expected a decision for scenario {expected.id}, got {scenario_id}")
+        traits = get_choice_traits(role, scenario_id, choice_id)
+        if not traits:
+            raise ValueError(f"Invalid choice {choice_id} for scenario {scenario_id}")
+        validated.append((scenario_id, choice_id, traits))
+        expected = get_next_scenario(role, scenario_id)
+
+    completed = session.scenarios_completed or 0
+    responses = [
+        ScenarioResponseModel(
+            session_id=session.id,
+            scenario_id=scenario_id,
+            choice_id=choice_id,
+            traits=traits,
+            sequence=completed + position
+        )
+        for position, (scenario_id, choice_id, traits) in enumerate(validated, start=1)
+    ]
+    with repo.session_update(session):
+        repo.add_responses(session, responses)
+        for response in responses:
+            _advance_session(repo, session, response)
+        scenarios_completed = session.scenarios_completed
+    role_profile = None
+    if expected is None:
+        role_profile = _top_archetype(session)
+        if role_profile is not None:
+            _set_role_profile(repo, session, role_profile)
+
+    repo.commit()
+
+    return DecisionsResponse(
+        next_scenario=expected,
+        scenarios_completed=scenarios_completed,
+        total_scenarios=get_total_scenarios(role),
+        is_completed=expected is None,
+        role_profile=role_profile,
+    )
+
+
+def _record_response(
+    repo: SessionRepository,
+    session: SessionModel,
+    scenario_id: str,
+    choice_id: str,
+    traits: list[str]
+) -> ScenarioResponseModel:
+    """Stage a scenario response and advance the session's running counters."""
+    with repo.session_update(session):
+        scenario_choice = ScenarioResponseModel(
+            session_id=session.id,
+            scenario_id=scenario_id,
+            choice_id=choice_id,
+            traits=traits,
+            sequence=(session.scenarios_completed or 0) + 1
+        )
+        repo.add_response(session, scenario_choice)
+        _advance_session(repo, session, scenario_choice)
+    return scenario_choice
+
+
+def _advance_session(repo: SessionRepository, session: SessionModel, response: ScenarioResponseModel) -> None:
+    """Count a staged response's choice and advance the session's running counters past it."""
+    repo.record_choice(session.role, response.scenario_id, response.choice_id)
+
+    # Reassign rather than mutate so the JSON column is flagged dirty
+    trait_counts = dict(session.trait_counts or {})
+    for trait in response.traits:
+        trait_counts[trait] = trait_counts.get(trait, 0) + 1
+    session.trait_counts = trait_counts
+    if session.path_code is not None:
+        table = outcome_table.get_outcome_table(Role(session.role))
+        if table is not None and not session.scenarios_completed:
+            # The first answer fixes the encoding the path is tracked under
+            session.path_layout = table.layout
+        contribution = (
+            table.path_contribution(response.scenario_id, response.choice_id)
+            if table is not None and table.layout == session.path_layout else None
+        )
+        session.path_code = session.path_code + contribution if contribution is not None else None
+    session.scenarios_completed = (session.scenarios_completed or 0) + 1
+    session.last_scenario_id = response.scenario_id
+    session.version = (session.version or 0) + 1
+
+
+def _set_role_profile(repo: SessionRepository, session: SessionModel, role_profile: ArchetypeMatch) -> None:
+    """Store a profile on the session and move its archetype count from any previous profile."""
+    with repo.session_update(session):
+        previous_archetype_id = profile_archetype_id(session.role_profile)
+        session.role_profile = role_profile.model_dump()
+        session.version = (session.version or 0) + 1
+        repo.record_profile_change(session.role, previous_archetype_id, role_profile.archetype.id)
+
+
+def _top_archetype(session: SessionModel) -> ArchetypeMatch | None:
+    """Best archetype for the session: outcome table lookup for complete paths, live scoring otherwise."""
+    role = Role(session.role)
+    found, role_profile = outcome_table.lookup_outcome(
+        role, session.path_code, session.path_layout, session.scenarios_completed
+    )
+    if found:
+        return role_profile
+    return archetype_engine.get_top_archetype(role=role, trait_scores=session.trait_counts or {})
+
+
+def count_traits(responses: list[ScenarioResponseModel]) -> dict:
+    """Aggregate trait counts across scenario responses."""
     trait_counts = {}
-    for response in session.scenario_responses:
+    for response in responses:
         for trait in response.traits:
             trait_counts[trait] = trait_counts.get(trait, 0) + 1
-    
     return trait_counts
+
+
+def generate_trait_scores(repo: SessionRepository, session_id: UUID) -> dict:
+    """
+    
+    Raises:
+        ValueError: If session not found
+    """
+    session = get_session_or_raise(repo, session_id)
+    return dict(session.trait_counts or {})
     
 
-def store_role_profile(db: Session, session_id: UUID, role_profile: ArchetypeMatch) -> None:
+@_retry_on_conflict
+def store_role_profile(repo: SessionRepository, session_id: UUID, role_profile: ArchetypeMatch) -> None:
     """
     Store the generated role profile in the session.
     
     Raises:
         ValueError: If session not found
     """
-    session = get_session_or_raise(db, session_id)
-    session.role_profile = role_profile.model_dump()
-    db.commit()
+    session = get_session_or_raise(repo, session_id)
+    _set_role_profile(repo, session, role_profile)
+    repo.commit()
 
 
-def get_role_profile(db: Session, session_id: UUID) -> ArchetypeMatch:
+def get_role_profile(repo: SessionRepository, session_id: UUID) -> ArchetypeMatch:
     """
     Retrieve the stored role profile for the session.
     
     Raises:
         ValueError: If session not found or profile not generated
     """
-    session = get_session_or_raise(db, session_id)
+    return stored_role_profile(get_session_or_raise(repo, session_id))
+
+
+def stored_role_profile(session: SessionModel) -> ArchetypeMatch:
+    """
+    The role profile stored on a loaded session.
+
+    Raises:
+        ValueError: If the profile has not been generated yet
+    """
     if session.role_profile is None:
         raise ValueError("Role profile not generated yet")
     return ArchetypeMatch.model_validate(session.role_profile)
 
 
-def generate_role_profile(db: Session, session_id: UUID) -> ArchetypeMatch:
+def generate_role_profile(repo: SessionRepository, session_id: UUID) -> ArchetypeMatch:
     """ Generate the role profile based on session decisions."""
     
-    session = get_session_or_raise(db, session_id)
-    role = Role(session.role)
-    traits_scores = generate_trait_scores(db, session_id)
-    role_profile = archetype_engine.get_top_archetype(role=role, trait_scores=traits_scores)
+    session = get_session_or_raise(repo, session_id)
+    role_profile = _top_archetype(session)
 
     if role_profile is None:
         raise ValueError("Could not generate role profile")
 
-    return role_profile
\ No newline at end of file
+    return role_profile
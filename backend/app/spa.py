@@ -0,0 +1,239 @@
+"""
+Static serving for the built frontend (Vite dist).
+
+The static directory is scanned once into an in-memory manifest, so serving
+a file is a dict lookup rather than filesystem calls. Compressible files are
+served from precompressed gzip/brotli variants: `.gz`/`.br` siblings written
+at build time (`python -m app.spa static/`) are used as-is, and missing gzip
+variants are generated when the manifest is built. Hashed Vite assets are
+cached as immutable; index.html is revalidated with its ETag.
+"""
+import argparse
+import gzip
+import hashlib
+import logging
+import mimetypes
+import re
+import sys
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping
+
+from fastapi import Response
+from fastapi.responses import FileResponse
+
+from app.api.conditional import etag_matches
+
+try:
+    import brotli
+except ImportError:  # optional: prebuilt .br files are still served without it
+    brotli = None
+
+
+logger = logging.getLogger(__name__)
+
+INDEX = "index.html"
+# Vite output names look like assets/index-BvK3x9aQ.js
+HASHED_ASSET = re.compile(r"^assets/.+[-.][A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml", "application/xml")
+COMPRESSIBLE_SUFFIXES = {".js", ".mjs", ".css", ".html", ".json", ".svg", ".txt", ".xml", ".map", ".webmanifest", ".wasm"}
+MIN_COMPRESS_BYTES = 1024
+# Larger files stay on disk and are streamed with FileResponse
+MAX_INLINE_BYTES = 4 * 1024 * 1024
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+SHORT_LIVED = "public, max-age=3600"
+
+# Preferred order when the client accepts several encodings
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+@dataclass
+class StaticFile:
+    """One servable file: identity body (or disk path) plus precompressed variants."""
+    path: Path
+    media_type: str
+    etag: str
+    last_modified: str
+    cache_control: str
+    size: int
+    body: bytes | None = None
+    variants: Dict[str, bytes] = field(default_factory=dict)
+
+
+def _media_type(path: Path) -> str:
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    if media_type.startswith("text/") or media_type in ("application/javascript", "application/json"):
+        media_type += "; charset=utf-8"
+    return media_type
+
+
+def _compressible(path: Path, media_type: str, size: int) -> bool:
+    return size >= MIN_COMPRESS_BYTES and (
+        path.suffix in COMPRESSIBLE_SUFFIXES or media_type.startswith(COMPRESSIBLE_TYPES)
+    )
+
+
+def _cache_control(key: str) -> str:
+    if key == INDEX:
+        return REVALIDATE
+    if HASHED_ASSET.match(key):
+        return IMMUTABLE
+    return SHORT_LIVED
+
+
+def _compress(body: bytes) -> Dict[str, bytes]:
+    variants = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=11)
+    return variants
+
+
+def _source_files(static_dir: Path) -> Iterator[Path]:
+    for path in sorted(static_dir.rglob("*")):
+        if path.is_file() and path.suffix not in (".gz", ".br"):
+            yield path
+
+
+def build_manifest(static_dir: Path, compress: bool = True) -> Dict[str, StaticFile]:
+    """
+    Map URL paths (relative to the static root, e.g. "assets/app-1a2b3c4d.js")
+    to their in-memory entries. With `compress`, compressible files lacking a
+    prebuilt variant are compressed now; variants that do not save bytes are dropped.
+    """
+    manifest: Dict[str, StaticFile] = {}
+    for path in _source_files(static_dir):
+        key = path.relative_to(static_dir).as_posix()
+        stat = path.stat()
+        media_type = _media_type(path)
+        entry = StaticFile(
+            path=path,
+            media_type=media_type,
+            etag="",
+            last_modified=formatdate(stat.st_mtime, usegmt=True),
+            cache_control=_cache_control(key),
+            size=stat.st_size,
+        )
+        if stat.st_size > MAX_INLINE_BYTES:
+            entry.etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+            manifest[key] = entry
+            continue
+
+        entry.body = path.read_bytes()
+        entry.etag = f'"{hashlib.sha256(entry.body).hexdigest()[:32]}"'
+        if _compressible(path, media_type, entry.size):
+            for encoding, suffix in ENCODINGS:
+                prebuilt = path.with_name(path.name + suffix)
+                if prebuilt.is_file():
+                    entry.variants[encoding] = prebuilt.read_bytes()
+            if compress:
+                for encoding, body in _compress(entry.body).items():
+                    entry.variants.setdefault(encoding, body)
+            entry.variants = {
+                encoding: body for encoding, body in entry.variants.items() if len(body) < entry.size
+            }
+        manifest[key] = entry
+    return manifest
+
+
+def accepted_encodings(header: str) -> List[str]:
+    """Content codings from an Accept-Encoding header, excluding those with q=0."""
+    accepted = []
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.append(coding)
+    return accepted
+
+
+class SpaFiles:
+    """Serves the static manifest with an index.html fallback for client-side routes."""
+
+    def __init__(self, static_dir: Path, compress: bool = True):
+        self.static_dir = static_dir
+        self.files = build_manifest(static_dir, compress=compress)
+        if INDEX not in self.files:
+            raise ValueError(f"{static_dir} has no {INDEX}")
+        variant_count = sum(len(entry.variants) for entry in self.files.values())
+        logger.info(
+            "Serving %d static files (%d precompressed variants) from %s", len(self.files), variant_count, static_dir
+        )
+
+    def lookup(self, path: str) -> StaticFile | None:
+        """The file for a request path, index.html for client-side routes, None for missing assets."""
+        key = path.lstrip("/")
+        entry = self.files.get(key)
+        if entry is not None:
+            return entry
+        if key.startswith("assets/"):
+            # A stale hashed URL must not be answered with HTML
+            return None
+        return self.files[INDEX]
+
+    def response(self, path: str, headers: Mapping[str, str]) -> Response:
+        """Response for a GET/HEAD of `path`, honouring Accept-Encoding and If-None-Match."""
+        entry = self.lookup(path)
+        if entry is None:
+            return Response(status_code=404)
+
+        encoding = None
+        if entry.variants:
+            accepted = accepted_encodings(headers.get("accept-encoding", ""))
+            encoding = next((name for name, _ in ENCODINGS if name in entry.variants and name in accepted), None)
+        etag = entry.etag if encoding is None else f'{entry.etag[:-1]}-{encoding}"'
+        response_headers = {
+            "ETag": etag,
+            "Last-Modified": entry.last_modified,
+            "Cache-Control": entry.cache_control,
+        }
+        if entry.variants:
+            response_headers["Vary"] = "Accept-Encoding"
+
+        if_none_match = headers.get("if-none-match")
+        if if_none_match is not None and etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=response_headers)
+
+        if entry.body is None:
+            return FileResponse(entry.path, media_type=entry.media_type, headers=response_headers)
+        if encoding is not None:
+            response_headers["Content-Encoding"] = encoding
+            return Response(entry.variants[encoding], media_type=entry.media_type, headers=response_headers)
+        return Response(entry.body, media_type=entry.media_type, headers=response_headers)
+
+
+def precompress(static_dir: Path) -> int:
+    """Write .gz (and .br, if brotli is installed) siblings for compressible files; returns files written."""
+    written = 0
+    for path in _source_files(static_dir):
+        size = path.stat().st_size
+        if size > MAX_INLINE_BYTES or not _compressible(path, _media_type(path), size):
+            continue
+        for encoding, body in _compress(path.read_bytes()).items():
+            if len(body) < size:
+                path.with_name(path.name + dict(ENCODINGS)[encoding]).write_bytes(body)
+                written += 1
+    return written
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.spa", description="Precompress a built frontend directory")
+    parser.add_argument("static_dir", type=Path)
+    args = parser.parse_args(argv)
+    written = precompress(args.static_dir)
+    print(f"Wrote {written} precompressed files{'' if brotli is not None else ' (brotli not installed: gzip only)'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
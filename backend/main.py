@@ -1,17 +1,24 @@
+import sys
+
 from app.config import settings
 import uvicorn
 
 
 def start_uvicorn():
+  if settings.ENVIRONMENT != "local":
+    # Supervised, pre-forked workers sharing preloaded content (see app/server.py)
+    from app.server import serve
+    sys.exit(serve())
 
   uvicorn.run(
     "app.main:app",
+    host=settings.SERVER_HOST,
     port=settings.SERVER_PORT,
-    reload=settings.ENVIRONMENT == "local",
+    reload=True,
     timeout_keep_alive=settings.UVICORN_TIMEOUT_KEEP_ALIVE,
     timeout_graceful_shutdown=settings.UVICORN_TIMEOUT_GRACEFUL_SHUTDOWN,
     log_level=settings.LOG_LEVEL
   )
 
 if __name__ == "__main__":
-  start_uvicorn()
\ No newline at end of file
+  start_uvicorn()
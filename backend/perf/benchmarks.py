@@ -0,0 +1,301 @@
+"""
+Microbenchmarks for the hot service paths, with stored baselines.
+
+Each benchmark runs against the real content ("today") and against
+synthetic content packs of increasing size, so growth with the number of
+scenarios/archetypes is visible. Timings are normalized by a fixed
+pure-Python calibration loop, so baselines recorded on one machine remain
+comparable on another.
+
+Usage (from backend/):
+    python -m perf.benchmarks                      # run and print
+    python -m perf.benchmarks --compare            # fail on regressions vs perf/baselines.json
+    python -m perf.benchmarks --save-baseline      # record new baselines
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import timeit
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from pydantic import TypeAdapter
+
+from app.models.enum import Role
+from app.models.session import Archetype, ArchetypeMatch, Choice, Scenario
+from app.repositories import InMemorySessionRepository
+from app.services import archetype_engine, scenario_engine, session_manager
+from app.services.roles import fetch_roles, get_role_by_id
+
+
+BASELINE_FILE = Path(__file__).parent / "baselines.json"
+BENCH_ROLE = Role.ENGINEER
+
+
+@dataclass(frozen=True)
+class PackSize:
+    """Dimensions of a synthetic content pack (None = the real content)."""
+    scenarios: int
+    choices_per_scenario: int
+    archetypes: int
+    traits: int
+    traits_per_archetype: int = 4
+
+
+SCALES: Dict[str, PackSize | None] = {
+    "today": None,
+    "x10": PackSize(scenarios=70, choices_per_scenario=3, archetypes=50, traits=40),
+    "x100": PackSize(scenarios=700, choices_per_scenario=3, archetypes=500, traits=200),
+    "x1000": PackSize(scenarios=7000, choices_per_scenario=3, archetypes=5000, traits=1000),
+}
+
+
+def synthetic_pack(role: Role, size: PackSize, seed: int = 0) -> Tuple[List[Scenario], List[Archetype]]:
+    """Generate ordered scenarios and archetypes with the shape of the real data files."""
+    rng = random.Random(seed)
+    traits = [f"trait_{i}" for i in range(size.traits)]
+    role_response = get_role_by_id(role)
+    scenarios = [
+        Scenario(
+            id=f"{role.value}_scenario_{s}",
+            role=role,
+            title=f"Scenario {s}",
+            description="Synthetic scenario " * 8,
+            choices=[
+                Choice(
+                    id=f"{role.value}_{s}_choice_{c}",
+                    scenario_id=f"{role.value}_scenario_{s}",
+                    choice_text="Synthetic choice " * 4,
+                    traits=rng.sample(traits, 2),
+                )
+                for c in range(1, size.choices_per_scenario + 1)
+            ],
+        )
+        for s in range(1, size.scenarios + 1)
+    ]
+    archetypes = [
+        Archetype(
+            id=f"{role.value}_archetype_{a}",
+            role=role_response,
+            name=f"Archetype {a:05d}",
+            key_traits=rng.sample(traits, size.traits_per_archetype),
+            message="Synthetic archetype " * 10,
+            strengths=["Strength"] * 3,
+            growth_areas=["Growth area"] * 3,
+        )
+        for a in range(1, size.archetypes + 1)
+    ]
+    return scenarios, archetypes
+
+
+@contextmanager
+def installed_pack(role: Role, scenarios: List[Scenario], archetypes: List[Archetype]) -> Iterator[None]:
+    """Temporarily serve a content pack from the service caches for `role`."""
+    saved = (
+        scenario_engine._index_cache.get(role),
+        archetype_engine._archetypes_cache.get(role),
+        archetype_engine._matrix_cache.get(role),
+    )
+    scenario_engine._index_cache[role] = scenario_engine.ScenarioIndex.build(scenarios)
+    archetype_engine._archetypes_cache[role] = archetypes
+    archetype_engine._matrix_cache[role] = archetype_engine.ArchetypeMatrix.build(archetypes)
+    try:
+        yield
+    finally:
+        for cache, value in zip(
+            (scenario_engine._index_cache, archetype_engine._archetypes_cache, archetype_engine._matrix_cache),
+            saved,
+        ):
+            if value is None:
+                cache.pop(role, None)
+            else:
+                cache[role] = value
+
+
+@contextmanager
+def content_for_scale(scale: str) -> Iterator[None]:
+    size = SCALES[scale]
+    if size is None:
+        yield
+        return
+    with installed_pack(BENCH_ROLE, *synthetic_pack(BENCH_ROLE, size)):
+        yield
+
+
+def _playthrough_traits(rng: random.Random) -> Dict[str, int]:
+    trait_counts: Dict[str, int] = {}
+    for scenario in scenario_engine.get_scenario_index(BENCH_ROLE).scenarios:
+        for trait in rng.choice(scenario.choices).traits:
+            trait_counts[trait] = trait_counts.get(trait, 0) + 1
+    return trait_counts
+
+
+def _bench_scenario_lookups() -> Callable[[], None]:
+    index = scenario_engine.get_scenario_index(BENCH_ROLE)
+    rng = random.Random(1)
+    probes = [
+        (scenario.id, rng.choice(scenario.choices).id)
+        for scenario in rng.choices(index.scenarios, k=100)
+    ]
+
+    def run() -> None:
+        for scenario_id, choice_id in probes:
+            scenario_engine.get_scenario_by_id(BENCH_ROLE, scenario_id)
+            scenario_engine.get_next_scenario(BENCH_ROLE, scenario_id)
+            scenario_engine.get_choice_traits(BENCH_ROLE, scenario_id, choice_id)
+    return run
+
+
+def _bench_archetype_report() -> Callable[[], None]:
+    trait_scores = _playthrough_traits(random.Random(2))
+    return lambda: archetype_engine.generate_archetype_report(BENCH_ROLE, trait_scores)
+
+
+def _bench_trait_scores() -> Callable[[], None]:
+    repo = InMemorySessionRepository()
+    session = repo.create_session(BENCH_ROLE)
+    session.trait_counts = _playthrough_traits(random.Random(3))
+    return lambda: session_manager.generate_trait_scores(repo, session.id)
+
+
+def _bench_fetch_roles() -> Callable[[], None]:
+    return lambda: fetch_roles(include_details=True)
+
+
+def _bench_serialize_scenario() -> Callable[[], None]:
+    scenario = scenario_engine.get_first_scenario(BENCH_ROLE)
+    return scenario.model_dump_json
+
+
+def _bench_serialize_report() -> Callable[[], None]:
+    adapter = TypeAdapter(List[ArchetypeMatch])
+    report = archetype_engine.generate_archetype_report(BENCH_ROLE, _playthrough_traits(random.Random(4)))
+    return lambda: adapter.dump_json(report)
+
+
+# name -> (setup returning the timed callable, whether it depends on content size)
+BENCHMARKS: Dict[str, Tuple[Callable[[], Callable[[], None]], bool]] = {
+    "scenario_engine.lookups_x100": (_bench_scenario_lookups, True),
+    "archetype_engine.generate_archetype_report": (_bench_archetype_report, True),
+    "session_manager.generate_trait_scores": (_bench_trait_scores, True),
+    "roles.fetch_roles": (_bench_fetch_roles, False),
+    "serialize.scenario": (_bench_serialize_scenario, False),
+    "serialize.archetype_report": (_bench_serialize_report, True),
+}
+
+
+def _calibration() -> None:
+    total = 0
+    for i in range(10_000):
+        total += i * i % 7
+
+
+def time_call(func: Callable[[], None], repeat: int = 5, min_time: float = 0.2) -> float:
+    """Best-of-`repeat` time per call in microseconds."""
+    timer = timeit.Timer(func)
+    number = 1
+    while (elapsed := timer.timeit(number)) < min_time:
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def run_benchmarks(
+    scales: List[str] | None = None,
+    name_filter: str | None = None,
+    repeat: int = 5,
+    min_time: float = 0.2,
+) -> Dict[str, object]:
+    """Run every selected benchmark at every selected scale."""
+    calibration_us = time_call(_calibration, repeat=repeat, min_time=min_time)
+    results: Dict[str, Dict[str, float]] = {}
+    for scale in scales or list(SCALES):
+        with content_for_scale(scale):
+            for name, (setup, scales_with_content) in BENCHMARKS.items():
+                if name_filter and name_filter not in name:
+                    continue
+                if not scales_with_content and scale != "today":
+                    continue
+                micros = time_call(setup(), repeat=repeat, min_time=min_time)
+                results[f"{name}@{scale}"] = {
+                    "us": round(micros, 3),
+                    "relative": round(micros / calibration_us, 6),
+                }
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "calibration_us": round(calibration_us, 3),
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, object], baseline: Dict[str, object], tolerance: float) -> List[str]:
+    """Benchmarks whose normalized time exceeds the baseline by more than `tolerance` (0.25 = 25%)."""
+    regressions = []
+    for key, result in current["results"].items():
+        reference = baseline["results"].get(key)
+        if reference is None:
+            continue
+        ratio = result["relative"] / reference["relative"]
+        if ratio > 1 + tolerance:
+            regressions.append(f"{key}: {ratio:.2f}x baseline ({result['us']:.2f} us vs {reference['us']:.2f} us)")
+    return regressions
+
+
+def _print_results(current: Dict[str, object], baseline: Dict[str, object] | None) -> None:
+    print(f"calibration: {current['calibration_us']:.1f} us")
+    for key, result in current["results"].items():
+        line = f"{key:<55}{result['us']:>14.2f} us"
+        reference = (baseline or {}).get("results", {}).get(key)
+        if reference is not None:
+            line += f"{result['relative'] / reference['relative']:>8.2f}x"
+        print(line)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m perf.benchmarks", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", default=",".join(SCALES), help="Comma-separated subset of: " + ", ".join(SCALES))
+    parser.add_argument("--filter", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per timing repeat")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument("--compare", action="store_true", help="Exit 1 if any benchmark regressed past --tolerance")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--save-baseline", action="store_true", help="Overwrite the baseline file with this run")
+    parser.add_argument("--output", type=Path, help="Also write this run's results as JSON")
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    scales = [scale.strip() for scale in args.scales.split(",") if scale.strip()]
+    unknown = set(scales) - set(SCALES)
+    if unknown:
+        print(f"Unknown scales: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    current = run_benchmarks(scales, args.filter, args.repeat, args.min_time)
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else None
+    _print_results(current, baseline)
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(current, indent=2) + "\n")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(current, indent=2) + "\n")
+        print(f"Saved baseline to {args.baseline}")
+    if args.compare:
+        if baseline is None:
+            print(f"No baseline at {args.baseline}", file=sys.stderr)
+            return 2
+        regressions = compare(current, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
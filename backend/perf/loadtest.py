@@ -0,0 +1,263 @@
+"""
+End-to-end load test: concurrent virtual users playing full sessions.
+
+Each virtual user repeatedly creates a session, answers every scenario
+(choosing uniformly at random, or by per-choice weights) and fetches the
+resulting profile. By default the ASGI app is driven in-process against a
+scratch database; pass --base-url to load a running server instead.
+
+Usage (from backend/):
+    python -m perf.loadtest --users 20 --playthroughs 5 --output results.json
+    python -m perf.loadtest --base-url http://localhost:8000 --users 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List
+
+import httpx
+
+
+API_PREFIX = "/api/v1"
+ROLES = ("engineer", "product_manager", "founder")
+
+
+@dataclass
+class LoadTestConfig:
+    users: int = 10
+    playthroughs: int = 5
+    role: str | None = None
+    base_url: str | None = None
+    weights: Dict[str, float] = field(default_factory=dict)
+    seed: int | None = None
+    timeout: float = 30.0
+
+
+@dataclass
+class Recorder:
+    """Per-endpoint latencies (seconds) and error counts."""
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: Counter = field(default_factory=Counter)
+    endpoint_errors: Counter = field(default_factory=Counter)
+    playthroughs: int = 0
+
+    async def request(self, client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kwargs: Any) -> Any:
+        """Time one request; returns the decoded JSON body, or None after recording an error."""
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except Exception as exc:
+            # In-process, unhandled app errors (e.g. "database is locked") surface here
+            self.latencies[endpoint].append(time.perf_counter() - start)
+            self._error(endpoint, f"{type(exc).__name__}: {exc}")
+            return None
+        self.latencies[endpoint].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self._error(endpoint, f"HTTP {response.status_code}: {response.text[:200]}")
+            return None
+        return response.json()
+
+    def _error(self, endpoint: str, message: str) -> None:
+        self.endpoint_errors[endpoint] += 1
+        self.errors[f"{endpoint}: {message.splitlines()[0][:200]}"] += 1
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(percent / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _pick_choice(scenario: Dict[str, Any], weights: Dict[str, float], rng: random.Random) -> str:
+    choices = [choice["id"] for choice in scenario["choices"]]
+    if not weights:
+        return rng.choice(choices)
+    return rng.choices(choices, weights=[weights.get(choice_id, 1.0) for choice_id in choices])[0]
+
+
+async def _virtual_user(
+    client: httpx.AsyncClient,
+    config: LoadTestConfig,
+    recorder: Recorder,
+    rng: random.Random,
+) -> None:
+    for _ in range(config.playthroughs):
+        role = config.role or rng.choice(ROLES)
+        created = await recorder.request(client, "create", "POST", f"{API_PREFIX}/sessions/create", params={"role": role})
+        if created is None:
+            continue
+        session_id = created["sessionId"]
+        scenario = created["first_scenario"]
+        while scenario is not None:
+            decided = await recorder.request(
+                client,
+                "decide",
+                "POST",
+                f"{API_PREFIX}/sessions/{session_id}/decide",
+                json={"scenario_id": scenario["id"], "choice_id": _pick_choice(scenario, config.weights, rng)},
+            )
+            if decided is None:
+                break
+            scenario = decided["next_scenario"]
+        else:
+            profile = await recorder.request(client, "profile", "GET", f"{API_PREFIX}/sessions/{session_id}/profile")
+            if profile is not None:
+                recorder.playthroughs += 1
+
+
+@asynccontextmanager
+async def _client(config: LoadTestConfig, app: Any = None) -> AsyncIterator[httpx.AsyncClient]:
+    """HTTP client for a running server, or an in-process ASGI client with the app lifespan running."""
+    limits = httpx.Limits(max_connections=config.users, max_keepalive_connections=config.users)
+    if config.base_url is not None:
+        async with httpx.AsyncClient(base_url=config.base_url, timeout=config.timeout, limits=limits) as client:
+            yield client
+        return
+
+    if app is None:
+        from app.main import app
+    # ASGITransport does not run lifespan events itself
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=config.timeout) as client:
+            yield client
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(config: LoadTestConfig, recorder: Recorder, started_at: datetime, duration: float) -> Dict[str, Any]:
+    """Build the JSON-serializable result of a run."""
+    endpoints = {}
+    total_requests = 0
+    for endpoint, latencies in sorted(recorder.latencies.items()):
+        values = sorted(latencies)
+        total_requests += len(values)
+        endpoints[endpoint] = {
+            "requests": len(values),
+            "errors": recorder.endpoint_errors[endpoint],
+            "throughput_rps": round(len(values) / duration, 2) if duration else 0.0,
+            "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+            "p50_ms": round(_percentile(values, 50) * 1000, 3),
+            "p95_ms": round(_percentile(values, 95) * 1000, 3),
+            "p99_ms": round(_percentile(values, 99) * 1000, 3),
+            "max_ms": round(values[-1] * 1000, 3) if values else 0.0,
+        }
+    return {
+        "started_at": started_at.isoformat(),
+        "commit": _git_commit(),
+        "target": config.base_url or "in-process",
+        "config": {
+            "users": config.users,
+            "playthroughs": config.playthroughs,
+            "role": config.role,
+            "weighted": bool(config.weights),
+            "seed": config.seed,
+        },
+        "duration_s": round(duration, 3),
+        "requests": total_requests,
+        "throughput_rps": round(total_requests / duration, 2) if duration else 0.0,
+        "playthroughs_completed": recorder.playthroughs,
+        "playthroughs_per_s": round(recorder.playthroughs / duration, 2) if duration else 0.0,
+        "errors": sum(recorder.errors.values()),
+        "error_messages": dict(recorder.errors.most_common()),
+        "endpoints": endpoints,
+    }
+
+
+async def run_load_test(config: LoadTestConfig, app: Any = None) -> Dict[str, Any]:
+    """Run all virtual users to completion and return the summary."""
+    recorder = Recorder()
+    seeds = random.Random(config.seed)
+    async with _client(config, app) as client:
+        started_at = datetime.now(UTC)
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(
+                _virtual_user(client, config, recorder, random.Random(seeds.random()))
+                for _ in range(config.users)
+            )
+        )
+        duration = time.perf_counter() - start
+    return summarize(config, recorder, started_at, duration)
+
+
+def _print_summary(result: Dict[str, Any]) -> None:
+    print(
+        f"{result['requests']} requests in {result['duration_s']}s "
+        f"({result['throughput_rps']} req/s, {result['playthroughs_per_s']} playthroughs/s), "
+        f"{result['errors']} errors"
+    )
+    print(f"{'endpoint':<10}{'requests':>10}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for endpoint, stats in result["endpoints"].items():
+        print(
+            f"{endpoint:<10}{stats['requests']:>10}{stats['errors']:>8}"
+            f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}"
+        )
+    for message, count in result["error_messages"].items():
+        print(f"  {count} x {message}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m perf.loadtest", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--playthroughs", type=int, default=5, help="Full sessions per virtual user")
+    parser.add_argument("--role", choices=ROLES, help="Play only this role (default: random per session)")
+    parser.add_argument("--base-url", help="Load a running server instead of the in-process app")
+    parser.add_argument("--weights", type=Path, help="JSON object mapping choice ids to relative weights (default 1)")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument(
+        "--database",
+        type=Path,
+        help="SQLite file for the in-process app (default: a temporary file, removed afterwards)",
+    )
+    parser.add_argument("--output", type=Path, help="Write the JSON result here")
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    config = LoadTestConfig(
+        users=args.users,
+        playthroughs=args.playthroughs,
+        role=args.role,
+        base_url=args.base_url,
+        weights=json.loads(args.weights.read_text()) if args.weights else {},
+        seed=args.seed,
+        timeout=args.timeout,
+    )
+
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as scratch:
+        if config.base_url is None:
+            # Must be set before the app (and its engine) is imported
+            os.environ["DATABASE_PATH"] = str(args.database or Path(scratch) / "loadtest.db")
+        result = asyncio.run(run_load_test(config))
+
+    _print_summary(result)
+    if args.output is not None:
+        args.output.write_text(json.dumps(result, indent=2) + "\n")
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+Cold-start profile: import time per module plus lifespan startup steps.
+
+Starts a fresh interpreter with `-X importtime`, imports app.main and runs
+the app's lifespan startup (schema, content preload, ...) against a
+throwaway database, then reports where the time went: self import time
+per top-level package, the slowest modules, and each startup step.
+Content comes from CONTENT_SNAPSHOT_PATH when it is set, as in the image.
+
+Usage (from backend/):
+    python -m perf.startup                         # print the profile
+    python -m perf.startup --top 40 --json         # machine-readable
+    python -m perf.startup --check                 # exit 1 if over STARTUP_BUDGET_MS
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Mapping, Tuple
+
+from app.config import settings
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+MARKER = "-- startup profile: importing app.main --"
+
+# Runs in the child: only builtin modules are imported before the marker, so
+# every import after it is attributable to the app.
+CHILD = f"""
+import sys, time
+sys.stderr.write({MARKER!r} + "\\n")
+sys.stderr.flush()
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+import asyncio, json
+
+async def run():
+    async with app.main.app.router.lifespan_context(app.main.app):
+        return time.perf_counter()
+
+started = asyncio.run(run())
+json.dump({{
+    "import_ms": (imported - start) * 1000,
+    "startup_ms": (started - imported) * 1000,
+    "steps": app.main.startup_timings,
+}}, sys.stdout)
+"""
+
+
+@dataclass
+class StartupProfile:
+    """Timings (ms) of one cold start."""
+    import_ms: float
+    startup_ms: float
+    process_ms: float
+    steps: Dict[str, float] = field(default_factory=dict)
+    # top-level package -> summed self import time
+    packages: Dict[str, float] = field(default_factory=dict)
+    # (module, self ms, cumulative ms), slowest self time first
+    modules: List[Tuple[str, float, float]] = field(default_factory=list)
+
+    @property
+    def total_ms(self) -> float:
+        """Time from the first app import until the app is ready to serve."""
+        return self.import_ms + self.startup_ms
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, float, float]]:
+    """(module, self ms, cumulative ms) for each `-X importtime` line after MARKER."""
+    modules = []
+    _, found, tail = stderr.partition(MARKER)
+    for line in (tail if found else stderr).splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # the column header
+        modules.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+    return modules
+
+
+def package_totals(modules: List[Tuple[str, float, float]]) -> Dict[str, float]:
+    """Self import time summed per top-level package, largest first."""
+    totals: Dict[str, float] = {}
+    for name, self_ms, _ in modules:
+        package = name.split(".")[0]
+        totals[package] = totals.get(package, 0.0) + self_ms
+    return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+
+def profile_startup(env: Mapping[str, str] | None = None, database: Path | None = None) -> StartupProfile:
+    """Cold-start the app in a child interpreter and collect its timings."""
+    child_env = dict(os.environ if env is None else env)
+    child_env.pop("PYTHONDONTWRITEBYTECODE", None)
+    with tempfile.TemporaryDirectory() as tmp:
+        child_env["DATABASE_PATH"] = str(database or Path(tmp) / "simulator.db")
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", CHILD],
+            cwd=BACKEND_DIR,
+            env=child_env,
+            capture_output=True,
+            text=True,
+        )
+        process_ms = (time.perf_counter() - start) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"Startup failed (exit {completed.returncode}):\n{completed.stderr[-4000:]}")
+
+    result = json.loads(completed.stdout)
+    modules = sorted(parse_importtime(completed.stderr), key=lambda module: -module[1])
+    return StartupProfile(
+        import_ms=result["import_ms"],
+        startup_ms=result["startup_ms"],
+        process_ms=process_ms,
+        steps=result["steps"],
+        packages=package_totals(modules),
+        modules=modules,
+    )
+
+
+def _print_profile(profile: StartupProfile, top: int, budget_ms: float) -> None:
+    print(f"import app.main   {profile.import_ms:>10.1f} ms")
+    print(f"lifespan startup  {profile.startup_ms:>10.1f} ms")
+    for step, elapsed in profile.steps.items():
+        print(f"  {step:<16}{elapsed:>10.1f} ms")
+    print(f"total             {profile.total_ms:>10.1f} ms  (budget {budget_ms:.0f} ms)")
+    print(f"process wall time {profile.process_ms:>10.1f} ms")
+    print("\nSelf import time by package:")
+    for package, elapsed in list(profile.packages.items())[:top]:
+        print(f"  {package:<40}{elapsed:>10.1f} ms")
+    print("\nSlowest modules (self / cumulative):")
+    for name, self_ms, cumulative_ms in profile.modules[:top]:
+        print(f"  {name:<50}{self_ms:>8.1f} ms{cumulative_ms:>10.1f} ms")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m perf.startup", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top", type=int, default=20, help="Packages and modules to list")
+    parser.add_argument("--database", type=Path, help="Start against this database instead of a throwaway one")
+    parser.add_argument("--budget-ms", type=float, default=settings.STARTUP_BUDGET_MS)
+    parser.add_argument("--check", action="store_true", help="Exit 1 if import + startup exceeds --budget-ms")
+    parser.add_argument("--json", action="store_true", help="Print the profile as JSON")
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    profile = profile_startup(database=args.database)
+    if args.json:
+        result = asdict(profile)
+        result["modules"] = result["modules"][:args.top]
+        result["total_ms"] = profile.total_ms
+        print(json.dumps(result, indent=2))
+    else:
+        _print_profile(profile, args.top, args.budget_ms)
+    if args.check and profile.total_ms > args.budget_ms:
+        print(f"OVER BUDGET {profile.total_ms:.1f} ms > {args.budget_ms:.0f} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+import time
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.api.dependencies import get_session_factory
+from app.config import settings
+from app.main import app
+from app.models.enum import Role
+from app.repositories import SqlAlchemySessionRepository
+from app.services import session_manager
+from app.services.rescoring import rescore_job
+
+
+@pytest.fixture
+def admin_client(client, db_session, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    app.dependency_overrides[get_session_factory] = lambda: sessionmaker(bind=db_session.get_bind())
+    return client
+
+
+class TestRescoreEndpoint:
+    """Tests for the /api/v1/admin/rescore endpoints."""
+
+    def test_disabled_without_token_setting(self, client, monkeypatch):
+        """Should hide admin endpoints when ADMIN_TOKEN is unset."""
+        monkeypatch.setattr(settings, "ADMIN_TOKEN", None)
+        response = client.get("/api/v1/admin/rescore", headers={"X-Admin-Token": "anything"})
+        assert response.status_code == 404
+
+    def test_rejects_wrong_token(self, admin_client):
+        """Should return 403 for a missing or wrong token."""
+        assert admin_client.get("/api/v1/admin/rescore").status_code == 403
+        assert admin_client.get("/api/v1/admin/rescore", headers={"X-Admin-Token": "nope"}).status_code == 403
+
+    def test_starts_run_and_reports_progress(self, admin_client):
+        """Should start a background run and expose its progress."""
+        headers = {"X-Admin-Token": "secret"}
+        response = admin_client.post("/api/v1/admin/rescore", json={"chunk_size": 10}, headers=headers)
+        assert response.status_code == 202
+
+        deadline = time.monotonic() + 5
+        while rescore_job.running and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        status = admin_client.get("/api/v1/admin/rescore", headers=headers).json()
+        assert status["running"] is False
+        assert status["progress"]["done"] is True
+        assert status["progress"]["error"] is None
+
+    @pytest.mark.parametrize("body", [{"chunk_size": 0}, {"chunk_size": -5}, {"workers": -1}])
+    def test_rejects_invalid_run_options(self, admin_client, body):
+        """Should refuse chunk sizes below 1 and negative worker counts before starting a run."""
+        response = admin_client.post("/api/v1/admin/rescore", json=body, headers={"X-Admin-Token": "secret"})
+
+        assert response.status_code == 422
+        assert rescore_job.running is False
+
+
+class TestExportEndpoint:
+    """Tests for the /api/v1/admin/export endpoint."""
+
+    def test_streams_ndjson(self, admin_client, db_session):
+        """Should stream one NDJSON line per session as an attachment."""
+        session_manager.create_session(SqlAlchemySessionRepository(db_session), Role.ENGINEER)
+
+        response = admin_client.get("/api/v1/admin/export?role=engineer", headers={"X-Admin-Token": "secret"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert "sessions.ndjson" in response.headers["content-disposition"]
+        assert len(response.text.splitlines()) == 1
+
+    def test_requires_token(self, admin_client):
+        """Should refuse exports without the admin token."""
+        assert admin_client.get("/api/v1/admin/export").status_code == 403
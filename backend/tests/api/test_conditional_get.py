@@ -0,0 +1,100 @@
+"""
+Tests for ETags and conditional GETs on the read endpoints.
+"""
+from app.repositories import InMemorySessionRepository
+
+
+def _create(client) -> str:
+    return client.post("/api/v1/sessions/create?role=engineer").json()["sessionId"]
+
+
+def _decide_all(client, session_id):
+    scenario = client.get(f"/api/v1/sessions/{session_id}").json()["current_scenario"]
+    while scenario is not None:
+        scenario = client.post(
+            f"/api/v1/sessions/{session_id}/decide",
+            json={"scenario_id": scenario["id"], "choice_id": scenario["choices"][0]["id"]},
+        ).json()["next_scenario"]
+
+
+class TestRolesETag:
+    """Tests for content-hash ETags on /roles."""
+
+    def test_revalidation_returns_304(self, client):
+        """Should answer a matching If-None-Match with an empty 304."""
+        response = client.get("/api/v1/roles")
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"] == "public, max-age=300"
+
+        cached = client.get("/api/v1/roles", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
+
+    def test_representations_have_distinct_tags(self, client):
+        """Should tag the detailed and id-only lists differently."""
+        detailed = client.get("/api/v1/roles").headers["etag"]
+        ids_only = client.get("/api/v1/roles?include_details=false").headers["etag"]
+        assert detailed != ids_only
+        assert client.get("/api/v1/roles?include_details=false", headers={"If-None-Match": detailed}).status_code == 200
+
+
+class TestSessionETag:
+    """Tests for version-based ETags on session reads."""
+
+    def test_unchanged_session_returns_304(self, client):
+        """Should serve 304 until the session changes."""
+        session_id = _create(client)
+        response = client.get(f"/api/v1/sessions/{session_id}")
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"] == "private, no-cache"
+
+        assert client.get(f"/api/v1/sessions/{session_id}", headers={"If-None-Match": etag}).status_code == 304
+
+    def test_decide_changes_etag(self, client):
+        """Should serve the new state after a decision invalidates the old tag."""
+        session_id = _create(client)
+        etag = client.get(f"/api/v1/sessions/{session_id}").headers["etag"]
+        client.post(
+            f"/api/v1/sessions/{session_id}/decide",
+            json={"scenario_id": "engineer_scenario_1", "choice_id": "engineer_1_choice_1"},
+        )
+
+        response = client.get(f"/api/v1/sessions/{session_id}", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json()["scenarios_completed"] == 1
+
+    def test_revalidation_skips_loading_the_session(self, client, repository, assert_max_queries):
+        """Should answer from the version probe alone."""
+        session_id = _create(client)
+        etag = client.get(f"/api/v1/sessions/{session_id}").headers["etag"]
+        budget = 0 if isinstance(repository, InMemorySessionRepository) else 1
+
+        with assert_max_queries(budget):
+            assert client.get(f"/api/v1/sessions/{session_id}", headers={"If-None-Match": etag}).status_code == 304
+
+    def test_unknown_session_with_tag_is_404(self, client):
+        """Should not answer 304 for a session that does not exist."""
+        response = client.get(
+            "/api/v1/sessions/00000000-0000-0000-0000-000000000000", headers={"If-None-Match": "*"}
+        )
+        assert response.status_code == 404
+
+
+class TestProfileETag:
+    """Tests for version-based ETags on the stored profile."""
+
+    def test_profile_revalidation(self, client):
+        """Should serve 304 for an unchanged profile and 200 after it is regenerated."""
+        session_id = _create(client)
+        _decide_all(client, session_id)
+        etag = client.get(f"/api/v1/sessions/{session_id}/profile").headers["etag"]
+
+        assert client.get(f"/api/v1/sessions/{session_id}/profile", headers={"If-None-Match": etag}).status_code == 304
+
+        client.post(f"/api/v1/sessions/{session_id}/profile")
+        response = client.get(f"/api/v1/sessions/{session_id}/profile", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
@@ -0,0 +1,61 @@
+"""
+Tests that session responses spliced from prerendered fragments match
+FastAPI's own serialization byte for byte.
+"""
+from app.main import app
+from app.models.enum import Role
+from app.models.schemas import CreateSessionResponse, DecideResponse, SessionResponse
+from app.services import scenario_engine
+
+
+def _reserialized(model, content: bytes) -> bytes:
+    return model.model_validate_json(content).model_dump_json().encode()
+
+
+class TestPrerenderedResponses:
+    """Byte compatibility across a full playthrough."""
+
+    def test_playthrough_matches_model_serialization(self, client):
+        """Should emit exactly what dumping the response models would."""
+        created = client.post("/api/v1/sessions/create?role=engineer")
+        assert created.headers["content-type"] == "application/json"
+        assert created.content == _reserialized(CreateSessionResponse, created.content)
+
+        session_id = created.json()["sessionId"]
+        scenario = created.json()["first_scenario"]
+        while scenario is not None:
+            session = client.get(f"/api/v1/sessions/{session_id}")
+            assert session.content == _reserialized(SessionResponse, session.content)
+
+            decided = client.post(
+                f"/api/v1/sessions/{session_id}/decide",
+                json={"scenario_id": scenario["id"], "choice_id": scenario["choices"][-1]["id"]},
+            )
+            assert decided.content == _reserialized(DecideResponse, decided.content)
+            scenario = decided.json()["next_scenario"]
+
+        completed = client.get(f"/api/v1/sessions/{session_id}")
+        assert b'"current_scenario":null' in completed.content
+        assert b'"is_completed":true' in completed.content
+        assert completed.content == _reserialized(SessionResponse, completed.content)
+
+    def test_openapi_keeps_response_models(self):
+        """Should still document the response schemas."""
+        schemas = app.openapi()["components"]["schemas"]
+        assert {"CreateSessionResponse", "SessionResponse", "DecideResponse"} <= set(schemas)
+
+
+class TestScenarioFragments:
+    """Tests for the prerendered scenario cache."""
+
+    def test_indexed_scenarios_use_cached_bytes(self):
+        """Should serve the same bytes object for an indexed scenario."""
+        scenario = scenario_engine.get_first_scenario(Role.ENGINEER)
+        assert scenario_engine.get_scenario_json(scenario) is scenario_engine.get_scenario_json(scenario)
+        assert scenario_engine.get_scenario_json(scenario) == scenario.model_dump_json().encode()
+
+    def test_unindexed_scenario_is_dumped(self):
+        """Should not serve cached bytes for a scenario object that is not in the index."""
+        scenario = scenario_engine.get_first_scenario(Role.ENGINEER)
+        edited = scenario.model_copy(update={"title": "Edited"})
+        assert b'"title":"Edited"' in scenario_engine.get_scenario_json(edited)
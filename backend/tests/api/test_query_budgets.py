@@ -0,0 +1,95 @@
+"""
+Pinned per-route SQL statement budgets.
+
+Raising a budget should be a deliberate change: it usually means a lazy
+load or a redundant session reload has crept into the request path.
+"""
+import pytest
+
+from app.repositories import InMemorySessionRepository
+
+
+def _decide(client, session_id, scenario):
+    return client.post(
+        f"/api/v1/sessions/{session_id}/decide",
+        json={"scenario_id": scenario["id"], "choice_id": scenario["choices"][0]["id"]},
+    ).json()
+
+
+def _play(client, session_id, remaining: int = 0):
+    """Answer scenarios until `remaining` are left; returns the next unanswered scenario."""
+    session = client.get(f"/api/v1/sessions/{session_id}").json()
+    scenario = session["current_scenario"]
+    for _ in range(session["total_scenarios"] - session["scenarios_completed"] - remaining):
+        scenario = _decide(client, session_id, scenario)["next_scenario"]
+    return scenario
+
+
+@pytest.fixture
+def session_id(client):
+    return client.post("/api/v1/sessions/create?role=engineer").json()["sessionId"]
+
+
+class TestQueryBudgets:
+    """Each route must stay within its statement budget."""
+
+    def test_create_session(self, client, assert_max_queries):
+        with assert_max_queries(1):
+            assert client.post("/api/v1/sessions/create?role=engineer").status_code == 200
+
+    def test_get_session(self, client, session_id, assert_max_queries):
+        with assert_max_queries(1):
+            assert client.get(f"/api/v1/sessions/{session_id}").status_code == 200
+
+    def test_decide(self, client, session_id, assert_max_queries):
+        # load session, upsert choice stats, insert response, update counters
+        scenario = client.get(f"/api/v1/sessions/{session_id}").json()["current_scenario"]
+        with assert_max_queries(4):
+            response = _decide(client, session_id, scenario)
+        assert response["next_scenario"] is not None
+
+    def test_final_decide_stores_profile(self, client, session_id, assert_max_queries):
+        # ...plus the archetype stats upsert
+        last = _play(client, session_id, remaining=1)
+        with assert_max_queries(5):
+            response = _decide(client, session_id, last)
+        assert response["is_completed"] is True
+
+    def test_get_profile(self, client, session_id, assert_max_queries):
+        _play(client, session_id)
+        with assert_max_queries(1):
+            assert client.get(f"/api/v1/sessions/{session_id}/profile").status_code == 200
+
+    def test_bundle(self, client, session_id, assert_max_queries):
+        with assert_max_queries(1):
+            assert client.get(f"/api/v1/sessions/{session_id}/bundle").status_code == 200
+
+    def test_batched_full_run(self, client, session_id, assert_max_queries):
+        # load session, one executemany insert, choice and archetype stats upserts, update session
+        scenarios = client.get(f"/api/v1/sessions/{session_id}/bundle").json()["scenarios"]
+        decisions = [{"scenario_id": s["id"], "choice_id": s["choices"][0]["id"]} for s in scenarios]
+        with assert_max_queries(5):
+            response = client.post(f"/api/v1/sessions/{session_id}/decisions", json={"decisions": decisions})
+        assert response.json()["is_completed"] is True
+
+    def test_read_only_routes(self, client, assert_max_queries):
+        with assert_max_queries(0):
+            assert client.get("/api/v1/roles").status_code == 200
+        with assert_max_queries(2):
+            assert client.get("/api/v1/stats/engineer").status_code == 200
+
+    def test_query_count_header(self, client, session_id):
+        """Should report the request's statement count outside production."""
+        response = client.get(f"/api/v1/sessions/{session_id}")
+        assert int(response.headers["x-db-query-count"]) <= 1
+
+
+class TestAssertMaxQueries:
+    """Tests for the query budget guard itself."""
+
+    def test_fails_with_statements_over_budget(self, client, repository, session_id, assert_max_queries):
+        if isinstance(repository, InMemorySessionRepository):
+            pytest.skip("the in-memory backend issues no SQL")
+        with pytest.raises(AssertionError, match="Expected at most 0 queries, got 1:\n  1. SELECT"):
+            with assert_max_queries(0):
+                client.get(f"/api/v1/sessions/{session_id}")
@@ -1,6 +1,8 @@
 from uuid import UUID
 
 from app.models.enum import Role
+from app.models.schemas import SessionBundleResponse
+from app.services import scenario_engine
 from app.services.scenario_engine import get_total_scenarios
 
 class TestCreateSessionEndpoint:
@@ -179,6 +181,20 @@ class TestDecideEndpoint:
         assert data2["is_completed"] is (data2["scenarios_completed"] == data2["total_scenarios"])
 
 
+    def test_decide_same_scenario_twice(self, client):
+        """Should return 400 when a scenario is answered a second time."""
+        create_response = client.post("/api/v1/sessions/create?role=engineer")
+        session_id = create_response.json()["sessionId"]
+        body = {"scenario_id": "engineer_scenario_1", "choice_id": "engineer_1_choice_1"}
+
+        first = client.post(f"/api/v1/sessions/{session_id}/decide", json=body)
+        second = client.post(f"/api/v1/sessions/{session_id}/decide", json=body)
+
+        assert first.status_code == 200
+        assert second.status_code == 400
+        assert "already answered" in second.json()["detail"]
+
+
 class TestGenerateProfileEndpoint:
     """Tests for POST /sessions/{sesssion_id}/profile endpoint."""
 
@@ -270,3 +286,74 @@ class TestGetRoleProfileEndpoint:
         fake_id = "00000000-0000-0000-0000-000000000000"
         response = client.get(f"/api/v1/sessions/{fake_id}/profile")
         assert response.status_code == 404
+
+
+class TestBundleEndpoint:
+    """Tests for GET /api/v1/sessions/{session_id}/bundle"""
+
+    def test_bundle_contains_all_scenarios_in_order(self, client):
+        """Should return the role and every scenario, matching model serialization."""
+        session_id = client.post("/api/v1/sessions/create?role=engineer").json()["sessionId"]
+
+        response = client.get(f"/api/v1/sessions/{session_id}/bundle")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["sessionId"] == session_id
+        assert data["role"]["id"] == "engineer"
+        assert [s["id"] for s in data["scenarios"]] == [
+            s.id for s in scenario_engine.get_scenarios_for_role(Role.ENGINEER)
+        ]
+        assert data["total_scenarios"] == len(data["scenarios"])
+        assert response.content == SessionBundleResponse.model_validate_json(response.content).model_dump_json().encode()
+
+    def test_bundle_is_cacheable(self, client):
+        """Should carry a content ETag and answer revalidation with 304."""
+        session_id = client.post("/api/v1/sessions/create?role=engineer").json()["sessionId"]
+        etag = client.get(f"/api/v1/sessions/{session_id}/bundle").headers["etag"]
+
+        response = client.get(f"/api/v1/sessions/{session_id}/bundle", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.headers["cache-control"] == "private, max-age=300"
+
+    def test_bundle_invalid_session(self, client):
+        """Should return 404 for non-existent session."""
+        response = client.get("/api/v1/sessions/00000000-0000-0000-0000-000000000000/bundle")
+        assert response.status_code == 404
+
+
+class TestDecisionsEndpoint:
+    """Tests for POST /api/v1/sessions/{session_id}/decisions"""
+
+    def test_full_run_returns_profile(self, client):
+        """Should record every decision and return the stored profile."""
+        created = client.post("/api/v1/sessions/create?role=engineer").json()
+        session_id = created["sessionId"]
+        bundle = client.get(f"/api/v1/sessions/{session_id}/bundle").json()
+        decisions = [
+            {"scenario_id": scenario["id"], "choice_id": scenario["choices"][0]["id"]}
+            for scenario in bundle["scenarios"]
+        ]
+
+        response = client.post(f"/api/v1/sessions/{session_id}/decisions", json={"decisions": decisions})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["is_completed"] is True
+        assert data["next_scenario"] is None
+        assert data["scenarios_completed"] == bundle["total_scenarios"]
+        assert data["role_profile"] == client.get(f"/api/v1/sessions/{session_id}/profile").json()
+
+    def test_out_of_order_batch_rejected(self, client):
+        """Should return 400 and record nothing when a decision skips ahead."""
+        session_id = client.post("/api/v1/sessions/create?role=engineer").json()["sessionId"]
+
+        response = client.post(
+            f"/api/v1/sessions/{session_id}/decisions",
+            json={"decisions": [{"scenario_id": "engineer_scenario_2", "choice_id": "engineer_2_choice_1"}]},
+        )
+
+        assert response.status_code == 400
+        assert "Expected a decision for scenario engineer_scenario_1" in response.json()["detail"]
+        assert client.get(f"/api/v1/sessions/{session_id}").json()["scenarios_completed"] == 0
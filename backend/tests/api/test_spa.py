@@ -0,0 +1,122 @@
+"""
+Tests for serving the built frontend from the in-memory static manifest.
+"""
+import gzip
+
+import pytest
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from app.spa import IMMUTABLE, REVALIDATE, SHORT_LIVED, SpaFiles, accepted_encodings, precompress
+
+
+INDEX_HTML = "<!doctype html><html><body><div id=root></div></body></html>" + " " * 2000
+APP_JS = "console.log('startup simulator');\n" * 200
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_text(INDEX_HTML)
+    (tmp_path / "assets" / "index-BvK3x9aQ.js").write_text(APP_JS)
+    (tmp_path / "assets" / "logo-Dk2m8XpQ.png").write_bytes(b"\x89PNG" + bytes(range(256)))
+    (tmp_path / "favicon.svg").write_text("<svg/>")
+    return tmp_path
+
+
+@pytest.fixture
+def spa_client(static_dir):
+    spa_files = SpaFiles(static_dir)
+    app = FastAPI()
+
+    @app.api_route("/{full_path:path}", methods=["GET", "HEAD"])
+    async def serve_spa(full_path: str, request: Request) -> Response:
+        return spa_files.response(full_path, request.headers)
+
+    return TestClient(app)
+
+
+class TestStaticFiles:
+    """Tests for lookup, caching and compression headers."""
+
+    def test_hashed_asset_is_immutable_and_precompressed(self, spa_client):
+        """Should serve the gzip variant of a hashed asset with a long-lived cache."""
+        response = spa_client.get("/assets/index-BvK3x9aQ.js", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == IMMUTABLE
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert "javascript" in response.headers["content-type"]
+        assert int(response.headers["content-length"]) < len(APP_JS)
+        assert response.text == APP_JS
+
+    def test_identity_when_gzip_not_accepted(self, spa_client):
+        """Should fall back to the uncompressed body with a different ETag."""
+        compressed = spa_client.get("/assets/index-BvK3x9aQ.js", headers={"Accept-Encoding": "gzip"})
+        identity = spa_client.get("/assets/index-BvK3x9aQ.js", headers={"Accept-Encoding": "gzip;q=0, identity"})
+
+        assert "content-encoding" not in identity.headers
+        assert int(identity.headers["content-length"]) == len(APP_JS)
+        assert identity.headers["etag"] != compressed.headers["etag"]
+
+    def test_small_and_binary_files_are_not_compressed(self, spa_client):
+        """Should skip variants for tiny or already-compressed files."""
+        for path in ("/favicon.svg", "/assets/logo-Dk2m8XpQ.png"):
+            response = spa_client.get(path, headers={"Accept-Encoding": "gzip"})
+            assert "content-encoding" not in response.headers
+        assert spa_client.get("/favicon.svg").headers["cache-control"] == SHORT_LIVED
+
+    def test_index_revalidates_with_etag(self, spa_client):
+        """Should answer a matching If-None-Match on index.html with 304."""
+        response = spa_client.get("/")
+        etag = response.headers["etag"]
+
+        assert response.headers["cache-control"] == REVALIDATE
+        assert response.text == INDEX_HTML
+
+        revalidated = spa_client.get("/", headers={"If-None-Match": f"W/{etag}"})
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+        assert revalidated.headers["etag"] == etag
+
+    def test_client_routes_fall_back_to_index(self, spa_client):
+        """Should serve index.html for unknown non-asset paths."""
+        response = spa_client.get("/simulation/engineer")
+        assert response.status_code == 200
+        assert response.text == INDEX_HTML
+
+    def test_missing_asset_is_404(self, spa_client):
+        """Should not answer a stale asset URL with HTML."""
+        assert spa_client.get("/assets/index-OldHash1.js").status_code == 404
+
+    def test_head(self, spa_client):
+        """Should send headers without a body."""
+        response = spa_client.head("/assets/index-BvK3x9aQ.js")
+        assert response.status_code == 200
+        assert response.content == b""
+        assert int(response.headers["content-length"]) < len(APP_JS)
+
+
+class TestPrecompress:
+    """Tests for build-time variants."""
+
+    def test_prebuilt_variants_are_served(self, static_dir):
+        """Should write .gz siblings and prefer them over startup compression."""
+        assert precompress(static_dir) >= 2
+        assert gzip.decompress((static_dir / "index.html.gz").read_bytes()).decode() == INDEX_HTML
+
+        spa_files = SpaFiles(static_dir, compress=False)
+        assert "gzip" in spa_files.files["assets/index-BvK3x9aQ.js"].variants
+        assert "index.html.gz" not in spa_files.files
+
+    def test_requires_index(self, tmp_path):
+        """Should refuse a directory without index.html."""
+        with pytest.raises(ValueError):
+            SpaFiles(tmp_path)
+
+
+def test_accepted_encodings():
+    """Should drop codings with q=0 and keep the rest."""
+    assert accepted_encodings("br;q=1.0, gzip, deflate;q=0") == ["br", "gzip"]
+    assert accepted_encodings("") == []
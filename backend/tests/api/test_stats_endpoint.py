@@ -0,0 +1,25 @@
+class TestRoleStatsEndpoint:
+    """Tests for the GET /api/v1/stats/{role} endpoint."""
+
+    def test_stats_reflect_decisions(self, client):
+        """Should count a submitted decision under its scenario and choice."""
+        session_id = client.post("/api/v1/sessions/create?role=engineer").json()["sessionId"]
+        client.post(
+            f"/api/v1/sessions/{session_id}/decide",
+            json={"scenario_id": "engineer_scenario_1", "choice_id": "engineer_1_choice_2"},
+        )
+
+        response = client.get("/api/v1/stats/engineer")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["role"] == "engineer"
+        assert data["choices"] == [
+            {"scenario_id": "engineer_scenario_1", "choice_id": "engineer_1_choice_2", "count": 1}
+        ]
+        assert data["archetypes"] == []
+
+    def test_invalid_role(self, client):
+        """Should return 422 for an unknown role."""
+        response = client.get("/api/v1/stats/astronaut")
+        assert response.status_code == 422
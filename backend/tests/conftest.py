@@ -8,8 +8,11 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
+from app.api.dependencies import get_session_repository
 from app.db.database import get_db
 from app.db.models import Base
+from app.observability import assert_max_queries as assert_max_queries_on, instrument_engine
+from app.repositories import InMemorySessionRepository, SqlAlchemySessionRepository
 
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -20,6 +23,8 @@ engine = create_engine(
     poolclass=StaticPool,
 )
 
+instrument_engine(engine)
+
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -36,19 +41,43 @@ def db_session():
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(scope="function", params=["sqlalchemy", "memory"])
+def repository(request, db_session):
+    """Session repository for each storage backend, so every test runs against both."""
+    if request.param == "memory":
+        return InMemorySessionRepository()
+    return SqlAlchemySessionRepository(db_session)
+
+
 @pytest.fixture(scope="function")
-def client(db_session):
-    """Create a test client with overridden database dependency."""
+def client(db_session, repository):
+    """Create a test client with overridden database and repository dependencies."""
     
     def override_get_db():
         try:
             yield db_session
         finally:
             pass
+
+    def override_get_session_repository():
+        yield repository
     
     app.dependency_overrides[get_db] = override_get_db  # type: ignore
+    app.dependency_overrides[get_session_repository] = override_get_session_repository  # type: ignore
     
     with TestClient(app) as test_client:
         yield test_client
     
     app.dependency_overrides.clear()  # type: ignore
+
+
+@pytest.fixture
+def assert_max_queries():
+    """
+    Context manager asserting a block runs at most N statements on the test database.
+
+    Example:
+        with assert_max_queries(3):
+            client.get(...)
+    """
+    return lambda limit: assert_max_queries_on(engine, limit)
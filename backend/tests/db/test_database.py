@@ -0,0 +1,28 @@
+"""
+Tests for the SQLite connection profile.
+"""
+from sqlalchemy import create_engine, event
+
+from app.config import settings
+from app.db.database import apply_sqlite_pragmas, get_sqlite_profile
+
+
+class TestSqliteProfile:
+    """Tests for pragmas applied on every new connection."""
+
+    def test_pragmas_applied_on_connect(self, tmp_path, monkeypatch):
+        """Should apply the configured pragmas to each pooled connection."""
+        monkeypatch.setattr(settings, "SQLITE_SYNCHRONOUS", "FULL")
+        monkeypatch.setattr(settings, "SQLITE_BUSY_TIMEOUT_MS", 1234)
+        engine = create_engine(f"sqlite:///{tmp_path}/profile.db")
+        event.listen(engine, "connect", apply_sqlite_pragmas)
+
+        profile = get_sqlite_profile(engine)
+
+        assert profile["journal_mode"] == "wal"
+        assert profile["synchronous"] == 2
+        assert profile["busy_timeout"] == 1234
+        assert profile["mmap_size"] == settings.SQLITE_MMAP_SIZE
+        assert profile["cache_size"] == settings.SQLITE_CACHE_SIZE
+        assert profile["temp_store"] == 2
+        engine.dispose()
@@ -0,0 +1,120 @@
+"""
+Tests for the Prometheus metrics registry and request instrumentation.
+"""
+from app.db.database import engine
+from app.observability.metrics import DB_QUERY_LATENCY, Counter, Gauge, Histogram, MetricsRegistry
+from app.observability.shared import SharedMetrics
+
+
+class TestMetricsRegistry:
+    """Tests for the text exposition format."""
+
+    def test_counter_and_gauge(self):
+        """Should render labelled counters and plain gauges."""
+        registry = MetricsRegistry()
+        counter = registry.register(Counter("requests_total", "Requests.", ("route",)))
+        gauge = registry.register(Gauge("in_flight", "In flight."))
+        counter.inc(route="/a")
+        counter.inc(2, route='/b"q')
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+
+        lines = registry.render().splitlines()
+
+        assert "# TYPE requests_total counter" in lines
+        assert 'requests_total{route="/a"} 1' in lines
+        assert 'requests_total{route="/b\\"q"} 2' in lines
+        assert "in_flight 1" in lines
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Should count each observation in its bucket and every larger one."""
+        registry = MetricsRegistry()
+        histogram = registry.register(Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0)))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, route="/a")
+
+        lines = registry.render().splitlines()
+
+        assert 'latency_seconds_bucket{route="/a",le="0.1"} 2' in lines
+        assert 'latency_seconds_bucket{route="/a",le="1"} 3' in lines
+        assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+        assert 'latency_seconds_count{route="/a"} 4' in lines
+        assert 'latency_seconds_sum{route="/a"} 3.65' in lines
+
+
+def _worker_registry():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("requests_total", "Requests.", ("route",)))
+    gauge = registry.register(Gauge("in_flight", "In flight."))
+    histogram = registry.register(Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0)))
+    return registry, counter, gauge, histogram
+
+
+class TestSharedMetrics:
+    """Tests for summing the registries of several worker processes."""
+
+    def test_renders_sum_of_workers(self, tmp_path):
+        """Should add every other worker's published snapshot to the scraped worker's live values."""
+        first, first_requests, first_in_flight, first_latency = _worker_registry()
+        second, second_requests, second_in_flight, second_latency = _worker_registry()
+        first_requests.inc(route="/a")
+        second_requests.inc(2, route="/a")
+        second_requests.inc(route="/b")
+        first_in_flight.inc()
+        second_in_flight.inc()
+        first_latency.observe(0.05)
+        second_latency.observe(0.5)
+        SharedMetrics(tmp_path, 1, registry=second).write()
+
+        lines = SharedMetrics(tmp_path, 0, registry=first).render().splitlines()
+
+        assert 'requests_total{route="/a"} 3' in lines
+        assert 'requests_total{route="/b"} 1' in lines
+        assert "in_flight 2" in lines
+        assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+        assert 'latency_seconds_bucket{le="1"} 2' in lines
+        assert "latency_seconds_count 2" in lines
+
+    def test_ignores_own_snapshot_and_bad_files(self, tmp_path):
+        """Should not count the scraped worker twice or fail on a half-written snapshot."""
+        registry, requests, _, _ = _worker_registry()
+        requests.inc(route="/a")
+        shared = SharedMetrics(tmp_path, 0, registry=registry)
+        shared.write()
+        (tmp_path / "worker-1.pickle").write_bytes(b"")
+
+        assert 'requests_total{route="/a"} 1' in shared.render().splitlines()
+
+
+class TestMetricsEndpoint:
+    """Tests for the middleware and /metrics endpoint."""
+
+    def test_records_route_template_and_status(self, client):
+        """Should label requests by route template rather than raw path."""
+        session_id = client.post("/api/v1/sessions/create?role=engineer").json()["sessionId"]
+        client.get(f"/api/v1/sessions/{session_id}")
+        client.get("/api/v1/does-not-exist")
+
+        body = client.get("/metrics").text
+
+        assert 'http_requests_total{method="GET",route="/api/v1/sessions/{session_id}",status="200"}' in body
+        assert 'route="/api/v1/sessions/create",status="200"' in body
+        assert 'http_requests_total{method="GET",route="unmatched",status="404"}' in body
+        assert session_id not in body
+        assert "http_requests_in_flight " in body
+
+    def test_server_timing_header(self, client):
+        """Should break response time down into app and database time."""
+        response = client.post("/api/v1/sessions/create?role=engineer")
+
+        parts = {item.split(";")[0].strip() for item in response.headers["server-timing"].split(",")}
+        assert parts == {"app", "db", "pool", "total"}
+
+    def test_database_time_recorded(self):
+        """Should observe statement times on the instrumented application engine."""
+        before = DB_QUERY_LATENCY.count()
+        with engine.connect() as conn:
+            conn.exec_driver_sql("SELECT 1")
+
+        assert DB_QUERY_LATENCY.count() == before + 1
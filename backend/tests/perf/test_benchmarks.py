@@ -0,0 +1,43 @@
+from app.models.enum import Role
+from app.services import archetype_engine, scenario_engine
+from perf.benchmarks import PackSize, compare, installed_pack, run_benchmarks, synthetic_pack
+
+
+class TestBenchmarks:
+    """Tests for the microbenchmark suite's plumbing."""
+
+    def test_installed_pack_is_served_then_restored(self):
+        """Should serve the synthetic pack inside the context and the real content after."""
+        original = scenario_engine.get_scenario_index(Role.ENGINEER)
+        scenarios, archetypes = synthetic_pack(Role.ENGINEER, PackSize(scenarios=20, choices_per_scenario=3, archetypes=15, traits=10))
+
+        with installed_pack(Role.ENGINEER, scenarios, archetypes):
+            assert scenario_engine.get_total_scenarios(Role.ENGINEER) == 20
+            assert len(archetype_engine.generate_archetype_report(Role.ENGINEER, {"trait_1": 1})) == 15
+
+        assert scenario_engine.get_scenario_index(Role.ENGINEER) is original
+        assert archetype_engine.get_archetypes_for_role(Role.ENGINEER)[0].id.startswith("engineer_")
+        assert "trait_1" not in archetype_engine.get_archetype_matrix(Role.ENGINEER).trait_ids
+
+    def test_run_reports_each_scale(self):
+        """Should time size-dependent benchmarks at every scale and fixed ones only today."""
+        current = run_benchmarks(["today", "x10"], repeat=1, min_time=0.001)
+
+        assert "archetype_engine.generate_archetype_report@x10" in current["results"]
+        assert "roles.fetch_roles@today" in current["results"]
+        assert "roles.fetch_roles@x10" not in current["results"]
+        assert all(result["us"] > 0 for result in current["results"].values())
+
+    def test_compare_flags_regressions_past_tolerance(self):
+        """Should report only benchmarks slower than baseline by more than the tolerance."""
+        baseline = {"results": {"a@today": {"us": 1.0, "relative": 1.0}, "b@today": {"us": 1.0, "relative": 1.0}}}
+        current = {"results": {
+            "a@today": {"us": 1.2, "relative": 1.2},
+            "b@today": {"us": 1.5, "relative": 1.5},
+            "c@today": {"us": 9.0, "relative": 9.0},
+        }}
+
+        regressions = compare(current, baseline, tolerance=0.25)
+
+        assert len(regressions) == 1
+        assert regressions[0].startswith("b@today: 1.50x")
@@ -0,0 +1,50 @@
+import asyncio
+
+from app.api.dependencies import get_session_repository
+from app.main import app
+from app.repositories import InMemorySessionRepository
+from perf.loadtest import LoadTestConfig, Recorder, _client, _percentile, run_load_test
+
+
+class TestLoadTest:
+    """Smoke tests for the in-process load-test harness."""
+
+    def test_full_playthroughs_in_process(self):
+        """Should complete every playthrough and report each endpoint."""
+        repository = InMemorySessionRepository()
+        app.dependency_overrides[get_session_repository] = lambda: repository
+        try:
+            result = asyncio.run(
+                run_load_test(LoadTestConfig(users=3, playthroughs=2, role="engineer", seed=7), app=app)
+            )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert result["errors"] == 0
+        assert result["playthroughs_completed"] == 6
+        assert set(result["endpoints"]) == {"create", "decide", "profile"}
+        assert result["endpoints"]["create"]["requests"] == 6
+        assert result["endpoints"]["decide"]["p50_ms"] <= result["endpoints"]["decide"]["p99_ms"]
+
+    def test_unknown_session_counts_as_error(self):
+        """Should record failing requests instead of raising."""
+        async def scenario():
+            recorder = Recorder()
+            async with _client(LoadTestConfig(), app) as client:
+                body = await recorder.request(
+                    client, "profile", "GET", "/api/v1/sessions/00000000-0000-0000-0000-000000000000/profile"
+                )
+            return body, recorder
+
+        body, recorder = asyncio.run(scenario())
+
+        assert body is None
+        assert recorder.endpoint_errors["profile"] == 1
+        assert next(iter(recorder.errors)).startswith("profile: HTTP 404")
+
+    def test_percentile_nearest_rank(self):
+        """Should use nearest-rank percentiles."""
+        values = [float(v) for v in range(1, 101)]
+        assert _percentile(values, 50) == 50.0
+        assert _percentile(values, 99) == 99.0
+        assert _percentile([], 95) == 0.0
@@ -0,0 +1,39 @@
+from app.config import settings
+from app.services.content_loader import write_content_snapshot
+from perf.startup import MARKER, package_totals, parse_importtime, profile_startup
+
+
+IMPORTTIME = f"""import time: self [us] | cumulative | imported package
+import time:       120 |        120 | encodings
+{MARKER}
+import time: self [us] | cumulative | imported package
+import time:      1500 |       1500 |     sqlalchemy.sql
+import time:       500 |       2000 |   sqlalchemy
+import time:      3000 |       5000 | app.main
+"""
+
+
+class TestStartupProfile:
+    """Tests for the cold-start profile and budget."""
+
+    def test_parse_importtime_skips_interpreter_startup(self):
+        """Should only attribute imports after the marker, in milliseconds."""
+        modules = parse_importtime(IMPORTTIME)
+
+        assert modules == [("sqlalchemy.sql", 1.5, 1.5), ("sqlalchemy", 0.5, 2.0), ("app.main", 3.0, 5.0)]
+        assert package_totals(modules) == {"app": 3.0, "sqlalchemy": 2.0}
+
+    def test_cold_start_within_budget(self, tmp_path, monkeypatch):
+        """Should import app.main and finish lifespan startup from a snapshot within STARTUP_BUDGET_MS."""
+        snapshot = tmp_path / "content.snapshot"
+        write_content_snapshot(snapshot)
+        monkeypatch.setenv("CONTENT_SNAPSHOT_PATH", str(snapshot))
+
+        profile = profile_startup(database=tmp_path / "simulator.db")
+
+        assert {"schema", "content"} <= set(profile.steps)
+        assert profile.packages["app"] > 0
+        assert profile.total_ms <= settings.STARTUP_BUDGET_MS, (
+            f"Cold start took {profile.total_ms:.0f} ms (budget {settings.STARTUP_BUDGET_MS:.0f} ms); "
+            "run `python -m perf.startup` to see where the time goes"
+        )
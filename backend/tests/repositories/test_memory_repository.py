@@ -0,0 +1,119 @@
+"""
+Tests for the in-memory session repository.
+"""
+import threading
+from uuid import UUID
+
+import pytest
+
+from app.db.models import ScenarioResponseModel
+from app.models.enum import Role
+from app.repositories import DuplicateResponseError, InMemorySessionRepository
+from app.services import outcome_table, scenario_engine, session_manager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestInMemorySessionRepository:
+    """Tests for LRU capacity and TTL eviction."""
+
+    def test_evicts_least_recently_used_beyond_capacity(self):
+        """Should drop the least recently used session when full."""
+        repo = InMemorySessionRepository(capacity=2)
+        first = repo.create_session(Role.ENGINEER)
+        second = repo.create_session(Role.ENGINEER)
+
+        # Touch the first session so the second becomes least recently used
+        assert repo.get_session(UUID(first.id)) is first
+        repo.create_session(Role.FOUNDER)
+
+        assert len(repo) == 2
+        assert repo.get_session(UUID(first.id)) is first
+        assert repo.get_session(UUID(second.id)) is None
+
+    def test_expires_idle_sessions(self):
+        """Should expire sessions idle for longer than the TTL."""
+        clock = FakeClock()
+        repo = InMemorySessionRepository(ttl_seconds=60, clock=clock)
+        active = repo.create_session(Role.ENGINEER)
+        idle = repo.create_session(Role.ENGINEER)
+
+        clock.now = 45
+        assert repo.get_session(UUID(active.id)) is active
+        clock.now = 90
+
+        assert repo.get_session(UUID(idle.id)) is None
+        assert repo.get_session(UUID(active.id)) is active
+
+    def test_rejects_duplicate_scenario_answers(self):
+        """Should reject a second answer to the same scenario."""
+        repo = InMemorySessionRepository()
+        session = repo.create_session(Role.ENGINEER)
+        repo.add_response(session, ScenarioResponseModel(scenario_id="s1", choice_id="c1", traits=["x"], sequence=1))
+
+        with pytest.raises(DuplicateResponseError):
+            repo.add_response(session, ScenarioResponseModel(scenario_id="s1", choice_id="c2", traits=["y"], sequence=2))
+
+        assert [r.choice_id for r in session.scenario_responses] == ["c1"]
+
+    def test_capacity_must_be_positive(self):
+        """Should refuse a zero-capacity store."""
+        with pytest.raises(ValueError):
+            InMemorySessionRepository(capacity=0)
+
+
+class TestConcurrentUpdates:
+    """Tests for counter updates on records shared between requests."""
+
+    def test_choices_wait_for_the_session_guard(self):
+        """Should apply a choice's counter update only while holding the shared session guard."""
+        repo = InMemorySessionRepository()
+        session = repo.create_session(Role.ENGINEER)
+        scenario = scenario_engine.get_first_scenario(Role.ENGINEER)
+        worker = threading.Thread(
+            target=session_manager.submit_choice,
+            args=(repo, UUID(session.id), scenario.id, scenario.choices[-1].id),
+        )
+
+        with repo.session_update(session):
+            worker.start()
+            worker.join(timeout=0.1)
+            assert worker.is_alive()
+            assert session.scenarios_completed == 0
+            assert session.version == 0
+        worker.join(timeout=5)
+
+        assert not worker.is_alive()
+        assert session.scenarios_completed == 1
+        assert session.version == 1
+        assert session.path_code == outcome_table.path_contribution(Role.ENGINEER, scenario.id, scenario.choices[-1].id)
+
+    def test_concurrent_choices_do_not_lose_updates(self):
+        """Should apply every concurrent answer to the shared counters and version."""
+        repo = InMemorySessionRepository()
+        session = repo.create_session(Role.ENGINEER)
+        scenarios = scenario_engine.get_scenarios_for_role(Role.ENGINEER)
+        threads = [
+            threading.Thread(
+                target=session_manager.submit_choice,
+                args=(repo, UUID(session.id), scenario.id, scenario.choices[-1].id),
+            )
+            for scenario in scenarios
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        table = outcome_table.get_outcome_table(Role.ENGINEER)
+        assert session.path_code == table.encode((scenario.id, scenario.choices[-1].id) for scenario in scenarios)
+        assert session.scenarios_completed == len(scenarios)
+        assert session.version == len(scenarios)
+        assert session.trait_counts == session_manager.count_traits(session.scenario_responses)
+        assert sorted(r.sequence for r in session.scenario_responses) == list(range(1, len(scenarios) + 1))
@@ -0,0 +1,317 @@
+"""
+Tests for the write-behind decision queue.
+"""
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db import stats
+from app.db.models import Base, ScenarioResponseModel, SessionModel
+from app.models.enum import Role
+from app.repositories import ConcurrentUpdateError, SqlAlchemySessionRepository
+from app.repositories import write_behind
+from app.repositories.write_behind import DecisionWriter, WriteBehindSessionRepository
+from app.services import maintenance, session_manager
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/write_behind.db", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+def _stored_responses(session_factory, session_id) -> int:
+    with session_factory() as db:
+        return db.scalar(
+            select(func.count()).select_from(ScenarioResponseModel)
+            .where(ScenarioResponseModel.session_id == str(session_id))
+        )
+
+
+class TestWriteBehindRepository:
+    """Tests for queued decisions and read-your-writes overlay."""
+
+    def test_decision_visible_before_flush(self, session_factory):
+        """Should serve a session's own pending decision before it is written."""
+        writer = DecisionWriter(session_factory, batch_size=10)
+        with session_factory() as db:
+            created = session_manager.create_session(WriteBehindSessionRepository(db, writer), Role.ENGINEER)
+        with session_factory() as db:
+            session_manager.decide(
+                WriteBehindSessionRepository(db, writer),
+                created.sessionId,
+                "engineer_scenario_1",
+                "engineer_1_choice_1"
+            )
+
+        assert _stored_responses(session_factory, created.sessionId) == 0
+        with session_factory() as db:
+            pending_view = session_manager.fetch_session(WriteBehindSessionRepository(db, writer), created.sessionId)
+        assert pending_view.scenarios_completed == 1
+        assert pending_view.current_scenario.id == "engineer_scenario_2"
+
+        assert writer.flush() == 1
+
+        assert _stored_responses(session_factory, created.sessionId) == 1
+        with session_factory() as db:
+            stored_view = session_manager.fetch_session(SqlAlchemySessionRepository(db), created.sessionId)
+        assert stored_view == pending_view
+
+    def test_profile_change_queued_behind_pending_decision(self, session_factory):
+        """Should queue a profile-only change after the session's pending decision, not write it inline."""
+        writer = DecisionWriter(session_factory, batch_size=10)
+        with session_factory() as db:
+            repo = WriteBehindSessionRepository(db, writer)
+            created = session_manager.create_session(repo, Role.ENGINEER)
+            session_manager.decide(repo, created.sessionId, "engineer_scenario_1", "engineer_1_choice_1")
+            assert session_manager.get_session_version(repo, created.sessionId) == 1
+
+        with session_factory() as db:
+            repo = WriteBehindSessionRepository(db, writer)
+            profile = session_manager.generate_role_profile(repo, created.sessionId)
+            session_manager.store_role_profile(repo, created.sessionId, profile)
+        assert _stored_responses(session_factory, created.sessionId) == 0
+
+        assert writer.flush() == 2
+        with session_factory() as db:
+            repo = SqlAlchemySessionRepository(db)
+            assert session_manager.get_session_version(repo, created.sessionId) == 2
+            assert session_manager.get_role_profile(repo, created.sessionId) == profile
+            assert maintenance.check_session_counters(db) == []
+
+    def test_overlay_is_not_a_change(self, session_factory):
+        """Should present pending state as loaded, so the unit of work has nothing of its own to write."""
+        writer = DecisionWriter(session_factory, batch_size=10)
+        with session_factory() as db:
+            repo = WriteBehindSessionRepository(db, writer)
+            created = session_manager.create_session(repo, Role.ENGINEER)
+            session_manager.decide(repo, created.sessionId, "engineer_scenario_1", "engineer_1_choice_1")
+
+        with session_factory() as db:
+            repo = WriteBehindSessionRepository(db, writer)
+            session = repo.get_session(created.sessionId)
+            assert session.scenarios_completed == 1
+            assert not db.dirty
+            repo.commit()
+
+        assert writer.pending_count() == 1
+        with session_factory() as db:
+            assert db.get(SessionModel, str(created.sessionId)).scenarios_completed == 0
+
+    def test_stale_update_rejected(self, session_factory):
+        """Should reject a change started from a version another queued write already moved past."""
+        writer = DecisionWriter(session_factory, batch_size=10)
+        with session_factory() as db:
+            created = session_manager.create_session(WriteBehindSessionRepository(db, writer), Role.ENGINEER)
+        with session_factory() as stale_db:
+            stale_repo = WriteBehindSessionRepository(stale_db, writer)
+            stale = stale_repo.get_session(created.sessionId)
+            with session_factory() as db:
+                session_manager.decide(
+                    WriteBehindSessionRepository(db, writer), created.sessionId, "engineer_scenario_1", "engineer_1_choice_1"
+                )
+
+            stale.role_profile = {"stale": True}
+            stale.version += 1
+            with pytest.raises(ConcurrentUpdateError):
+                stale_repo.commit()
+
+        assert writer.pending_count() == 1
+
+    def test_racing_decisions_are_serialized(self, session_factory):
+        """Should retry a decision that lost the race so both are recorded in order."""
+        writer = DecisionWriter(session_factory, batch_size=10)
+        with session_factory() as db:
+            created = session_manager.create_session(WriteBehindSessionRepository(db, writer), Role.ENGINEER)
+        with session_factory() as racing_db:
+            racing_repo = WriteBehindSessionRepository(racing_db, writer)
+            commit = racing_repo.commit
+
+            def commit_after_other_decision():
+                # The other request queues its decision between this one's read and commit
+                del racing_repo.commit
+                with session_factory() as db:
+                    session_manager.decide(
+                        WriteBehindSessionRepository(db, writer), created.sessionId,
+                        "engineer_scenario_1", "engineer_1_choice_1",
+                    )
+                commit()
+
+            racing_repo.commit = commit_after_other_decision
+            result = session_manager.decide(racing_repo, created.sessionId, "engineer_scenario_2", "engineer_2_choice_1")
+
+        assert result.scenarios_completed == 2
+        assert writer.flush() == 2
+        assert writer.dropped_writes == 0
+        with session_factory() as db:
+            session = db.get(SessionModel, str(created.sessionId))
+            assert [r.scenario_id for r in session.scenario_responses] == ["engineer_scenario_1", "engineer_scenario_2"]
+            assert maintenance.check_session_counters(db) == []
+
+    def test_background_writer_batches_and_drains(self, session_factory):
+        """Should persist full playthroughs in batches and drain on close."""
+        writer = DecisionWriter(session_factory, batch_size=4, flush_interval=0.01)
+        writer.start()
+        session_ids = []
+        for _ in range(3):
+            with session_factory() as db:
+                repo = WriteBehindSessionRepository(db, writer)
+                created = session_manager.create_session(repo, Role.FOUNDER)
+                session_ids.append(created.sessionId)
+                scenario = created.first_scenario
+                while scenario is not None:
+                    scenario = session_manager.decide(
+                        repo, created.sessionId, scenario.id, scenario.choices[0].id
+                    ).next_scenario
+
+        writer.close()
+
+        assert writer.pending_count() == 0
+        assert writer.dropped_writes == 0
+        with session_factory() as db:
+            repo = SqlAlchemySessionRepository(db)
+            for session_id in session_ids:
+                assert session_manager.get_role_profile(repo, session_id) is not None
+            assert maintenance.check_session_counters(db) == []
+
+            incremental = (stats.choice_counts(db, "founder"), stats.archetype_counts(db, "founder"))
+            stats.rebuild_stats(db)
+            assert incremental == (stats.choice_counts(db, "founder"), stats.archetype_counts(db, "founder"))
+            assert sum(count for _, count in incremental[1]) == 3
+
+    def test_conflicting_write_is_dropped_without_losing_batch(self, session_factory):
+        """Should drop only the write that conflicts with stored rows."""
+        writer = DecisionWriter(session_factory, batch_size=10)
+        with session_factory() as db:
+            repo = SqlAlchemySessionRepository(db)
+            first = session_manager.create_session(repo, Role.ENGINEER)
+            second = session_manager.create_session(repo, Role.ENGINEER)
+        for session_id in (first.sessionId, second.sessionId):
+            with session_factory() as db:
+                session_manager.decide(
+                    WriteBehindSessionRepository(db, writer), session_id, "engineer_scenario_1", "engineer_1_choice_1"
+                )
+        # A racing inline writer stores the same answer for the first session
+        with session_factory() as db:
+            session_manager.decide(
+                SqlAlchemySessionRepository(db), first.sessionId, "engineer_scenario_1", "engineer_1_choice_2"
+            )
+
+        writer.flush()
+
+        assert writer.dropped_writes == 1
+        assert _stored_responses(session_factory, first.sessionId) == 1
+        assert _stored_responses(session_factory, second.sessionId) == 1
+        assert writer.pending_for(str(first.sessionId)) == []
+
+    def test_transient_failure_requeues_batch(self, session_factory, monkeypatch):
+        """Should keep a batch that failed with a non-integrity error and write it on a later flush."""
+        writer = DecisionWriter(session_factory, batch_size=10)
+        with session_factory() as db:
+            repo = WriteBehindSessionRepository(db, writer)
+            created = session_manager.create_session(repo, Role.ENGINEER)
+            session_manager.decide(repo, created.sessionId, "engineer_scenario_1", "engineer_1_choice_1")
+            session_manager.decide(repo, created.sessionId, "engineer_scenario_2", "engineer_2_choice_1")
+
+        write = writer._write
+        failures = iter([OperationalError("INSERT", {}, Exception("database is locked"))])
+
+        def flaky_write(batch):
+            error = next(failures, None)
+            if error is not None:
+                raise error
+            write(batch)
+
+        monkeypatch.setattr(writer, "_write", flaky_write)
+
+        with pytest.raises(OperationalError):
+            writer.flush()
+
+        assert writer.failed_flushes == 1
+        assert writer.pending_count() == 2
+        assert len(writer.pending_for(str(created.sessionId))) == 2
+        assert _stored_responses(session_factory, created.sessionId) == 0
+
+        assert writer.flush() == 2
+
+        assert writer.pending_count() == 0
+        assert writer.dropped_writes == 0
+        assert _stored_responses(session_factory, created.sessionId) == 2
+        with session_factory() as db:
+            assert maintenance.check_session_counters(db) == []
+
+    def test_unexpected_failure_drops_only_failing_write(self, session_factory, monkeypatch):
+        """Should not leave a batch stuck in the queue when it fails with a non-database error."""
+        writer = DecisionWriter(session_factory, batch_size=10)
+        session_ids = []
+        for _ in range(2):
+            with session_factory() as db:
+                repo = WriteBehindSessionRepository(db, writer)
+                created = session_manager.create_session(repo, Role.ENGINEER)
+                session_manager.decide(repo, created.sessionId, "engineer_scenario_1", "engineer_1_choice_1")
+                session_ids.append(created.sessionId)
+
+        write = writer._write
+
+        def broken_write(batch):
+            if any(w.session_id == str(session_ids[0]) for w in batch):
+                raise TypeError("not JSON serializable")
+            write(batch)
+
+        monkeypatch.setattr(writer, "_write", broken_write)
+
+        assert writer.flush() == 2
+
+        assert writer.dropped_writes == 1
+        assert writer.pending_count() == 0
+        assert writer.pending_for(str(session_ids[0])) == []
+        assert _stored_responses(session_factory, session_ids[0]) == 0
+        assert _stored_responses(session_factory, session_ids[1]) == 1
+
+    def test_background_writer_retries_until_database_recovers(self, session_factory, monkeypatch):
+        """Should retry failed batches with backoff and drain them on close without raising."""
+        writer = DecisionWriter(session_factory, batch_size=10, flush_interval=0.01, retry_backoff=0.01)
+        write = writer._write
+        attempts = []
+
+        def flaky_write(batch):
+            attempts.append(len(batch))
+            if len(attempts) <= 3:
+                raise OperationalError("INSERT", {}, Exception("database is locked"))
+            write(batch)
+
+        monkeypatch.setattr(writer, "_write", flaky_write)
+        writer.start()
+        with session_factory() as db:
+            repo = WriteBehindSessionRepository(db, writer)
+            created = session_manager.create_session(repo, Role.ENGINEER)
+            session_manager.decide(repo, created.sessionId, "engineer_scenario_1", "engineer_1_choice_1")
+
+        writer.close()
+
+        assert writer.failed_flushes == 3
+        assert writer.pending_count() == 0
+        assert _stored_responses(session_factory, created.sessionId) == 1
+
+    def test_close_gives_up_on_unavailable_database(self, session_factory, monkeypatch):
+        """Should stop retrying after CLOSE_RETRIES and keep the writes pending instead of raising."""
+        monkeypatch.setattr(write_behind, "CLOSE_RETRIES", 2)
+        writer = DecisionWriter(session_factory, retry_backoff=0)
+        with session_factory() as db:
+            repo = WriteBehindSessionRepository(db, writer)
+            created = session_manager.create_session(repo, Role.ENGINEER)
+            session_manager.decide(repo, created.sessionId, "engineer_scenario_1", "engineer_1_choice_1")
+
+        def failing_write(batch):
+            raise OperationalError("INSERT", {}, Exception("disk I/O error"))
+
+        monkeypatch.setattr(writer, "_write", failing_write)
+
+        writer.close()
+
+        assert writer.failed_flushes == 3
+        assert writer.pending_count() == 1
@@ -0,0 +1,157 @@
+"""
+Tests for the pre-forked multi-worker server.
+"""
+import os
+import queue
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from app.config import settings
+from app.server import single_worker_reason, worker_count
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+class ServerProcess:
+    """`python -m app.server` in a child process, with its log lines collected as they arrive."""
+
+    def __init__(self, env):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "app.server"],
+            cwd=BACKEND_DIR,
+            env=env,
+            stderr=subprocess.STDOUT,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        self.lines = queue.Queue()
+        self.pump = threading.Thread(target=self._pump, daemon=True)
+        self.pump.start()
+        self.log = []
+
+    def _pump(self):
+        for line in self.process.stdout:
+            self.lines.put(line)
+
+    def wait_for(self, pattern, count=1, timeout=20.0):
+        """Matches of `pattern` in the log (including earlier lines) once there are `count` of them."""
+        regex = re.compile(pattern)
+        deadline = time.monotonic() + timeout
+        while True:
+            matches = [match for match in map(regex.search, self.log) if match]
+            if len(matches) >= count:
+                return matches
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise AssertionError(f"Timed out waiting for {pattern!r}:\n{''.join(self.log)}")
+            try:
+                self.log.append(self.lines.get(timeout=remaining))
+            except queue.Empty:
+                continue
+
+
+@pytest.fixture
+def server(tmp_path):
+    env = dict(os.environ, WORKERS="2", SERVER_PORT="0", DATABASE_PATH=str(tmp_path / "simulator.db"))
+    env["SESSION_BACKEND"] = "sqlalchemy"
+    server = ServerProcess(env)
+    yield server
+    if server.process.poll() is None:
+        # SIGKILL would orphan the workers, which run in their own process groups
+        server.process.terminate()
+        try:
+            server.process.wait(timeout=20)
+        except subprocess.TimeoutExpired:
+            server.process.kill()
+            server.process.wait()
+    # Later tests fork (process pools); do not leave this thread running into them
+    server.pump.join(timeout=5)
+
+
+def _get(port, path):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=5) as response:
+        return response.status
+
+
+def _metrics(port):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+        return response.read().decode()
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+class TestWorkerCount:
+    """Tests for sizing the worker pool."""
+
+    def test_defaults_to_available_cores(self, monkeypatch):
+        """Should use one worker per core the process may run on unless WORKERS is set."""
+        monkeypatch.setattr(settings, "WORKERS", 0)
+        assert worker_count() == (os.process_cpu_count() or 1)
+
+        monkeypatch.setattr(settings, "WORKERS", 3)
+        assert worker_count() == 3
+
+    def test_single_worker_for_process_local_state(self, monkeypatch):
+        """Should keep backends that hold sessions or queued decisions in memory to one worker."""
+        monkeypatch.setattr(settings, "SESSION_BACKEND", "sqlalchemy")
+        monkeypatch.setattr(settings, "WRITE_BEHIND_ENABLED", False)
+        assert single_worker_reason() is None
+
+        monkeypatch.setattr(settings, "WRITE_BEHIND_ENABLED", True)
+        assert "WRITE_BEHIND_ENABLED" in single_worker_reason()
+
+        monkeypatch.setattr(settings, "WRITE_BEHIND_ENABLED", False)
+        monkeypatch.setattr(settings, "SESSION_BACKEND", "memory")
+        assert "SESSION_BACKEND=memory" in single_worker_reason()
+
+
+class TestSupervisor:
+    """Tests for serving, restarting and stopping forked workers."""
+
+    def test_restarts_workers_and_stops_gracefully(self, server):
+        """Should serve from every worker, replace a killed one and exit cleanly on SIGTERM."""
+        port = int(server.wait_for(r"Uvicorn running on http://127\.0\.0\.1:(\d+)")[0].group(1))
+        started = server.wait_for(r"Started worker (\d) \(pid (\d+)\)", count=2)
+        server.wait_for(r"Application startup complete", count=2)
+        assert _get(port, "/api/v1/roles") == 200
+
+        killed = int(started[1].group(2))
+        os.kill(killed, signal.SIGKILL)
+        restarted = server.wait_for(r"Started worker (\d) \(pid (\d+)\)", count=3)[2]
+        assert restarted.group(1) == started[1].group(1)
+        server.wait_for(r"Application startup complete", count=3)
+        assert _get(port, "/api/v1/roles") == 200
+
+        server.process.send_signal(signal.SIGTERM)
+        assert server.process.wait(timeout=20) == 0
+        server.wait_for(r"All workers stopped")
+        assert not _alive(int(started[0].group(2)))
+        assert not _alive(int(restarted.group(2)))
+
+    def test_metrics_cover_every_worker(self, server):
+        """Should report the requests served by all workers whichever worker is scraped."""
+        port = int(server.wait_for(r"Uvicorn running on http://127\.0\.0\.1:(\d+)")[0].group(1))
+        server.wait_for(r"Application startup complete", count=2)
+        for _ in range(20):
+            assert _get(port, "/api/v1/roles") == 200
+        # Let every worker publish its snapshot
+        time.sleep(1.5)
+
+        pattern = re.compile(r'^http_requests_total\{method="GET",route="/api/v1/roles",status="200"\} (\d+)$', re.M)
+        for _ in range(4):
+            assert int(pattern.search(_metrics(port)).group(1)) == 20
@@ -0,0 +1,77 @@
+"""
+Tests for the incrementally maintained choice/archetype stats.
+"""
+import pytest
+
+from app.db import stats
+from app.models.enum import Role
+from app.repositories import DuplicateResponseError, SqlAlchemySessionRepository
+from app.services import analytics, scenario_engine, session_manager
+
+
+def _play_through(repo, role: Role, choice_index: int = 0):
+    created = session_manager.create_session(repo, role)
+    for scenario in scenario_engine.get_scenarios_for_role(role):
+        session_manager.decide(repo, created.sessionId, scenario.id, scenario.choices[choice_index].id)
+    return created.sessionId
+
+
+class TestRoleStats:
+    """Tests for analytics.get_role_stats across storage backends."""
+
+    def test_counts_choices_and_final_archetypes(self, repository):
+        """Should count every decision and every completed profile."""
+        _play_through(repository, Role.ENGINEER, 0)
+        _play_through(repository, Role.ENGINEER, 0)
+        _play_through(repository, Role.ENGINEER, 1)
+
+        result = analytics.get_role_stats(repository, Role.ENGINEER)
+
+        counts = {(c.scenario_id, c.choice_id): c.count for c in result.choices}
+        assert counts[("engineer_scenario_1", "engineer_1_choice_1")] == 2
+        assert counts[("engineer_scenario_1", "engineer_1_choice_2")] == 1
+        assert sum(counts.values()) == 3 * scenario_engine.get_total_scenarios(Role.ENGINEER)
+        assert sum(a.count for a in result.archetypes) == 3
+        assert analytics.get_role_stats(repository, Role.FOUNDER).choices == []
+
+    def test_overwritten_profile_moves_count(self, repository):
+        """Should move the archetype count when a stored profile is replaced."""
+        session_id = _play_through(repository, Role.ENGINEER)
+        original = session_manager.get_role_profile(repository, session_id)
+        other = next(
+            a for a in session_manager.archetype_engine.get_archetypes_for_role(Role.ENGINEER)
+            if a.id != original.archetype.id
+        )
+
+        session_manager.store_role_profile(repository, session_id, original.model_copy(update={"archetype": other}))
+        session_manager.store_role_profile(repository, session_id, original.model_copy(update={"archetype": other}))
+
+        archetypes = {a.archetype_id: a.count for a in analytics.get_role_stats(repository, Role.ENGINEER).archetypes}
+        assert archetypes == {other.id: 1}
+
+
+class TestStatsStorage:
+    """Tests for the SQL aggregate tables."""
+
+    def test_rejected_duplicate_is_not_counted(self, db_session):
+        """Should roll the stats back with a response that fails to insert."""
+        repo = SqlAlchemySessionRepository(db_session)
+        created = session_manager.create_session(repo, Role.ENGINEER)
+        session_manager.decide(repo, created.sessionId, "engineer_scenario_1", "engineer_1_choice_1")
+
+        with pytest.raises(DuplicateResponseError):
+            session_manager.decide(repo, created.sessionId, "engineer_scenario_1", "engineer_1_choice_2")
+
+        assert stats.choice_counts(db_session, "engineer") == [("engineer_scenario_1", "engineer_1_choice_1", 1)]
+
+    def test_rebuild_matches_incremental(self, db_session):
+        """Should recompute exactly the counts maintained incrementally."""
+        repo = SqlAlchemySessionRepository(db_session)
+        for index in range(3):
+            _play_through(repo, Role.PRODUCT_MANAGER, index % 2)
+        session_manager.create_session(repo, Role.PRODUCT_MANAGER)
+        incremental = (stats.choice_counts(db_session, "product_manager"), stats.archetype_counts(db_session, "product_manager"))
+
+        stats.rebuild_stats(db_session)
+
+        assert (stats.choice_counts(db_session, "product_manager"), stats.archetype_counts(db_session, "product_manager")) == incremental
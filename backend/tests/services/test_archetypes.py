@@ -1,13 +1,37 @@
+import random
+
 from app.models.enum import Role
+from app.models.session import ArchetypeMatch
 from app.services.archetype_engine import (
     get_archetypes_for_role,
     get_archetype_by_id,
     get_archetype_by_name,
     generate_archetype_report,
     get_top_archetype,
+    score_batch,
 )
 
 
+def _reference_report(role, trait_scores):
+    """Straightforward per-archetype scoring the matrix implementation must match."""
+    if not trait_scores:
+        return []
+    matches = []
+    for archetype in get_archetypes_for_role(role):
+        matched = [t for t in archetype.key_traits if trait_scores.get(t, 0) > 0]
+        matches.append(
+            ArchetypeMatch(
+                archetype=archetype,
+                score=sum(trait_scores.get(t, 0) for t in matched),
+                matched_traits=matched,
+                missing_traits=[t for t in archetype.key_traits if t not in matched],
+                coverage=len(matched) / len(archetype.key_traits),
+            )
+        )
+    matches.sort(key=lambda m: (-m.score, -m.coverage, m.archetype.name))
+    return matches
+
+
 def test_engineer_archetypes_load():
     archetypes = get_archetypes_for_role(Role.ENGINEER)
     assert len(archetypes) == 6
@@ -108,3 +132,27 @@ def test_product_manager_archetypes_load_and_query():
     by_name = get_archetype_by_name(Role.PRODUCT_MANAGER, "the data-driven strategist")
     assert by_name is not None
     assert by_name.id == "pm_data_strategist"
+
+
+def test_score_batch_matches_reference_ordering():
+    rng = random.Random(7)
+    for role in Role:
+        traits = sorted({t for a in get_archetypes_for_role(role) for t in a.key_traits} | {"unknown_trait"})
+        trait_matrix = [
+            {t: rng.randint(0, 3) for t in rng.sample(traits, rng.randint(0, len(traits)))}
+            for _ in range(50)
+        ]
+
+        reports = score_batch(role, trait_matrix)
+
+        assert reports == [_reference_report(role, scores) for scores in trait_matrix]
+
+
+def test_score_batch_top_k():
+    scores = [{"long_term": 2, "quality_focused": 1}, {}, {"speed_focused": 3, "risk_taker": 1}]
+
+    reports = score_batch(Role.ENGINEER, scores, top_k=2)
+
+    assert [len(report) for report in reports] == [2, 0, 2]
+    for report, trait_scores in zip(reports, scores):
+        assert report == _reference_report(Role.ENGINEER, trait_scores)[:2]
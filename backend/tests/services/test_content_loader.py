@@ -0,0 +1,282 @@
+"""
+Tests for eager content preload and validation.
+"""
+import json
+import shutil
+import threading
+
+import pytest
+
+from app.config import settings
+from app.models.enum import Role
+from app.models.session import Choice, Scenario
+from app.services import archetype_engine, content_loader, outcome_table, roles, scenario_engine
+from app.services.content_loader import (
+    ContentValidationError,
+    check_references,
+    load_content_snapshot,
+    preload_content,
+    validate_content,
+    write_content_snapshot,
+)
+
+
+class TestPreloadContent:
+    """Tests for preloading all roles, scenarios and archetypes."""
+
+    def test_preload_reports_timings_for_every_role(self, unloaded_content):
+        """Should time each role's scenarios and archetypes plus validation."""
+        report = preload_content()
+
+        assert "roles" in report.timings_ms
+        for role in Role:
+            assert f"scenarios.{role.value}" in report.timings_ms
+            assert f"archetypes.{role.value}" in report.timings_ms
+        assert "validation" in report.timings_ms
+        assert report.total_ms >= 0
+
+    def test_preload_skips_loaded_content(self, monkeypatch):
+        """Should return at once, without parsing again, when content is already loaded."""
+        preload_content()
+
+        def parse_again():
+            raise AssertionError("content parsed twice")
+
+        monkeypatch.setattr(content_loader, "_parse_content", parse_again)
+
+        assert preload_content().timings_ms == {}
+
+    def test_bundled_content_is_valid(self):
+        """Should accept the shipped data, surfacing unused traits as warnings only."""
+        warnings = validate_content()
+
+        assert all("not used by any archetype" in warning for warning in warnings)
+
+
+class TestSingleFlightLoad:
+    """Tests for the lazy-load guard."""
+
+    def test_concurrent_first_loads_parse_once(self, monkeypatch):
+        """Should parse a role's scenarios once even when many threads race."""
+        calls = []
+        original = scenario_engine._load_scenarios_for_role
+
+        def counting_load(role):
+            calls.append(role)
+            return original(role)
+
+        monkeypatch.setattr(scenario_engine, "_index_cache", {})
+        monkeypatch.setattr(scenario_engine, "_load_scenarios_for_role", counting_load)
+
+        barrier = threading.Barrier(8)
+
+        def worker():
+            barrier.wait()
+            scenario_engine.get_scenario_index(Role.ENGINEER)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert calls == [Role.ENGINEER]
+
+
+class TestValidateContent:
+    """Tests for content consistency checks."""
+
+    def _with_scenarios(self, monkeypatch, scenarios):
+        index = scenario_engine.ScenarioIndex.build(scenarios)
+        cache = dict(scenario_engine._index_cache)
+        cache[Role.ENGINEER] = index
+        monkeypatch.setattr(scenario_engine, "_index_cache", cache)
+
+    def _scenario(self, scenario_id, choices):
+        return Scenario(
+            id=scenario_id,
+            role=Role.ENGINEER,
+            title="t",
+            description="d",
+            choices=choices,
+        )
+
+    def test_duplicate_scenario_ids_rejected(self, monkeypatch):
+        """Should fail when two scenarios share an id."""
+        scenarios = scenario_engine.get_scenarios_for_role(Role.ENGINEER)
+        self._with_scenarios(monkeypatch, scenarios + [scenarios[0]])
+
+        with pytest.raises(ContentValidationError) as exc_info:
+            validate_content()
+
+        assert "duplicate scenario id 'engineer_scenario_1'" in str(exc_info.value)
+
+    def test_unused_trait_is_a_warning(self, monkeypatch):
+        """Should warn, not fail, for traits no archetype scores."""
+        scenarios = scenario_engine.get_scenarios_for_role(Role.ENGINEER)
+        extra = self._scenario("engineer_extra", [
+            Choice(id="extra_choice", scenario_id="engineer_extra", choice_text="x", traits=["whimsical"]),
+        ])
+        self._with_scenarios(monkeypatch, scenarios + [extra])
+
+        warnings = validate_content()
+
+        assert "engineer: trait 'whimsical' is not used by any archetype" in warnings
+
+
+@pytest.fixture
+def data_copy(tmp_path, monkeypatch):
+    """Writable copies of the scenario and archetype files, used by the loaders."""
+    scenarios_dir = shutil.copytree(scenario_engine.SCENARIOS_DIR, tmp_path / "scenarios")
+    archetypes_dir = shutil.copytree(archetype_engine.ARCHETYPES_DIR, tmp_path / "archetypes")
+    monkeypatch.setattr(scenario_engine, "SCENARIOS_DIR", scenarios_dir)
+    monkeypatch.setattr(archetype_engine, "ARCHETYPES_DIR", archetypes_dir)
+    return scenarios_dir, archetypes_dir
+
+
+def _edit(path, change):
+    data = json.loads(path.read_text())
+    change(data)
+    path.write_text(json.dumps(data))
+
+
+class TestCheckReferences:
+    """Tests for reference checks on the raw data files."""
+
+    def test_bundled_files_pass(self):
+        """Should accept the shipped data files."""
+        check_references()
+
+    def test_dangling_choice_reference_rejected(self, data_copy):
+        """Should fail when a choice names a scenario other than the one it is defined in."""
+        scenarios_dir, _ = data_copy
+        _edit(scenarios_dir / "engineer.json", lambda data: data[0]["choices"][0].update(scenario_id="engineer_missing"))
+
+        with pytest.raises(ContentValidationError) as exc_info:
+            check_references()
+
+        assert (
+            "engineer: choice 'engineer_1_choice_1' references an unknown scenario ('engineer_missing') "
+            "but is defined in 'engineer_scenario_1'"
+        ) in exc_info.value.errors
+
+    def test_ambiguous_next_scenario_rejected(self, data_copy):
+        """Should fail when two scenarios share an order, since either could come next."""
+        scenarios_dir, _ = data_copy
+        _edit(scenarios_dir / "engineer.json", lambda data: data[1].update(order=data[0]["order"]))
+
+        with pytest.raises(ContentValidationError) as exc_info:
+            check_references()
+
+        assert "share order 1" in str(exc_info.value)
+
+    def test_archetype_of_other_role_rejected(self, data_copy):
+        """Should fail when an archetype file lists another role's archetype."""
+        _, archetypes_dir = data_copy
+        _edit(archetypes_dir / "engineer.json", lambda data: data[0].update(role="founder"))
+
+        with pytest.raises(ContentValidationError) as exc_info:
+            check_references()
+
+        assert "archetype 'engineer_craftsman' belongs to role 'founder'" in str(exc_info.value)
+
+    def test_preload_fails_before_building_models(self, data_copy, unloaded_content):
+        """Should reject a bad reference at startup instead of loading the content."""
+        scenarios_dir, _ = data_copy
+        _edit(scenarios_dir / "engineer.json", lambda data: data[0]["choices"][0].update(scenario_id="engineer_scenario_2"))
+
+        with pytest.raises(ContentValidationError):
+            preload_content()
+
+        assert scenario_engine._index_cache == {}
+
+
+@pytest.fixture(scope="module")
+def snapshot_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("content") / "content.snapshot"
+    write_content_snapshot(path)
+    return path
+
+
+@pytest.fixture
+def unloaded_content(monkeypatch):
+    """Empty every content cache for the test; yields the previously loaded engineer content."""
+    preload_content()
+    loaded = {
+        "registry": roles.get_roles_registry(),
+        "scenarios": scenario_engine.get_scenario_index(Role.ENGINEER),
+        "archetypes": archetype_engine.get_archetypes_for_role(Role.ENGINEER),
+        "table": outcome_table.get_outcome_table(Role.ENGINEER),
+    }
+    monkeypatch.setattr(roles, "_registry", None)
+    monkeypatch.setattr(scenario_engine, "_index_cache", {})
+    monkeypatch.setattr(archetype_engine, "_archetypes_cache", {})
+    monkeypatch.setattr(archetype_engine, "_matrix_cache", {})
+    monkeypatch.setattr(outcome_table, "_table_cache", {})
+    return loaded
+
+
+class TestContentSnapshot:
+    """Tests for compiling content into a snapshot and loading it at startup."""
+
+    def test_snapshot_matches_parsed_content(self, snapshot_path, unloaded_content):
+        """Should install the same content, indexes and outcome tables the parser builds."""
+        report = load_content_snapshot(snapshot_path)
+
+        assert report is not None
+        assert "snapshot.read" in report.timings_ms
+        assert all("not used by any archetype" in warning for warning in report.warnings)
+        index = scenario_engine.get_scenario_index(Role.ENGINEER)
+        assert index.scenarios == unloaded_content["scenarios"].scenarios
+        assert index.scenarios_json == unloaded_content["scenarios"].scenarios_json
+        assert archetype_engine.get_archetypes_for_role(Role.ENGINEER) == unloaded_content["archetypes"]
+        table = outcome_table.get_outcome_table(Role.ENGINEER)
+        assert table.table == unloaded_content["table"].table
+        assert table.outcomes == unloaded_content["table"].outcomes
+        assert roles.fetch_roles(include_details=True) == list(unloaded_content["registry"].with_details)
+
+    def test_snapshot_keeps_shared_objects_shared(self, snapshot_path, unloaded_content):
+        """Should restore references between caches, so prerendered lookups still hit."""
+        load_content_snapshot(snapshot_path)
+
+        archetype = archetype_engine.get_archetypes_for_role(Role.ENGINEER)[0]
+        assert archetype.role is roles.get_role_by_id(Role.ENGINEER)
+        assert archetype_engine.get_archetype_matrix(Role.ENGINEER).archetypes[0] is archetype
+        first = scenario_engine.get_first_scenario(Role.ENGINEER)
+        assert scenario_engine.get_scenario_json(first) is scenario_engine.get_scenario_index(Role.ENGINEER).json_by_id[first.id]
+
+    def test_preload_uses_configured_snapshot(self, snapshot_path, unloaded_content, monkeypatch):
+        """Should load from CONTENT_SNAPSHOT_PATH instead of parsing each role."""
+        monkeypatch.setattr(settings, "CONTENT_SNAPSHOT_PATH", snapshot_path)
+
+        report = preload_content()
+
+        assert "snapshot.read" in report.timings_ms
+        assert f"scenarios.{Role.ENGINEER.value}" not in report.timings_ms
+        assert scenario_engine.get_total_scenarios(Role.ENGINEER) == unloaded_content["scenarios"].total_scenarios
+
+    def test_stale_snapshot_falls_back_to_parsing(self, snapshot_path, unloaded_content, monkeypatch):
+        """Should ignore a snapshot built from other data files or settings."""
+        monkeypatch.setattr(content_loader, "_fingerprint", "0" * 16)
+        assert load_content_snapshot(snapshot_path) is None
+        monkeypatch.setattr(content_loader, "_fingerprint", None)
+        monkeypatch.setattr(settings, "OUTCOME_TABLE_MAX_PATHS", 10)
+        assert load_content_snapshot(snapshot_path) is None
+        assert scenario_engine._index_cache == {}
+
+        monkeypatch.setattr(settings, "CONTENT_SNAPSHOT_PATH", snapshot_path)
+        report = preload_content()
+        assert f"scenarios.{Role.ENGINEER.value}" in report.timings_ms
+
+    def test_missing_or_corrupt_snapshot_is_ignored(self, tmp_path, unloaded_content):
+        """Should return None rather than fail startup."""
+        corrupt = tmp_path / "corrupt.snapshot"
+        corrupt.write_bytes(b"not a pickle")
+
+        assert load_content_snapshot(tmp_path / "missing.snapshot") is None
+        assert load_content_snapshot(corrupt) is None
+
+    def test_loaded_content_is_not_replaced(self, snapshot_path):
+        """Should leave already loaded caches alone."""
+        preload_content()
+        assert load_content_snapshot(snapshot_path) is None
@@ -0,0 +1,101 @@
+"""
+Tests for streaming session exports.
+"""
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta, UTC
+
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Base, SessionModel
+from app.models.enum import Role
+from app.repositories import SqlAlchemySessionRepository
+from app.services import session_manager
+from app.services.export import CSV_COLUMNS, ExportFilters, export_sessions
+
+
+@pytest.fixture
+def factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/export.db")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+def _session(factory, role: Role, answers: int, created_at: datetime | None = None) -> str:
+    with factory() as db:
+        repo = SqlAlchemySessionRepository(db)
+        created = session_manager.create_session(repo, role)
+        scenario = created.first_scenario
+        for _ in range(answers):
+            scenario = session_manager.decide(repo, created.sessionId, scenario.id, scenario.choices[0].id).next_scenario
+        if created_at is not None:
+            db.execute(
+                update(SessionModel)
+                .where(SessionModel.id == str(created.sessionId))
+                .values(created_at=created_at.replace(tzinfo=None))
+            )
+            db.commit()
+    return str(created.sessionId)
+
+
+def _ndjson(factory, **kwargs):
+    body = b"".join(export_sessions(factory, "ndjson", **kwargs))
+    return [json.loads(line) for line in body.decode().splitlines()]
+
+
+class TestExportSessions:
+    """Tests for export_sessions."""
+
+    def test_ndjson_across_pages(self, factory):
+        """Should emit every session once, in id order, with ordered responses."""
+        ids = [_session(factory, Role.ENGINEER, answers=3) for _ in range(5)]
+
+        records = _ndjson(factory, page_size=2)
+
+        assert [r["id"] for r in records] == sorted(ids)
+        assert [r["sequence"] for r in records[0]["responses"]] == [1, 2, 3]
+        assert records[0]["responses"][0]["scenario_id"] == "engineer_scenario_1"
+        assert records[0]["role_profile"] is None
+
+    def test_filters_by_role_and_created_range(self, factory):
+        """Should apply role and half-open created_at filters."""
+        now = datetime.now(UTC)
+        old = _session(factory, Role.ENGINEER, answers=1, created_at=now - timedelta(days=10))
+        recent = _session(factory, Role.ENGINEER, answers=1, created_at=now - timedelta(days=1))
+        _session(factory, Role.FOUNDER, answers=1, created_at=now - timedelta(days=1))
+
+        by_role = _ndjson(factory, filters=ExportFilters(role=Role.ENGINEER))
+        by_range = _ndjson(
+            factory,
+            filters=ExportFilters(role=Role.ENGINEER, created_from=now - timedelta(days=2), created_to=now),
+        )
+
+        assert {r["id"] for r in by_role} == {old, recent}
+        assert [r["id"] for r in by_range] == [recent]
+
+    def test_csv_has_one_row_per_response(self, factory):
+        """Should write a header, one row per response and one row for an unanswered session."""
+        answered = _session(factory, Role.ENGINEER, answers=2)
+        empty = _session(factory, Role.ENGINEER, answers=0)
+
+        body = b"".join(export_sessions(factory, "csv", page_size=1)).decode()
+        rows = list(csv.DictReader(io.StringIO(body)))
+
+        assert body.splitlines()[0].split(",") == CSV_COLUMNS
+        assert [row["sequence"] for row in rows if row["session_id"] == answered] == ["1", "2"]
+        assert [row["scenario_id"] for row in rows if row["session_id"] == empty] == [""]
+
+    def test_gzip_round_trip(self, factory):
+        """Should produce a single valid gzip stream, including for an empty CSV export."""
+        _session(factory, Role.ENGINEER, answers=1)
+
+        compressed = b"".join(export_sessions(factory, "ndjson", compress=True))
+        empty = b"".join(export_sessions(factory, "csv", filters=ExportFilters(role=Role.FOUNDER), compress=True))
+
+        assert len(gzip.decompress(compressed).splitlines()) == 1
+        assert gzip.decompress(empty).decode().strip() == ",".join(CSV_COLUMNS)
@@ -0,0 +1,323 @@
+"""
+Tests for session counter backfill and consistency checks.
+"""
+import json
+from datetime import datetime, timedelta, UTC
+
+import pytest
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import stats
+from app.db.database import apply_sqlite_pragmas
+from app.db.migrations import DUPLICATE_RESPONSES_REMOVED, RESPONSES_RESEQUENCED, upgrade_schema
+from app.db.models import Base, ScenarioResponseModel, SessionModel
+from app.models.enum import Role
+from app.repositories import SqlAlchemySessionRepository
+from app.services import maintenance, session_manager
+
+
+def _answer(db_session, session_id, *pairs):
+    repo = SqlAlchemySessionRepository(db_session)
+    for scenario_id, choice_id in pairs:
+        session_manager.submit_choice(repo, session_id, scenario_id, choice_id)
+
+
+class TestSessionCounters:
+    """Tests for the running counters kept on SessionModel."""
+
+    def test_counters_follow_submitted_choices(self, db_session):
+        """Should keep trait counts, completed count and last scenario in step."""
+        created = session_manager.create_session(SqlAlchemySessionRepository(db_session), Role.ENGINEER)
+        _answer(
+            db_session,
+            created.sessionId,
+            ("engineer_scenario_1", "engineer_1_choice_1"),
+            ("engineer_scenario_2", "engineer_2_choice_1"),
+        )
+
+        session = session_manager.get_session_or_raise(SqlAlchemySessionRepository(db_session), created.sessionId)
+        assert session.scenarios_completed == 2
+        assert session.last_scenario_id == "engineer_scenario_2"
+        assert session.trait_counts == session_manager.count_traits(session.scenario_responses)
+        assert maintenance.check_session_counters(db_session) == []
+
+    def test_check_reports_drift(self, db_session):
+        """Should report each counter that disagrees with the raw responses."""
+        created = session_manager.create_session(SqlAlchemySessionRepository(db_session), Role.ENGINEER)
+        _answer(db_session, created.sessionId, ("engineer_scenario_1", "engineer_1_choice_1"))
+
+        session = session_manager.get_session_or_raise(SqlAlchemySessionRepository(db_session), created.sessionId)
+        session.scenarios_completed = 5
+        session.trait_counts = {}
+        db_session.commit()
+
+        mismatches = maintenance.check_session_counters(db_session)
+
+        assert {m.field for m in mismatches} == {"scenarios_completed", "trait_counts"}
+        assert all(m.session_id == str(created.sessionId) for m in mismatches)
+
+    def test_backfill_repairs_counters(self, db_session):
+        """Should recompute counters for sessions that predate them."""
+        created = session_manager.create_session(SqlAlchemySessionRepository(db_session), Role.ENGINEER)
+        _answer(
+            db_session,
+            created.sessionId,
+            ("engineer_scenario_1", "engineer_1_choice_2"),
+            ("engineer_scenario_2", "engineer_2_choice_3"),
+        )
+        db_session.query(SessionModel).update(
+            {"trait_counts": {}, "scenarios_completed": 0, "last_scenario_id": None}
+        )
+        db_session.commit()
+
+        updated = maintenance.backfill_session_counters(db_session, batch_size=1)
+
+        assert updated == 1
+        session = session_manager.get_session_or_raise(SqlAlchemySessionRepository(db_session), created.sessionId)
+        assert [r.sequence for r in session.scenario_responses] == [1, 2]
+        assert maintenance.check_session_counters(db_session) == []
+        assert session_manager.get_scenarios_completed(SqlAlchemySessionRepository(db_session), created.sessionId) == 2
+
+
+class TestUpgradeSchema:
+    """Tests for adding new columns to databases created by older releases."""
+
+    def test_adds_missing_columns(self):
+        """Should add counter columns to a legacy sessions table."""
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE sessions (id VARCHAR(36) PRIMARY KEY, role VARCHAR(20) NOT NULL, "
+                "created_at DATETIME, updated_at DATETIME, current_phase VARCHAR(30), role_profile JSON)"
+            ))
+            conn.execute(text("INSERT INTO sessions (id, role) VALUES ('legacy', 'engineer')"))
+        Base.metadata.create_all(bind=engine)
+
+        added = upgrade_schema(engine)
+
+        assert {"sessions.trait_counts", "sessions.scenarios_completed", "sessions.last_scenario_id"} <= set(added)
+        columns = {column["name"] for column in inspect(engine).get_columns("sessions")}
+        assert "trait_counts" in columns
+        assert upgrade_schema(engine) == []
+        with engine.connect() as conn:
+            row = conn.execute(text("SELECT trait_counts, scenarios_completed FROM sessions")).one()
+        assert row == ("{}", 0)
+
+    def test_creates_missing_indexes(self):
+        """Should add the scenario_responses indexes to a legacy table."""
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE scenario_responses (id VARCHAR(36) PRIMARY KEY, session_id VARCHAR(36) NOT NULL, "
+                "scenario_id VARCHAR(50) NOT NULL, choice_id VARCHAR(50) NOT NULL, traits JSON, timestamp DATETIME)"
+            ))
+        Base.metadata.create_all(bind=engine)
+
+        added = upgrade_schema(engine)
+
+        assert "scenario_responses.sequence" in added
+        indexes = {index["name"]: index for index in inspect(engine).get_indexes("scenario_responses")}
+        assert indexes["uq_scenario_responses_session_scenario"]["unique"]
+        assert indexes["ix_scenario_responses_session_sequence"]["unique"]
+
+    def test_removes_legacy_duplicates_before_unique_index(self):
+        """Should keep the earliest answer per scenario and then reject duplicates."""
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE scenario_responses (id VARCHAR(36) PRIMARY KEY, session_id VARCHAR(36) NOT NULL, "
+                "scenario_id VARCHAR(50) NOT NULL, choice_id VARCHAR(50) NOT NULL, traits JSON, timestamp DATETIME)"
+            ))
+            conn.execute(text(
+                "INSERT INTO scenario_responses (id, session_id, scenario_id, choice_id, traits, timestamp) VALUES "
+                "('late', 's1', 'engineer_scenario_1', 'engineer_1_choice_2', '[]', '2025-01-01 10:05:00'), "
+                "('early', 's1', 'engineer_scenario_1', 'engineer_1_choice_1', '[]', '2025-01-01 10:00:00'), "
+                "('other', 's1', 'engineer_scenario_2', 'engineer_2_choice_1', '[]', '2025-01-01 10:06:00'), "
+                "('again', 's1', 'engineer_scenario_1', 'engineer_1_choice_3', '[]', '2025-01-01 10:07:00')"
+            ))
+        Base.metadata.create_all(bind=engine)
+
+        added = upgrade_schema(engine)
+
+        assert DUPLICATE_RESPONSES_REMOVED in added
+        with engine.connect() as conn:
+            kept = conn.execute(text("SELECT id FROM scenario_responses ORDER BY id")).scalars().all()
+        assert kept == ["early", "other"]
+        indexes = {index["name"]: index for index in inspect(engine).get_indexes("scenario_responses")}
+        assert indexes["uq_scenario_responses_session_scenario"]["unique"]
+        with pytest.raises(IntegrityError), engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO scenario_responses (id, session_id, scenario_id, choice_id, traits, sequence) "
+                "VALUES ('dup', 's1', 'engineer_scenario_2', 'engineer_2_choice_2', '[]', 3)"
+            ))
+        assert DUPLICATE_RESPONSES_REMOVED not in upgrade_schema(engine)
+
+    def test_resequences_answers_before_unique_sequence_index(self):
+        """Should number answers 1..n per session, legacy ones first, and then reject reused positions."""
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE scenario_responses (id VARCHAR(36) PRIMARY KEY, session_id VARCHAR(36) NOT NULL, "
+                "scenario_id VARCHAR(50) NOT NULL, choice_id VARCHAR(50) NOT NULL, traits JSON, "
+                "sequence INTEGER DEFAULT 0 NOT NULL, timestamp DATETIME)"
+            ))
+            # The index as an earlier release created it, without uniqueness
+            conn.execute(text(
+                "CREATE INDEX ix_scenario_responses_session_sequence ON scenario_responses (session_id, sequence)"
+            ))
+            conn.execute(text(
+                "INSERT INTO scenario_responses (id, session_id, scenario_id, choice_id, traits, sequence, timestamp) "
+                "VALUES "
+                "('third', 's1', 'engineer_scenario_3', 'engineer_3_choice_1', '[]', 1, '2025-01-01 09:00:00'), "
+                "('second', 's1', 'engineer_scenario_2', 'engineer_2_choice_1', '[]', 0, '2025-01-01 08:01:00'), "
+                "('first', 's1', 'engineer_scenario_1', 'engineer_1_choice_1', '[]', 0, '2025-01-01 08:00:00'), "
+                "('only', 's2', 'engineer_scenario_1', 'engineer_1_choice_1', '[]', 1, '2025-01-01 08:00:00')"
+            ))
+        Base.metadata.create_all(bind=engine)
+
+        added = upgrade_schema(engine)
+
+        assert RESPONSES_RESEQUENCED in added
+        with engine.connect() as conn:
+            rows = conn.execute(text("SELECT id, sequence FROM scenario_responses ORDER BY session_id, sequence")).all()
+        assert rows == [("first", 1), ("second", 2), ("third", 3), ("only", 1)]
+        indexes = {index["name"]: index for index in inspect(engine).get_indexes("scenario_responses")}
+        assert indexes["ix_scenario_responses_session_sequence"]["unique"]
+        with pytest.raises(IntegrityError), engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO scenario_responses (id, session_id, scenario_id, choice_id, traits, sequence) "
+                "VALUES ('reused', 's1', 'engineer_scenario_4', 'engineer_4_choice_1', '[]', 3)"
+            ))
+        assert upgrade_schema(engine) == []
+
+    def test_backfill_decided_from_data_after_upgrade_elsewhere(self):
+        """Should still backfill counters and stats when another process already added the columns."""
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE sessions (id VARCHAR(36) PRIMARY KEY, role VARCHAR(20) NOT NULL, "
+                "created_at DATETIME, updated_at DATETIME, current_phase VARCHAR(30), role_profile JSON)"
+            ))
+            conn.execute(text(
+                "CREATE TABLE scenario_responses (id VARCHAR(36) PRIMARY KEY, session_id VARCHAR(36) NOT NULL, "
+                "scenario_id VARCHAR(50) NOT NULL, choice_id VARCHAR(50) NOT NULL, traits JSON, timestamp DATETIME)"
+            ))
+            conn.execute(text("INSERT INTO sessions (id, role) VALUES ('legacy', 'engineer')"))
+            conn.execute(text(
+                "INSERT INTO scenario_responses (id, session_id, scenario_id, choice_id, traits, timestamp) VALUES "
+                "('r1', 'legacy', 'engineer_scenario_1', 'engineer_1_choice_1', '[\"long_term\"]', '2025-01-01 10:00:00'), "
+                "('r2', 'legacy', 'engineer_scenario_2', 'engineer_2_choice_1', '[\"long_term\"]', '2025-01-01 10:01:00')"
+            ))
+        Base.metadata.create_all(bind=engine)
+        # e.g. a CLI command upgraded the schema; this process sees no added columns
+        upgrade_schema(engine)
+        assert upgrade_schema(engine) == []
+        factory = sessionmaker(bind=engine)
+
+        with factory() as db:
+            assert maintenance.counters_need_backfill(db)
+            assert stats.stats_need_rebuild(db)
+            maintenance.backfill_session_counters(db)
+            stats.rebuild_stats(db)
+
+            session = db.get(SessionModel, "legacy")
+            assert session.scenarios_completed == 2
+            assert session.trait_counts == {"long_term": 2}
+            assert session.last_scenario_id == "engineer_scenario_2"
+            assert [r.sequence for r in session.scenario_responses] == [1, 2]
+            assert not maintenance.counters_need_backfill(db)
+            assert not stats.stats_need_rebuild(db)
+
+    def test_fresh_sessions_need_no_backfill(self, db_session):
+        """Should not flag sessions written with running counters, answered or not."""
+        repo = SqlAlchemySessionRepository(db_session)
+        session_manager.create_session(repo, Role.ENGINEER)
+        answered = session_manager.create_session(repo, Role.ENGINEER)
+        _answer(db_session, answered.sessionId, ("engineer_scenario_1", "engineer_1_choice_1"))
+
+        assert not maintenance.counters_need_backfill(db_session)
+        assert not stats.stats_need_rebuild(db_session)
+
+
+class TestExpireIdleSessions:
+    """Tests for idle-session expiry and compaction."""
+
+    @pytest.fixture
+    def file_db(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path}/maintenance.db")
+        event.listen(engine, "connect", apply_sqlite_pragmas)
+        Base.metadata.create_all(bind=engine)
+        yield engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        engine.dispose()
+
+    def _idle_session(self, factory, idle_for: timedelta, completed: bool = False) -> str:
+        with factory() as db:
+            repo = SqlAlchemySessionRepository(db)
+            created = session_manager.create_session(repo, Role.ENGINEER)
+            session_manager.submit_choice(repo, created.sessionId, "engineer_scenario_1", "engineer_1_choice_1")
+            if completed:
+                profile = session_manager.generate_role_profile(repo, created.sessionId)
+                session_manager.store_role_profile(repo, created.sessionId, profile)
+            db.query(SessionModel).filter(SessionModel.id == str(created.sessionId)).update(
+                {"updated_at": datetime.now(UTC).replace(tzinfo=None) - idle_for}
+            )
+            db.commit()
+        return str(created.sessionId)
+
+    def test_removes_only_idle_sessions_in_batches(self, file_db, tmp_path):
+        """Should delete and archive sessions idle past the TTL, leaving active ones."""
+        engine, factory = file_db
+        idle = [self._idle_session(factory, timedelta(days=5)) for _ in range(5)]
+        active = self._idle_session(factory, timedelta(minutes=5))
+
+        report = maintenance.expire_idle_sessions(
+            factory, ttl=timedelta(days=1), batch_size=2, archive_dir=tmp_path / "archive", pause=0
+        )
+
+        assert report.sessions_removed == 5
+        assert report.responses_removed == 5
+        assert report.batches == 3
+        with factory() as db:
+            remaining = {s.id for s in db.query(SessionModel)}
+            assert remaining == {active}
+            assert db.query(ScenarioResponseModel).count() == 1
+            assert stats.choice_counts(db, "engineer") == [("engineer_scenario_1", "engineer_1_choice_1", 1)]
+        archived = [json.loads(line) for line in report.archive_path.read_text().splitlines()]
+        assert {record["id"] for record in archived} == set(idle)
+        assert archived[0]["responses"][0]["scenario_id"] == "engineer_scenario_1"
+
+    def test_keeps_completed_sessions_unless_included(self, file_db):
+        """Should only expire sessions without a role profile by default."""
+        engine, factory = file_db
+        self._idle_session(factory, timedelta(days=5))
+        completed = self._idle_session(factory, timedelta(days=5), completed=True)
+
+        report = maintenance.expire_idle_sessions(factory, ttl=timedelta(days=1), pause=0)
+
+        assert report.sessions_removed == 1
+        with factory() as db:
+            assert {s.id for s in db.query(SessionModel)} == {completed}
+            assert sum(count for _, count in stats.archetype_counts(db, "engineer")) == 1
+
+        report = maintenance.expire_idle_sessions(factory, ttl=timedelta(days=1), pause=0, include_completed=True)
+
+        assert report.sessions_removed == 1
+        with factory() as db:
+            assert db.query(SessionModel).count() == 0
+            assert stats.archetype_counts(db, "engineer") == []
+
+    def test_incremental_vacuum_reclaims_pages(self, file_db):
+        """Should return freed pages to the filesystem on an INCREMENTAL database."""
+        engine, factory = file_db
+        for _ in range(200):
+            self._idle_session(factory, timedelta(days=5))
+        maintenance.expire_idle_sessions(factory, ttl=timedelta(days=1), batch_size=50, pause=0)
+
+        reclaimed = maintenance.incremental_vacuum(engine, pages_per_step=10)
+
+        assert reclaimed > 0
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA freelist_count").scalar() == 0
@@ -0,0 +1,101 @@
+"""
+Tests for the precomputed choice-path outcome table.
+"""
+import dataclasses
+import itertools
+from array import array
+
+from app.models.enum import Role
+from app.services import archetype_engine, outcome_table, session_manager
+from app.services.outcome_table import build_outcome_table, count_paths, get_outcome_table
+from app.services.scenario_engine import get_scenarios_for_role
+
+
+def _play(repository, role, pick):
+    created = session_manager.create_session(repository, role)
+    scenario = created.first_scenario
+    result = None
+    while scenario is not None:
+        result = session_manager.decide(repository, created.sessionId, scenario.id, pick(scenario).id)
+        scenario = result.next_scenario
+    return created.sessionId, result
+
+
+class TestOutcomeTable:
+    """Tests for enumerating and looking up complete choice paths."""
+
+    def test_every_path_matches_live_scoring(self):
+        """Should store the same top archetype live scoring would produce."""
+        role = Role.ENGINEER
+        table = get_outcome_table(role)
+        scenarios = get_scenarios_for_role(role)
+
+        assert table is not None
+        assert table.size == count_paths(role)
+        for path in itertools.product(*(s.choices for s in scenarios)):
+            trait_counts = {}
+            for choice in path:
+                for trait in choice.traits:
+                    trait_counts[trait] = trait_counts.get(trait, 0) + 1
+            code = table.encode((choice.scenario_id, choice.id) for choice in path)
+
+            assert table.lookup(code) == archetype_engine.get_top_archetype(role, trait_counts)
+
+    def test_refuses_oversized_trees(self):
+        """Should not enumerate when the role has more paths than allowed."""
+        assert build_outcome_table(Role.FOUNDER, max_paths=count_paths(Role.FOUNDER) - 1) is None
+
+
+class TestSessionProfileLookup:
+    """Tests for profile generation through the outcome table."""
+
+    def test_completed_session_uses_table(self, repository, monkeypatch):
+        """Should resolve a completed path without live scoring."""
+        for role in Role:
+            get_outcome_table(role)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("live scoring used for a complete path")
+
+        monkeypatch.setattr(archetype_engine, "get_top_archetype", fail)
+
+        session_id, result = _play(repository, Role.PRODUCT_MANAGER, lambda s: s.choices[-1])
+
+        assert result.is_completed
+        profile = session_manager.get_role_profile(repository, session_id)
+        assert session_manager.generate_role_profile(repository, session_id) == profile
+
+    def test_falls_back_to_live_scoring_without_table(self, repository, monkeypatch):
+        """Should score live when the role's tree is too large to tabulate."""
+        expected_id, _ = _play(repository, Role.ENGINEER, lambda s: s.choices[1])
+        expected = session_manager.get_role_profile(repository, expected_id)
+
+        monkeypatch.setattr(outcome_table, "_table_cache", {Role.ENGINEER: None})
+        session_id, result = _play(repository, Role.ENGINEER, lambda s: s.choices[1])
+
+        assert session_manager.get_session_or_raise(repository, session_id).path_code is None
+        assert session_manager.get_role_profile(repository, session_id) == expected
+
+    def test_partial_path_scored_live(self, repository):
+        """Should score incomplete sessions from their trait counts."""
+        created = session_manager.create_session(repository, Role.ENGINEER)
+        session_manager.submit_choice(repository, created.sessionId, "engineer_scenario_1", "engineer_1_choice_1")
+
+        profile = session_manager.generate_role_profile(repository, created.sessionId)
+
+        scores = session_manager.generate_trait_scores(repository, created.sessionId)
+        assert profile == archetype_engine.get_top_archetype(Role.ENGINEER, scores)
+
+    def test_path_from_other_layout_scored_live(self, repository, monkeypatch):
+        """Should not look up a path encoded under a previous layout of the role's content."""
+        session_id, _ = _play(repository, Role.ENGINEER, lambda s: s.choices[-1])
+        session = session_manager.get_session_or_raise(repository, session_id)
+        table = get_outcome_table(Role.ENGINEER)
+        assert session.path_layout == table.layout
+        expected = archetype_engine.get_top_archetype(Role.ENGINEER, session.trait_counts)
+
+        # Content changed: the new table maps every code to a different outcome
+        changed = dataclasses.replace(table, layout="changed", outcomes=(None,), table=array("I", [0]) * table.size)
+        monkeypatch.setattr(outcome_table, "_table_cache", {Role.ENGINEER: changed})
+
+        assert session_manager.generate_role_profile(repository, session_id) == expected
@@ -0,0 +1,199 @@
+"""
+Tests for bulk re-scoring of stored role profiles.
+"""
+import dataclasses
+import json
+import time
+from array import array
+
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.database import apply_sqlite_pragmas
+from app.db.models import Base, SessionModel
+from app.models.enum import Role
+from app.repositories import SqlAlchemySessionRepository
+from app.services import outcome_table, rescoring, scenario_engine, session_manager
+
+
+STALE_PROFILE = {"archetype": {"id": "retired_archetype"}, "score": 0, "coverage": 0, "matched_traits": []}
+
+
+@pytest.fixture
+def factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/rescore.db")
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+def _completed_session(factory, stale: bool) -> str:
+    with factory() as db:
+        repo = SqlAlchemySessionRepository(db)
+        created = session_manager.create_session(repo, Role.ENGINEER)
+        for scenario in scenario_engine.get_scenarios_for_role(Role.ENGINEER):
+            session_manager.decide(repo, created.sessionId, scenario.id, scenario.choices[0].id)
+        if stale:
+            session = db.get(SessionModel, str(created.sessionId))
+            session.role_profile = STALE_PROFILE
+            db.commit()
+    return str(created.sessionId)
+
+
+def _profiles(factory):
+    with factory() as db:
+        return {row.id: (row.role_profile, row.updated_at) for row in db.scalars(select(SessionModel))}
+
+
+def _versions(factory):
+    with factory() as db:
+        return dict(db.execute(select(SessionModel.id, SessionModel.version)).all())
+
+
+class TestRescoreProfiles:
+    """Tests for rescore_profiles."""
+
+    def test_updates_only_stale_profiles(self, factory):
+        """Should rewrite stale profiles in chunks and leave current ones and updated_at alone."""
+        stale = [_completed_session(factory, stale=True) for _ in range(3)]
+        fresh = _completed_session(factory, stale=False)
+        before = _profiles(factory)
+        versions_before = _versions(factory)
+
+        progress = rescoring.rescore_profiles(factory, chunk_size=2)
+
+        after = _profiles(factory)
+        versions_after = _versions(factory)
+        assert progress.done
+        assert progress.processed == 4
+        assert progress.updated == 3
+        assert progress.chunks == 2
+        assert all(after[sid][0] == after[fresh][0] for sid in stale)
+        assert after[fresh][0]["archetype"]["id"] != "retired_archetype"
+        assert all(after[sid][1] == before[sid][1] for sid in before)
+        assert all(versions_after[sid] == versions_before[sid] + 1 for sid in stale)
+        assert versions_after[fresh] == versions_before[fresh]
+
+    def test_paths_from_other_layout_scored_live(self, factory, monkeypatch):
+        """Should score sessions whose path was encoded under other content from their trait counts."""
+        session_id = _completed_session(factory, stale=False)
+        before = _profiles(factory)
+        table = outcome_table.get_outcome_table(Role.ENGINEER)
+        # Content changed: the new table maps every code to a different outcome
+        changed = dataclasses.replace(table, layout="changed", outcomes=(None,), table=array("I", [0]) * table.size)
+        monkeypatch.setattr(outcome_table, "_table_cache", {Role.ENGINEER: changed})
+
+        progress = rescoring.rescore_profiles(factory)
+
+        assert progress.updated == 0
+        assert _profiles(factory)[session_id] == before[session_id]
+
+    def test_skips_sessions_without_profile(self, factory):
+        """Should not touch sessions that never stored a profile."""
+        with factory() as db:
+            session_manager.create_session(SqlAlchemySessionRepository(db), Role.ENGINEER)
+
+        progress = rescoring.rescore_profiles(factory)
+
+        assert progress.processed == 0
+
+    def test_resumes_from_checkpoint(self, factory, tmp_path):
+        """Should continue after the checkpointed session id and keep the running totals."""
+        ids = sorted(_completed_session(factory, stale=True) for _ in range(3))
+        checkpoint = tmp_path / "rescore.json"
+        checkpoint.write_text(json.dumps({"last_id": ids[0], "processed": 1, "updated": 1, "chunks": 1}))
+
+        progress = rescoring.rescore_profiles(factory, checkpoint_path=checkpoint)
+
+        profiles = _profiles(factory)
+        assert profiles[ids[0]][0] == STALE_PROFILE
+        assert all(profiles[sid][0] != STALE_PROFILE for sid in ids[1:])
+        assert progress.processed == 3
+        assert progress.updated == 3
+        saved = json.loads(checkpoint.read_text())
+        assert saved["last_id"] == ids[-1]
+        assert saved["done"] is True
+
+    def test_resume_keeps_elapsed_time(self, factory, tmp_path):
+        """Should carry the checkpointed elapsed time into the resumed run's rate."""
+        ids = sorted(_completed_session(factory, stale=True) for _ in range(2))
+        checkpoint = tmp_path / "rescore.json"
+        checkpoint.write_text(json.dumps(
+            {"last_id": ids[0], "processed": 1, "updated": 1, "chunks": 1, "elapsed_seconds": 60.0}
+        ))
+
+        progress = rescoring.rescore_profiles(factory, checkpoint_path=checkpoint)
+
+        assert progress.elapsed_seconds >= 60.0
+        assert progress.sessions_per_second < 2 / 60
+
+    def test_completed_checkpoint_starts_new_run(self, factory, tmp_path):
+        """Should re-score everything again when the previous run finished, picking up data changes."""
+        ids = sorted(_completed_session(factory, stale=True) for _ in range(3))
+        checkpoint = tmp_path / "rescore.json"
+
+        first = rescoring.rescore_profiles(factory, checkpoint_path=checkpoint)
+        assert first.updated == 3
+
+        with factory() as db:
+            db.get(SessionModel, ids[0]).role_profile = STALE_PROFILE
+            db.commit()
+
+        second = rescoring.rescore_profiles(factory, checkpoint_path=checkpoint)
+
+        assert second.processed == 3
+        assert second.updated == 1
+        assert _profiles(factory)[ids[0]][0] != STALE_PROFILE
+        assert json.loads(checkpoint.read_text())["done"] is True
+
+    def test_process_pool_matches_inline(self, factory):
+        """Should produce the same profiles when scoring across worker processes."""
+        stale = [_completed_session(factory, stale=True) for _ in range(4)]
+
+        progress = rescoring.rescore_profiles(factory, workers=2)
+
+        profiles = _profiles(factory)
+        assert progress.updated == 4
+        assert len({json.dumps(profiles[sid][0], sort_keys=True) for sid in stale}) == 1
+
+
+class TestRescoreJob:
+    """Tests for the background run behind the admin endpoint."""
+
+    def test_run_in_other_process_blocks_start(self, factory, tmp_path):
+        """Should refuse to start while another process holds the lock and report that run's checkpoint."""
+        lock_path = tmp_path / "rescore.lock"
+        checkpoint = tmp_path / "rescore.json"
+        checkpoint.write_text(json.dumps({"last_id": "a", "processed": 7, "updated": 2, "chunks": 1}))
+        job = rescoring.RescoreJob(lock_path=lock_path, checkpoint_path=checkpoint)
+        # flock locks belong to the open file, so a second open behaves like another process
+        held = rescoring.try_lock(lock_path)
+
+        try:
+            assert job.start(factory) is False
+            status = job.status()
+        finally:
+            held.close()
+
+        assert status["running"] is True
+        assert status["progress"]["processed"] == 7
+
+    def test_run_releases_lock(self, factory, tmp_path):
+        """Should hold the lock only while the run is in progress."""
+        _completed_session(factory, stale=True)
+        lock_path = tmp_path / "rescore.lock"
+        job = rescoring.RescoreJob(lock_path=lock_path)
+
+        assert job.start(factory) is True
+        deadline = time.monotonic() + 5
+        while job.running and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        status = job.status()
+        assert status["running"] is False
+        assert status["progress"]["updated"] == 1
+        lock_file = rescoring.try_lock(lock_path)
+        assert lock_file is not None
+        lock_file.close()
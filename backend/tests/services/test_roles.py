@@ -0,0 +1,41 @@
+"""
+Tests for the in-memory roles registry.
+"""
+from app.models.enum import Role
+from app.services import roles
+from app.services.roles import fetch_roles, get_role_by_id, get_roles_registry
+
+
+class TestRolesRegistry:
+    """Tests for role lookups served from memory."""
+
+    def test_fetch_roles_with_and_without_details(self):
+        """Should return every role, with details only when requested."""
+        detailed = fetch_roles(include_details=True)
+        bare = fetch_roles(include_details=False)
+
+        assert {r.id for r in detailed} == set(Role)
+        assert [r.id for r in bare] == [r.id for r in detailed]
+        assert all(r.name and r.description for r in detailed)
+        assert all(r.name is None and r.description is None for r in bare)
+
+    def test_get_role_by_id(self):
+        """Should resolve roles by enum or raw id, and None for unknown ids."""
+        engineer = get_role_by_id(Role.ENGINEER)
+
+        assert engineer is not None
+        assert engineer.name == "Early-stage Engineer"
+        assert get_role_by_id("engineer") is engineer
+        assert get_role_by_id("janitor") is None
+
+    def test_registry_does_not_reread_file(self, monkeypatch):
+        """Should serve lookups without touching roles.json after the first load."""
+        get_roles_registry()
+
+        def fail_load():
+            raise AssertionError("roles.json re-read on the request path")
+
+        monkeypatch.setattr(roles, "_load_roles_registry", fail_load)
+
+        assert fetch_roles(include_details=True)
+        assert get_role_by_id(Role.FOUNDER) is not None
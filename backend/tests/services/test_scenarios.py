@@ -11,6 +11,8 @@ from app.services.scenario_engine import (
     get_scenario_by_id,
     get_next_scenario,
     get_choice_traits,
+    get_scenario_index,
+    get_scenario_position,
 )
 
 
@@ -106,3 +108,37 @@ class TestChoiceTraits:
         )
         
         assert traits == []
+
+
+class TestScenarioIndex:
+    """Tests for the compiled per-role scenario index."""
+
+    def test_index_matches_scenario_order(self):
+        """Should index every scenario with its position and successor."""
+        index = get_scenario_index(Role.ENGINEER)
+        scenarios = get_scenarios_for_role(Role.ENGINEER)
+
+        assert index.total_scenarios == len(scenarios)
+        assert index.total_choices == sum(len(s.choices) for s in scenarios)
+        for i, scenario in enumerate(scenarios):
+            assert index.by_id[scenario.id] is scenario
+            assert get_scenario_position(Role.ENGINEER, scenario.id) == i
+            expected_next = scenarios[i + 1] if i + 1 < len(scenarios) else None
+            assert index.next_by_id[scenario.id] is expected_next
+
+    def test_index_is_built_once(self):
+        """Should return the same compiled index on repeated calls."""
+        assert get_scenario_index(Role.FOUNDER) is get_scenario_index(Role.FOUNDER)
+
+    def test_choice_traits_keyed_by_scenario_and_choice(self):
+        """Should map every (scenario_id, choice_id) pair to its traits."""
+        index = get_scenario_index(Role.PRODUCT_MANAGER)
+
+        for scenario in index.scenarios:
+            for choice in scenario.choices:
+                assert index.choice_traits[(scenario.id, choice.id)] == choice.traits
+
+    def test_get_next_scenario_unknown_id(self):
+        """Should return None for a scenario that is not in the index."""
+        assert get_next_scenario(Role.ENGINEER, "nonexistent_scenario") is None
+        assert get_scenario_position(Role.ENGINEER, "nonexistent_scenario") is None
@@ -6,16 +6,22 @@ from uuid import UUID
 
 from app.models.enum import Role, WorkflowState
 from app.db.models import SessionModel
-from app.services import session_manager
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Base
+from app.repositories import ConcurrentUpdateError, SqlAlchemySessionRepository
+from app.services import maintenance
+from app.services import scenario_engine, session_manager
 from app.services.scenario_engine import get_total_scenarios
 
 
 class TestCreateSessionService:
     """Tests for the create_session service function."""
 
-    def test_create_session_engineer(self, db_session):
+    def test_create_session_engineer(self, repository):
         """Should create a session for engineer role."""
-        response = session_manager.create_session(db_session, Role.ENGINEER)
+        response = session_manager.create_session(repository, Role.ENGINEER)
         
         assert response.sessionId is not None
         assert response.role == Role.ENGINEER
@@ -25,7 +31,7 @@ class TestCreateSessionService:
 
     def test_create_session_stores_in_database(self, db_session):
         """Should persist session in database."""
-        response = session_manager.create_session(db_session, Role.ENGINEER)
+        response = session_manager.create_session(SqlAlchemySessionRepository(db_session), Role.ENGINEER)
         
         # Query database directly
         stored_session = db_session.query(SessionModel).filter(
@@ -36,9 +42,9 @@ class TestCreateSessionService:
         assert stored_session.role == Role.ENGINEER.value
         assert stored_session.current_phase == WorkflowState.SCENARIOS.value
 
-    def test_create_session_with_different_roles(self, db_session):
+    def test_create_session_with_different_roles(self, repository):
         """Should create sessions for different roles."""
-        engineer_session = session_manager.create_session(db_session, Role.ENGINEER)
+        engineer_session = session_manager.create_session(repository, Role.ENGINEER)
         
         assert engineer_session.role == Role.ENGINEER
         assert engineer_session.sessionId is not None
@@ -47,39 +53,39 @@ class TestCreateSessionService:
 class TestGetSession:
     """Tests for session retrieval functions."""
 
-    def test_get_session_exists(self, db_session):
+    def test_get_session_exists(self, repository):
         """Should return session when it exists."""
         # Create a session first
-        created = session_manager.create_session(db_session, Role.ENGINEER)
+        created = session_manager.create_session(repository, Role.ENGINEER)
         
         # Retrieve it
-        session = session_manager.get_session(db_session, created.sessionId)
+        session = session_manager.get_session(repository, created.sessionId)
         
         assert session is not None
         assert session.id == str(created.sessionId)
         assert session.role == Role.ENGINEER.value
 
-    def test_get_session_not_found(self, db_session):
+    def test_get_session_not_found(self, repository):
         """Should return None for non-existent session."""
         fake_id = UUID("00000000-0000-0000-0000-000000000000")
-        session = session_manager.get_session(db_session, fake_id)
+        session = session_manager.get_session(repository, fake_id)
         
         assert session is None
 
-    def test_get_session_or_raise_exists(self, db_session):
+    def test_get_session_or_raise_exists(self, repository):
         """Should return session when it exists."""
-        created = session_manager.create_session(db_session, Role.ENGINEER)
+        created = session_manager.create_session(repository, Role.ENGINEER)
         
-        session = session_manager.get_session_or_raise(db_session, created.sessionId)
+        session = session_manager.get_session_or_raise(repository, created.sessionId)
         
         assert session is not None
 
-    def test_get_session_or_raise_not_found(self, db_session):
+    def test_get_session_or_raise_not_found(self, repository):
         """Should raise ValueError for non-existent session."""
         fake_id = UUID("00000000-0000-0000-0000-000000000000")
         
         with pytest.raises(ValueError) as exc_info:
-            session_manager.get_session_or_raise(db_session, fake_id)
+            session_manager.get_session_or_raise(repository, fake_id)
         
         assert "not found" in str(exc_info.value)
 
@@ -87,14 +93,14 @@ class TestGetSession:
 class TestSubmitChoice:
     """Tests for submitting scenario choices."""
 
-    def test_submit_choice_success(self, db_session):
+    def test_submit_choice_success(self, repository):
         """Should successfully submit a valid choice."""
         # Create session
-        session_response = session_manager.create_session(db_session, Role.ENGINEER)
+        session_response = session_manager.create_session(repository, Role.ENGINEER)
         
         # Submit first choice
         result = session_manager.submit_choice(
-            db_session,
+            repository,
             session_response.sessionId,
             "engineer_scenario_1",
             "engineer_1_choice_1"
@@ -105,12 +111,12 @@ class TestSubmitChoice:
         assert result.choice_id == "engineer_1_choice_1"
         assert len(result.traits) > 0
 
-    def test_submit_choice_stores_traits(self, db_session):
+    def test_submit_choice_stores_traits(self, repository):
         """Should store traits with the choice."""
-        session_response = session_manager.create_session(db_session, Role.ENGINEER)
+        session_response = session_manager.create_session(repository, Role.ENGINEER)
         
         result = session_manager.submit_choice(
-            db_session,
+            repository,
             session_response.sessionId,
             "engineer_scenario_1",
             "engineer_1_choice_1"
@@ -118,13 +124,13 @@ class TestSubmitChoice:
         
         assert "long_term" in result.traits or "quality_focused" in result.traits
 
-    def test_submit_choice_invalid_session(self, db_session):
+    def test_submit_choice_invalid_session(self, repository):
         """Should raise error for non-existent session."""
         fake_id = UUID("00000000-0000-0000-0000-000000000000")
         
         with pytest.raises(ValueError) as exc_info:
             session_manager.submit_choice(
-                db_session,
+                repository,
                 fake_id,
                 "engineer_scenario_1",
                 "engineer_1_choice_1"
@@ -132,13 +138,13 @@ class TestSubmitChoice:
         
         assert "not found" in str(exc_info.value)
 
-    def test_submit_choice_invalid_choice_id(self, db_session):
+    def test_submit_choice_invalid_choice_id(self, repository):
         """Should raise error for invalid choice."""
-        session_response = session_manager.create_session(db_session, Role.ENGINEER)
+        session_response = session_manager.create_session(repository, Role.ENGINEER)
         
         with pytest.raises(ValueError) as exc_info:
             session_manager.submit_choice(
-                db_session,
+                repository,
                 session_response.sessionId,
                 "engineer_scenario_1",
                 "invalid_choice_id"
@@ -146,13 +152,13 @@ class TestSubmitChoice:
         
         assert "Invalid choice" in str(exc_info.value)
 
-    def test_submit_multiple_choices(self, db_session):
+    def test_submit_multiple_choices(self, repository):
         """Should allow submitting multiple choices."""
-        session_response = session_manager.create_session(db_session, Role.ENGINEER)
+        session_response = session_manager.create_session(repository, Role.ENGINEER)
         
         # Submit first choice
         session_manager.submit_choice(
-            db_session,
+            repository,
             session_response.sessionId,
             "engineer_scenario_1",
             "engineer_1_choice_1"
@@ -160,7 +166,7 @@ class TestSubmitChoice:
         
         # Submit second choice
         result2 = session_manager.submit_choice(
-            db_session,
+            repository,
             session_response.sessionId,
             "engineer_scenario_2",
             "engineer_2_choice_2"
@@ -169,7 +175,211 @@ class TestSubmitChoice:
         assert result2.scenario_id == "engineer_scenario_2"
         
         # Check completion count
-        completed = session_manager.get_scenarios_completed(db_session, session_response.sessionId)
+        completed = session_manager.get_scenarios_completed(repository, session_response.sessionId)
         assert completed == 2
 
 
+
+
+class TestDecide:
+    """Tests for the single-transaction decide flow."""
+
+    def _play_through(self, repository, session_id):
+        scenario = session_manager.fetch_session(repository, session_id).current_scenario
+        result = None
+        while scenario is not None:
+            result = session_manager.decide(repository, session_id, scenario.id, scenario.choices[0].id)
+            scenario = result.next_scenario
+        return result
+
+    def test_decide_returns_progress(self, repository):
+        """Should record the choice and return the next scenario and progress."""
+        created = session_manager.create_session(repository, Role.ENGINEER)
+
+        result = session_manager.decide(
+            repository,
+            created.sessionId,
+            "engineer_scenario_1",
+            "engineer_1_choice_1"
+        )
+
+        assert result.next_scenario is not None
+        assert result.next_scenario.id == "engineer_scenario_2"
+        assert result.scenarios_completed == 1
+        assert result.total_scenarios == get_total_scenarios(Role.ENGINEER)
+        assert result.is_completed is False
+        assert session_manager.get_scenarios_completed(repository, created.sessionId) == 1
+
+    def test_decide_last_scenario_stores_profile(self, repository):
+        """Should generate and persist the role profile on the final decision."""
+        created = session_manager.create_session(repository, Role.ENGINEER)
+
+        result = self._play_through(repository, created.sessionId)
+
+        assert result.is_completed is True
+        assert result.next_scenario is None
+        assert result.scenarios_completed == result.total_scenarios
+        stored = session_manager.get_role_profile(repository, created.sessionId)
+        assert stored == session_manager.generate_role_profile(repository, created.sessionId)
+
+    def test_decide_invalid_choice_writes_nothing(self, repository):
+        """Should raise before inserting anything for an invalid choice."""
+        created = session_manager.create_session(repository, Role.ENGINEER)
+
+        with pytest.raises(ValueError) as exc_info:
+            session_manager.decide(repository, created.sessionId, "engineer_scenario_1", "invalid_choice_id")
+
+        assert "Invalid choice" in str(exc_info.value)
+        assert session_manager.get_scenarios_completed(repository, created.sessionId) == 0
+
+
+class TestDecideMany:
+    """Tests for batched decision submission."""
+
+    def _decisions(self, role, start=0, stop=None):
+        scenarios = scenario_engine.get_scenarios_for_role(role)[start:stop]
+        return [(scenario.id, scenario.choices[-1].id) for scenario in scenarios]
+
+    def test_full_run_matches_step_by_step(self, repository):
+        """Should leave the session exactly as the per-step flow does and return the profile."""
+        decisions = self._decisions(Role.ENGINEER)
+        batched = session_manager.create_session(repository, Role.ENGINEER)
+        stepped = session_manager.create_session(repository, Role.ENGINEER)
+
+        result = session_manager.decide_many(repository, batched.sessionId, decisions)
+        for scenario_id, choice_id in decisions:
+            session_manager.decide(repository, stepped.sessionId, scenario_id, choice_id)
+
+        assert result.is_completed is True
+        assert result.next_scenario is None
+        assert result.scenarios_completed == len(decisions)
+        assert result.role_profile == session_manager.get_role_profile(repository, stepped.sessionId)
+        batched_session = session_manager.get_session_or_raise(repository, batched.sessionId)
+        stepped_session = session_manager.get_session_or_raise(repository, stepped.sessionId)
+        assert batched_session.trait_counts == stepped_session.trait_counts
+        assert batched_session.path_code == stepped_session.path_code
+        assert [r.sequence for r in batched_session.scenario_responses] == list(range(1, len(decisions) + 1))
+
+    def test_partial_batches_resume(self, repository):
+        """Should accept a batch that continues from the current scenario."""
+        created = session_manager.create_session(repository, Role.ENGINEER)
+
+        first = session_manager.decide_many(repository, created.sessionId, self._decisions(Role.ENGINEER, 0, 3))
+        rest = session_manager.decide_many(repository, created.sessionId, self._decisions(Role.ENGINEER, 3))
+
+        assert first.is_completed is False
+        assert first.role_profile is None
+        assert first.next_scenario.id == "engineer_scenario_4"
+        assert rest.is_completed is True
+        assert rest.role_profile is not None
+
+    @pytest.mark.parametrize("decisions, message", [
+        ([], "No decisions"),
+        ([("engineer_scenario_2", "engineer_2_choice_1")], "Expected a decision for scenario engineer_scenario_1"),
+        ([("engineer_scenario_1", "engineer_1_choice_1"), ("engineer_scenario_1", "engineer_1_choice_2")], "Expected"),
+        ([("engineer_scenario_1", "engineer_1_choice_1"), ("engineer_scenario_2", "bogus")], "Invalid choice"),
+    ])
+    def test_invalid_batch_writes_nothing(self, repository, decisions, message):
+        """Should validate the whole batch before recording any of it."""
+        created = session_manager.create_session(repository, Role.ENGINEER)
+
+        with pytest.raises(ValueError) as exc_info:
+            session_manager.decide_many(repository, created.sessionId, decisions)
+
+        assert message in str(exc_info.value)
+        assert session_manager.get_scenarios_completed(repository, created.sessionId) == 0
+        assert repository.choice_counts(Role.ENGINEER) == []
+
+    def test_rejects_decisions_past_the_end(self, repository):
+        """Should refuse more decisions than there are scenarios left."""
+        created = session_manager.create_session(repository, Role.ENGINEER)
+        decisions = self._decisions(Role.ENGINEER)
+
+        with pytest.raises(ValueError) as exc_info:
+            session_manager.decide_many(repository, created.sessionId, decisions + decisions[-1:])
+
+        assert "after the last scenario" in str(exc_info.value)
+
+
+class TestScenarioResponseOrdering:
+    """Tests for response sequencing and duplicate rejection."""
+
+    def test_responses_are_sequenced_in_submission_order(self, repository):
+        """Should number responses 1..n and load them in that order."""
+        created = session_manager.create_session(repository, Role.ENGINEER)
+        for scenario_id, choice_id in [
+            ("engineer_scenario_2", "engineer_2_choice_1"),
+            ("engineer_scenario_1", "engineer_1_choice_1"),
+            ("engineer_scenario_3", "engineer_3_choice_1"),
+        ]:
+            session_manager.submit_choice(repository, created.sessionId, scenario_id, choice_id)
+
+        session = session_manager.get_session_or_raise(repository, created.sessionId)
+
+        assert [r.sequence for r in session.scenario_responses] == [1, 2, 3]
+        assert [r.scenario_id for r in session.scenario_responses] == [
+            "engineer_scenario_2",
+            "engineer_scenario_1",
+            "engineer_scenario_3",
+        ]
+
+    def test_duplicate_answer_rejected(self, repository):
+        """Should reject answering the same scenario twice and keep counters intact."""
+        created = session_manager.create_session(repository, Role.ENGINEER)
+        session_manager.submit_choice(repository, created.sessionId, "engineer_scenario_1", "engineer_1_choice_1")
+
+        with pytest.raises(ValueError) as exc_info:
+            session_manager.decide(repository, created.sessionId, "engineer_scenario_1", "engineer_1_choice_2")
+
+        assert "already answered" in str(exc_info.value)
+        assert session_manager.get_scenarios_completed(repository, created.sessionId) == 1
+
+
+class TestConcurrentUpdates:
+    """Tests for racing updates of one session on the SQL backend."""
+
+    @pytest.fixture
+    def factory(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path}/sessions.db")
+        Base.metadata.create_all(bind=engine)
+        yield sessionmaker(bind=engine, autoflush=False)
+        engine.dispose()
+
+    def _stale_repository(self, factory, session_id):
+        """A repository holding the session as loaded before another request changed it."""
+        repo = SqlAlchemySessionRepository(factory())
+        stale = repo.get_session(session_id)
+        with factory() as db:
+            session_manager.decide(
+                SqlAlchemySessionRepository(db), session_id, "engineer_scenario_1", "engineer_1_choice_1"
+            )
+        return repo, stale  # the identity map only holds weak references, so keep the stale row alive
+
+    def test_stale_commit_is_rejected(self, factory):
+        """Should refuse to overwrite counters another unit of work already advanced."""
+        with factory() as db:
+            session_id = session_manager.create_session(SqlAlchemySessionRepository(db), Role.ENGINEER).sessionId
+        repo, session = self._stale_repository(factory, session_id)
+
+        assert session.scenarios_completed == 0
+        session.scenarios_completed += 1
+        session.version += 1
+        with pytest.raises(ConcurrentUpdateError):
+            repo.commit()
+
+        with factory() as db:
+            assert db.get(SessionModel, str(session_id)).scenarios_completed == 1
+
+    def test_decide_retries_from_a_fresh_read(self, factory):
+        """Should re-run a decision that lost the race so counters match the responses."""
+        with factory() as db:
+            session_id = session_manager.create_session(SqlAlchemySessionRepository(db), Role.ENGINEER).sessionId
+        repo, _stale = self._stale_repository(factory, session_id)
+
+        result = session_manager.decide(repo, session_id, "engineer_scenario_2", "engineer_2_choice_1")
+
+        assert result.scenarios_completed == 2
+        with factory() as db:
+            session = db.get(SessionModel, str(session_id))
+            assert [r.sequence for r in session.scenario_responses] == [1, 2]
+            assert maintenance.check_session_counters(db) == []